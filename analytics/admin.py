@@ -0,0 +1,31 @@
+from django.contrib import admin
+
+from .models import DailyApplicationCount, DailyDisbursement, DailyLoanStatusTransition, DailyRepayment
+
+
+@admin.register(DailyDisbursement)
+class DailyDisbursementAdmin(admin.ModelAdmin):
+    list_display = ("day", "product", "count", "total")
+    list_filter = ("product",)
+    date_hierarchy = "day"
+
+
+@admin.register(DailyRepayment)
+class DailyRepaymentAdmin(admin.ModelAdmin):
+    list_display = ("day", "method", "count", "total")
+    list_filter = ("method",)
+    date_hierarchy = "day"
+
+
+@admin.register(DailyApplicationCount)
+class DailyApplicationCountAdmin(admin.ModelAdmin):
+    list_display = ("day", "product", "status", "count")
+    list_filter = ("product", "status")
+    date_hierarchy = "day"
+
+
+@admin.register(DailyLoanStatusTransition)
+class DailyLoanStatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ("day", "from_status", "to_status", "count")
+    list_filter = ("to_status",)
+    date_hierarchy = "day"
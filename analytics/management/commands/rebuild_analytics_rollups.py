@@ -0,0 +1,16 @@
+"""Recompute the analytics daily rollups from loans, applications and payments."""
+
+from django.core.management.base import BaseCommand
+
+from analytics import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the analytics rollup tables from applications, loans and payments, e.g. "
+        "after importing historical data."
+    )
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS("Analytics rollups rebuilt."))
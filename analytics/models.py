@@ -0,0 +1,69 @@
+"""
+Daily rollups behind the staff analytics endpoints.
+
+Each row is one (day, dimension) bucket. Write paths bump buckets through analytics.rollups as
+they happen, so reads scan days x dimensions rather than the loans/payments tables.
+"""
+
+from django.db import models
+
+from loans.models import Loan, LoanApplication, LoanProduct
+from payments.models import LoanPayment
+
+
+class DailyDisbursement(models.Model):
+    day = models.DateField()
+    product = models.ForeignKey(LoanProduct, on_delete=models.PROTECT, related_name="+")
+    count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "product"], name="uniq_daily_disbursement"),
+        ]
+
+
+class DailyRepayment(models.Model):
+    """COMPLETED payments only, bucketed by paid_at."""
+
+    day = models.DateField()
+    method = models.CharField(max_length=20, choices=LoanPayment.Method.choices)
+    count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "method"], name="uniq_daily_repayment"),
+        ]
+
+
+class DailyApplicationCount(models.Model):
+    """Applications entering `status` on `day` (SUBMITTED on submit, decisions on decide)."""
+
+    day = models.DateField()
+    product = models.ForeignKey(LoanProduct, on_delete=models.PROTECT, related_name="+")
+    status = models.CharField(max_length=20, choices=LoanApplication.Status.choices)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product", "status"], name="uniq_daily_application_count"
+            ),
+        ]
+
+
+class DailyLoanStatusTransition(models.Model):
+    """Loan status moves per day; from_status is blank for newly disbursed loans."""
+
+    day = models.DateField()
+    from_status = models.CharField(max_length=20, choices=Loan.Status.choices, blank=True)
+    to_status = models.CharField(max_length=20, choices=Loan.Status.choices)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "from_status", "to_status"], name="uniq_daily_loan_transition"
+            ),
+        ]
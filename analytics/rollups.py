@@ -0,0 +1,232 @@
+"""
+Maintenance and reads for the daily rollup tables.
+
+record_* are called from write paths (see api.events) and bump rows through core.counters.
+rebuild() recomputes every table from applications, loans and payments.
+"""
+
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from core.counters import bump
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _model(name: str, apps=django_apps):
+    return apps.get_model("analytics", name)
+
+
+def record_disbursement(loan) -> None:
+    day = timezone.localdate(loan.disbursed_at)
+    bump(
+        _model("DailyDisbursement"),
+        {"day": day, "product_id": loan.application.product_id},
+        count=1,
+        total=loan.principal_amount,
+    )
+    record_loan_transition(loan, "", when=loan.disbursed_at)
+
+
+def record_repayment(payment) -> None:
+    if payment.status != "COMPLETED":
+        return
+    bump(
+        _model("DailyRepayment"),
+        {"day": timezone.localdate(payment.paid_at), "method": payment.method},
+        count=1,
+        total=payment.amount,
+    )
+
+
+def record_application_status(application, when=None) -> None:
+    bump(
+        _model("DailyApplicationCount"),
+        {
+            "day": timezone.localdate(when or timezone.now()),
+            "product_id": application.product_id,
+            "status": application.status,
+        },
+        count=1,
+    )
+
+
+def record_application_statuses(applications, when=None) -> None:
+    """record_application_status for many applications, one bump per (day, product, status)."""
+    buckets = Counter(
+        (timezone.localdate(when or a.submitted_at or timezone.now()), a.product_id, a.status)
+        for a in applications
+    )
+    for (day, product_id, status), count in buckets.items():
+        bump(
+            _model("DailyApplicationCount"),
+            {"day": day, "product_id": product_id, "status": status},
+            count=count,
+        )
+
+
+def record_loan_transition(loan, from_status: str, when=None) -> None:
+    bump(
+        _model("DailyLoanStatusTransition"),
+        {
+            "day": timezone.localdate(when or timezone.now()),
+            "from_status": from_status,
+            "to_status": loan.status,
+        },
+        count=1,
+    )
+
+
+def rebuild(apps=django_apps) -> None:
+    """Replace all rollup rows with a full recompute from loans, applications and payments."""
+    Loan = apps.get_model("loans", "Loan")
+    LoanApplication = apps.get_model("loans", "LoanApplication")
+    LoanPayment = apps.get_model("payments", "LoanPayment")
+    DailyDisbursement = _model("DailyDisbursement", apps)
+    DailyRepayment = _model("DailyRepayment", apps)
+    DailyApplicationCount = _model("DailyApplicationCount", apps)
+    DailyLoanStatusTransition = _model("DailyLoanStatusTransition", apps)
+
+    with transaction.atomic():
+        for model in (
+            DailyDisbursement,
+            DailyRepayment,
+            DailyApplicationCount,
+            DailyLoanStatusTransition,
+        ):
+            model.objects.all().delete()
+
+        DailyDisbursement.objects.bulk_create(
+            DailyDisbursement(**row)
+            for row in Loan.objects.order_by()
+            .values(day=TruncDate("disbursed_at"), product_id=F("application__product_id"))
+            .annotate(count=Count("id"), total=Sum("principal_amount"))
+        )
+        DailyRepayment.objects.bulk_create(
+            DailyRepayment(**row)
+            for row in LoanPayment.objects.filter(status="COMPLETED")
+            .order_by()
+            .values("method", day=TruncDate("paid_at"))
+            .annotate(count=Count("id"), total=Sum("amount"))
+        )
+
+        # Only submission and decision have timestamps; earlier UNDER_REVIEW moves are lost.
+        app_counts: dict[tuple, int] = {}
+        submitted = (
+            LoanApplication.objects.filter(submitted_at__isnull=False)
+            .order_by()
+            .values("product_id", day=TruncDate("submitted_at"))
+            .annotate(count=Count("id"))
+        )
+        decided = (
+            LoanApplication.objects.filter(decided_at__isnull=False)
+            .order_by()
+            .values("product_id", "status", day=TruncDate("decided_at"))
+            .annotate(count=Count("id"))
+        )
+        for row in list(submitted) + list(decided):
+            k = (row["day"], row["product_id"], row.get("status", "SUBMITTED"))
+            app_counts[k] = app_counts.get(k, 0) + row["count"]
+        DailyApplicationCount.objects.bulk_create(
+            DailyApplicationCount(day=d, product_id=p, status=st, count=c)
+            for (d, p, st), c in app_counts.items()
+        )
+
+        # Loans have no status history: count each as disbursed ACTIVE, then moved to its
+        # current status on the disbursement day.
+        transitions = [
+            DailyLoanStatusTransition(
+                day=row["day"], from_status="", to_status="ACTIVE", count=row["count"]
+            )
+            for row in Loan.objects.order_by()
+            .values(day=TruncDate("disbursed_at"))
+            .annotate(count=Count("id"))
+        ]
+        transitions += [
+            DailyLoanStatusTransition(
+                day=row["day"], from_status="ACTIVE", to_status=row["status"], count=row["count"]
+            )
+            for row in Loan.objects.exclude(status="ACTIVE")
+            .order_by()
+            .values("status", day=TruncDate("disbursed_at"))
+            .annotate(count=Count("id"))
+        ]
+        DailyLoanStatusTransition.objects.bulk_create(transitions)
+
+
+def _bucket(granularity: str):
+    if granularity == "week":
+        return TruncWeek("day")
+    if granularity == "month":
+        return TruncMonth("day")
+    return F("day")
+
+
+def _in_range(qs, start: date | None, end: date | None):
+    if start is not None:
+        qs = qs.filter(day__gte=start)
+    if end is not None:
+        qs = qs.filter(day__lte=end)
+    return qs
+
+
+def amount_series(model_name: str, start=None, end=None, granularity: str = "month") -> list:
+    """[{"period": date, "count": int, "total": Decimal}] for DailyDisbursement/DailyRepayment."""
+    qs = _in_range(_model(model_name).objects.all(), start, end)
+    rows = (
+        qs.order_by()
+        .values(period=_bucket(granularity))
+        .annotate(count=Sum("count"), total=Sum("total"))
+        .order_by("period")
+    )
+    return [
+        {"period": r["period"], "count": r["count"], "total": r["total"] or Decimal("0")}
+        for r in rows
+    ]
+
+
+def application_series(start=None, end=None, granularity: str = "month") -> list:
+    qs = _in_range(_model("DailyApplicationCount").objects.all(), start, end)
+    return list(
+        qs.order_by()
+        .values("status", period=_bucket(granularity), product_code=F("product__code"))
+        .annotate(count=Sum("count"))
+        .order_by("period", "product_code", "status")
+    )
+
+
+def transition_series(start=None, end=None, granularity: str = "month") -> list:
+    qs = _in_range(_model("DailyLoanStatusTransition").objects.all(), start, end)
+    return list(
+        qs.order_by()
+        .values("from_status", "to_status", period=_bucket(granularity))
+        .annotate(count=Sum("count"))
+        .order_by("period", "from_status", "to_status")
+    )
+
+
+def loan_status_counts() -> list:
+    """
+    Current loans per status, as net inflow minus outflow over all transition buckets: a few
+    rows per day rather than a pass over the loans table. Status changes that bypass the API
+    are not counted until rebuild() runs.
+    """
+    Transition = _model("DailyLoanStatusTransition")
+    net: dict[str, int] = {}
+    for row in Transition.objects.order_by().values("to_status").annotate(n=Sum("count")):
+        net[row["to_status"]] = net.get(row["to_status"], 0) + row["n"]
+    for row in (
+        Transition.objects.exclude(from_status="")
+        .order_by()
+        .values("from_status")
+        .annotate(n=Sum("count"))
+    ):
+        net[row["from_status"]] = net.get(row["from_status"], 0) - row["n"]
+    return [{"status": st, "count": n} for st, n in sorted(net.items()) if n > 0]
@@ -5,3 +5,9 @@ class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
     verbose_name = "REST API"
+
+    def ready(self):
+        from . import authentication, tokens
+
+        authentication.connect_signals()
+        tokens.connect_signals()
@@ -0,0 +1,274 @@
+"""
+Async variants of the read-heavy endpoints, routed instead of the sync views when
+settings.API_ASYNC_VIEWS is on (the ASGI profile, config/gunicorn_asgi.py).
+
+Paths, payloads, caching and ETags match the sync views in api.views, and they reuse the same
+query and shaping helpers. The difference is that independent reads are awaited together.
+Django's async ORM still runs every query on the request's single sync thread, so
+gather_reads() hands each read to a small pool of API_ASYNC_READ_THREADS threads per worker
+to make them actually overlap. Each pool thread keeps its own persistent connection
+(CONN_MAX_AGE with health checks), so a worker holds at most that many extra connections and
+reads do not reconnect. An async worker also keeps serving other requests while it waits.
+
+Requests go through the same REST_FRAMEWORK authentication classes (token or session) and
+renderer negotiation (JSON or MessagePack) as the sync views. Only the browsable API is left
+out; a browser gets JSON here.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework import serializers as drf_serializers
+from rest_framework.exceptions import APIException, NotAcceptable
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from analytics import rollups
+from loans.models import LoanProduct
+
+from . import cache as api_cache
+from . import views
+from .permissions import IsCustomerUser, IsStaffUser
+from .renderers import FastJSONRenderer
+from .serializers import LoanProductSerializer
+
+
+def _negotiate(request) -> Request:
+    """DRF request with the configured authenticators and the renderer the client accepts."""
+    drf_request = Request(
+        request, authenticators=[cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    renderers = [
+        cls()
+        for cls in api_settings.DEFAULT_RENDERER_CLASSES
+        if not issubclass(cls, BrowsableAPIRenderer)
+    ]
+    try:
+        drf_request.accepted_renderer, drf_request.accepted_media_type = (
+            api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS().select_renderer(
+                drf_request, renderers
+            )
+        )
+    except NotAcceptable:
+        drf_request.accepted_renderer = FastJSONRenderer()
+        drf_request.accepted_media_type = FastJSONRenderer.media_type
+        drf_request.not_acceptable = True
+    return drf_request
+
+
+def _render(drf_request: Request, data, status: int = 200, headers=None) -> HttpResponse:
+    renderer = drf_request.accepted_renderer
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+    response = HttpResponse(
+        renderer.render(data, drf_request.accepted_media_type),
+        content_type=content_type,
+        status=status,
+        headers=headers,
+    )
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def _not_acceptable(drf_request: Request):
+    if getattr(drf_request, "not_acceptable", False):
+        return _render(drf_request, {"detail": NotAcceptable.default_detail}, status=406)
+    return None
+
+
+@sync_to_async
+def _authenticate(request, drf_request: Request, permission_class):
+    """None when authentication and the permission check pass, else the response to return."""
+    if (response := _not_acceptable(drf_request)) is not None:
+        return response
+    try:
+        request.user, request.auth = drf_request.user, drf_request.auth
+    except APIException as exc:
+        return _render(
+            drf_request, {"detail": exc.detail}, 401, headers={"WWW-Authenticate": "Token"}
+        )
+    if not request.user.is_authenticated:
+        return _render(
+            drf_request,
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+            headers={"WWW-Authenticate": "Token"},
+        )
+    if permission_class is not None and not permission_class().has_permission(request, None):
+        return _render(
+            drf_request, {"detail": "You do not have permission to perform this action."}, 403
+        )
+    return None
+
+
+_pool_lock = threading.Lock()
+_read_pool: ThreadPoolExecutor | None = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _read_pool
+    with _pool_lock:
+        if _read_pool is None:
+            _read_pool = ThreadPoolExecutor(
+                max_workers=settings.API_ASYNC_READ_THREADS, thread_name_prefix="async-read"
+            )
+        return _read_pool
+
+
+def _on_pool_thread(fn):
+    def run():
+        # Drops this thread's connection only if it is broken or past CONN_MAX_AGE.
+        close_old_connections()
+        return fn()
+
+    return run
+
+
+@sync_to_async
+def _in_atomic_block() -> bool:
+    return connection.in_atomic_block
+
+
+async def gather_reads(*fns) -> list:
+    """
+    Run independent sync read callables concurrently on the read pool, whose threads keep
+    their database connections between requests. Inside an atomic block (tests) the other
+    connections could not see the transaction, so they run one after another on the request's
+    thread instead.
+    """
+    if await _in_atomic_block():
+        return [await sync_to_async(fn)() for fn in fns]
+    return await asyncio.gather(
+        *(
+            sync_to_async(_on_pool_thread(fn), thread_sensitive=False, executor=_pool())()
+            for fn in fns
+        )
+    )
+
+
+def _not_modified(request, etag: str):
+    response = get_conditional_response(request, etag=quote_etag(etag))
+    if response is not None:
+        patch_vary_headers(response, ["Accept"])
+    return response
+
+
+@require_safe
+async def me(request):
+    drf_request = _negotiate(request)
+    denied = await _authenticate(request, drf_request, IsCustomerUser)
+    if denied is not None:
+        return denied
+    version = await sync_to_async(views._me_version)(request)
+    etag = views._stamp_etag(version, drf_request.accepted_media_type)
+    if (response := _not_modified(request, etag)) is not None:
+        return response
+
+    pk = views._customer_stamp(request)["pk"]  # read by _me_version above; no query
+
+    async def build():
+        profile, applications, loans = await gather_reads(
+            partial(views._me_profile, pk),
+            partial(views._me_applications, pk),
+            partial(views._me_loans, pk),
+        )
+        return {**profile, "applications": applications, "loans": loans}
+
+    data = await api_cache.aget_or_compute(
+        api_cache.ME_PAYLOAD, build, api_cache.ME_PAYLOAD_TTL, suffix=f"{pk}:{version}"
+    )
+    return _render(drf_request, data, headers={"ETag": quote_etag(etag)})
+
+
+@require_safe
+async def product_list(request):
+    drf_request = _negotiate(request)
+    if (response := _not_acceptable(drf_request)) is not None:
+        return response
+    stamp = await LoanProduct.objects.filter(is_active=True).aaggregate(
+        n=Count("id"), last=Max("updated_at")
+    )
+    etag = views._stamp_etag(
+        "products", drf_request.accepted_media_type, stamp["n"], stamp["last"]
+    )
+    if (response := _not_modified(request, etag)) is not None:
+        return response
+    products = [p async for p in LoanProduct.objects.filter(is_active=True).order_by("name")]
+    return _render(
+        drf_request,
+        LoanProductSerializer(products, many=True).data,
+        headers={"ETag": quote_etag(etag)},
+    )
+
+
+@require_safe
+async def staff_dashboard_summary(request):
+    drf_request = _negotiate(request)
+    denied = await _authenticate(request, drf_request, IsStaffUser)
+    if denied is not None:
+        return denied
+
+    async def build():
+        return views._compose_dashboard_summary(
+            *await gather_reads(
+                views._dashboard_loan_totals,
+                views._dashboard_application_counts,
+                views._dashboard_recent_activity,
+            )
+        )
+
+    data = await api_cache.aget_or_compute(
+        api_cache.DASHBOARD_SUMMARY, build, ttl=api_cache.DASHBOARD_SUMMARY_TTL
+    )
+    return _render(drf_request, data)
+
+
+@require_safe
+async def staff_analytics_summary(request):
+    drf_request = _negotiate(request)
+    denied = await _authenticate(request, drf_request, IsStaffUser)
+    if denied is not None:
+        return denied
+    try:
+        granularity, start, end = views._analytics_params(request.GET)
+    except drf_serializers.ValidationError as exc:
+        return _render(drf_request, exc.detail, status=400)
+
+    (
+        disbursements,
+        repayments,
+        applications,
+        loan_transitions,
+        loans_by_status,
+    ) = await gather_reads(
+        partial(rollups.amount_series, "DailyDisbursement", start, end, granularity),
+        partial(rollups.amount_series, "DailyRepayment", start, end, granularity),
+        partial(rollups.application_series, start, end, granularity),
+        partial(rollups.transition_series, start, end, granularity),
+        rollups.loan_status_counts,
+    )
+    return _render(
+        drf_request,
+        views._analytics_payload(
+            granularity,
+            start,
+            end,
+            disbursements=disbursements,
+            repayments=repayments,
+            applications=applications,
+            loan_transitions=loan_transitions,
+            loans_by_status=loans_by_status,
+        ),
+    )
@@ -0,0 +1,215 @@
+"""
+Token authentication that resolves the whole principal in one query and caches it.
+
+CachedTokenAuthentication loads the token, its user and the user's employee_profile and
+customer_profile in one select_related query. The rows are kept in a per-process cache keyed
+by the token's SHA-256 for TOKEN_AUTH_CACHE_TTL seconds, and each request gets fresh model
+instances built from them, so within the TTL a request needs no auth queries at all.
+IsStaffUser/IsCustomerUser then read the profiles that are already loaded instead of issuing
+their own lookups.
+
+Each entry records the user's generation in the shared Django cache (api.cache.AUTH_USER)
+and is only used while that generation is unchanged: one cache read per request. Signals
+(connected in ApiConfig.ready) bump it on token deletion (logout, rotation, purge), user saves
+(password change, deactivation) and employee/customer profile saves or deletes, right away
+and again once the transaction commits, so every worker drops the user's principal on its
+next request. That needs a cache shared by the workers; with the process-local LocMemCache
+entries are kept for at most LOCAL_CACHE_MAX_TTL seconds instead.
+
+Expired tokens are refused (cached or not), and each use is recorded through api.tokens.touch,
+which writes at most once per token per TOKEN_TOUCH_INTERVAL_SECONDS.
+"""
+
+import hashlib
+import threading
+import time
+from functools import partial
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import cache as api_cache
+from . import tokens
+
+_MAX_ENTRIES = 10_000
+LOCAL_CACHE_MAX_TTL = 5
+
+# Loaded with the token, parents before children.
+_RELATED = ("expiry", "user", "user__employee_profile", "user__customer_profile")
+
+
+class _Entry(NamedTuple):
+    expires: float
+    user_id: object
+    generation: int
+    db: str
+    # Concrete field values of the token and of each _RELATED object (None: no such row).
+    rows: tuple
+
+
+_lock = threading.Lock()
+_principals: dict[str, _Entry] = {}
+
+
+def _ttl() -> int:
+    if isinstance(cache, LocMemCache):
+        return min(settings.TOKEN_AUTH_CACHE_TTL, LOCAL_CACHE_MAX_TTL)
+    return settings.TOKEN_AUTH_CACHE_TTL
+
+
+def _generation(user_id) -> int:
+    return api_cache.generation(f"{api_cache.AUTH_USER}:{user_id}")
+
+
+def _values(obj) -> tuple | None:
+    if obj is None:
+        return None
+    return tuple(getattr(obj, f.attname) for f in obj._meta.concrete_fields)
+
+
+def _related(token, path: str):
+    obj = token
+    for name in path.split("__"):
+        # Missing reverse one-to-one rows raise RelatedObjectDoesNotExist, an AttributeError.
+        obj = getattr(obj, name, None)
+        if obj is None:
+            return None
+    return obj
+
+
+def _rebuild(model, entry: _Entry):
+    """Fresh token, user and profile instances from an entry, related as select_related does."""
+    token = model.from_db(entry.db, None, entry.rows[0])
+    objects = {"": token}
+    for path, values in zip(_RELATED, entry.rows[1:]):
+        parent_path, _, name = path.rpartition("__")
+        parent = objects[parent_path]
+        if parent is None:
+            objects[path] = None
+            continue
+        field = parent._meta.get_field(name)
+        obj = None if values is None else field.related_model.from_db(entry.db, None, values)
+        field.set_cached_value(parent, obj)
+        if obj is not None and not field.concrete:
+            field.remote_field.set_cached_value(obj, parent)
+        objects[path] = obj
+    return token
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def clear_cache() -> None:
+    with _lock:
+        _principals.clear()
+
+
+def invalidate_user(user_id) -> None:
+    """Drop the user's principals here and, through the shared generation, on every worker."""
+    api_cache.invalidate(f"{api_cache.AUTH_USER}:{user_id}")
+    with _lock:
+        stale = [d for d, entry in _principals.items() if entry.user_id == user_id]
+        for digest in stale:
+            del _principals[digest]
+
+
+def invalidate_token(key: str) -> None:
+    with _lock:
+        _principals.pop(_digest(key), None)
+
+
+def _store(digest: str, token, generation: int, expires: float | None = None) -> None:
+    now = time.monotonic()
+    entry = _Entry(
+        expires=now + _ttl() if expires is None else expires,
+        user_id=token.user_id,
+        generation=generation,
+        db=token._state.db,
+        rows=(_values(token), *(_values(_related(token, path)) for path in _RELATED)),
+    )
+    with _lock:
+        if len(_principals) >= _MAX_ENTRIES:
+            for d in [d for d, e in _principals.items() if e.expires <= now]:
+                del _principals[d]
+            if len(_principals) >= _MAX_ENTRIES:
+                _principals.clear()
+        _principals[digest] = entry
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        digest = _digest(key)
+        hit = _principals.get(digest)
+        if (
+            hit is not None
+            and hit.expires > time.monotonic()
+            and hit.generation == _generation(hit.user_id)
+        ):
+            token = _rebuild(self.get_model(), hit)
+            if tokens.is_expired(token):
+                invalidate_token(key)
+                raise AuthenticationFailed("Token has expired.")
+            if tokens.touch(token):
+                # Keep the recorded use, or every request would try to record it again.
+                _store(digest, token, hit.generation, hit.expires)
+            return (token.user, token)
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related(
+                "expiry", "user", "user__employee_profile", "user__customer_profile"
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise AuthenticationFailed("Invalid token.")
+        if not token.user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        if tokens.is_expired(token):
+            raise AuthenticationFailed("Token has expired.")
+        tokens.touch(token)
+
+        if settings.TOKEN_AUTH_CACHE_TTL > 0:
+            # Read after the rows, so any change that commits from here on bumps it past this.
+            _store(digest, token, _generation(token.user_id))
+        return (token.user, token)
+
+
+def _evict(user_id) -> None:
+    invalidate_user(user_id)
+    # Again after commit: another worker may have cached the old rows in the meantime.
+    transaction.on_commit(partial(invalidate_user, user_id))
+
+
+def _evict_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+    _evict(instance.user_id)
+
+
+def _evict_user(sender, instance, **kwargs):
+    _evict(instance.pk)
+
+
+def _evict_profile_user(sender, instance, **kwargs):
+    _evict(instance.user_id)
+
+
+def connect_signals() -> None:
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_delete, post_save
+    from rest_framework.authtoken.models import Token
+
+    from customers.models import Customer
+    from institutions.models import Employee
+
+    post_delete.connect(_evict_token, sender=Token, dispatch_uid="api-auth-token")
+    post_save.connect(_evict_user, sender=get_user_model(), dispatch_uid="api-auth-user")
+    post_delete.connect(_evict_user, sender=get_user_model(), dispatch_uid="api-auth-user-del")
+    for model in (Customer, Employee):
+        uid = f"api-auth-{model._meta.label_lower}"
+        post_save.connect(_evict_profile_user, sender=model, dispatch_uid=uid)
+        post_delete.connect(_evict_profile_user, sender=model, dispatch_uid=f"{uid}-del")
@@ -0,0 +1,100 @@
+"""
+In-process dispatch for the batch/ endpoint.
+
+Each sub-request is a GET that goes through the URL resolver straight to the target view.
+Middleware is skipped, so the sub-request carries the caller's user as request.user, the way
+AuthenticationMiddleware would set it. Each view then authenticates and checks permissions
+as usual: a token caller's copied Authorization header hits the token cache, and a session
+caller is picked up from request.user by SessionAuthentication; the async read views
+authenticate the same way. Sub-requests only read, so they are independent and run
+concurrently on a small thread pool (each thread uses its own database connection). Inside
+an atomic block (tests, ATOMIC_REQUESTS) the other threads would not see the caller's
+transaction, so the sub-requests run in order instead.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import connection, connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+
+def _sub_request(request, path: str, query: str) -> HttpRequest:
+    sub = HttpRequest()
+    sub.method = "GET"
+    sub.path = sub.path_info = path
+    # Conditional headers belong to the batch request itself, not its parts.
+    sub.META = {k: v for k, v in request.META.items() if not k.startswith("HTTP_IF_")}
+    sub.META.update(
+        REQUEST_METHOD="GET",
+        PATH_INFO=path,
+        QUERY_STRING=query,
+        CONTENT_LENGTH="0",
+        HTTP_ACCEPT="application/json",
+    )
+    sub.GET = QueryDict(query)
+    sub.user = request.user
+    return sub
+
+
+def _body(response):
+    if hasattr(response, "data"):
+        return response.data
+    content = response.content
+    if response.get("Content-Type", "").startswith("application/json") and content:
+        return json.loads(content)
+    return content.decode(response.charset or "utf-8", errors="replace")
+
+
+def _dispatch(request, item: dict, prefix: str) -> dict:
+    started = time.perf_counter()
+    result = {"id": item.get("id") or item["path"]}
+    parts = urlsplit(item["path"])
+    path = parts.path if parts.path.startswith("/") else prefix + parts.path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        match = None
+    if match is None or not path.startswith(prefix) or path == request.path:
+        result.update(status=404, body={"detail": "Not found."})
+    else:
+        view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+        try:
+            response = view(_sub_request(request, path, parts.query), **match.kwargs)
+            if response.streaming:
+                response.close()
+                detail = "Streaming endpoints cannot be batched."
+                result.update(status=400, body={"detail": detail})
+            else:
+                result.update(status=response.status_code, body=_body(response))
+                if response.has_header("ETag"):
+                    result["etag"] = response["ETag"]
+        except Exception:
+            logger.exception("Batch sub-request %s failed", path)
+            result.update(status=500, body={"detail": "Internal server error."})
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _dispatch_in_thread(request, item: dict, prefix: str) -> dict:
+    try:
+        return _dispatch(request, item, prefix)
+    finally:
+        connections.close_all()
+
+
+def run(request, items: list[dict], prefix: str) -> list[dict]:
+    """Results in the order of items; prefix is the API root the relative paths hang off."""
+    workers = min(settings.BATCH_MAX_WORKERS, len(items))
+    if workers <= 1 or connection.in_atomic_block:
+        return [_dispatch(request, item, prefix) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-batch") as pool:
+        return list(pool.map(lambda item: _dispatch_in_thread(request, item, prefix), items))
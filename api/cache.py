@@ -0,0 +1,127 @@
+"""
+Short-TTL caching for computed API payloads.
+
+Entries live under a per-namespace generation number; invalidating a namespace bumps the
+generation so readers (and any in-flight recompute) move to a fresh key instead of racing
+a delete. Generations start at a random number, so one evicted from the cache does not come
+back as a value an earlier reader already used. Misses are coalesced: within a process one
+thread recomputes per key while the rest wait on its lock, and across processes a cache.add()
+lock lets one worker recompute while the others poll for its result.
+"""
+
+import asyncio
+import secrets
+import threading
+import time
+
+from django.core.cache import cache
+
+DASHBOARD_SUMMARY = "dashboard-summary"
+DASHBOARD_SUMMARY_TTL = 30
+
+# Borrower me/ payloads; the suffix carries the customer's version stamp, so a change to their
+# data moves readers to a new key and the old entry simply expires.
+ME_PAYLOAD = "me"
+ME_PAYLOAD_TTL = 300
+
+# Per-user namespaces (f"{AUTH_USER}:{user_id}") checked by api.authentication on every cached
+# principal; bumped when the user's tokens, account or profiles change.
+AUTH_USER = "auth-user"
+
+_COMPUTE_LOCK_TIMEOUT = 10
+_POLL_INTERVAL = 0.05
+
+# Striped so per-customer keys don't grow an unbounded lock table.
+_local_locks = [threading.Lock() for _ in range(64)]
+
+
+def _generation_key(namespace: str) -> str:
+    return f"api:{namespace}:gen"
+
+
+def _initial_generation() -> int:
+    return secrets.randbits(48)
+
+
+def generation(namespace: str) -> int:
+    gen = cache.get(_generation_key(namespace))
+    if gen is None:
+        initial = _initial_generation()
+        cache.add(_generation_key(namespace), initial, timeout=None)
+        gen = cache.get(_generation_key(namespace)) or initial
+    return gen
+
+
+def invalidate(namespace: str) -> None:
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        cache.add(_generation_key(namespace), _initial_generation(), timeout=None)
+
+
+def _local_lock(key: str) -> threading.Lock:
+    return _local_locks[hash(key) % len(_local_locks)]
+
+
+def get_or_compute(namespace: str, compute, ttl: int, suffix: str = ""):
+    """Return the cached value for namespace (+ suffix), computing it at most once per miss."""
+    key = f"api:{namespace}:{generation(namespace)}:{suffix}"
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    with _local_lock(f"{namespace}:{suffix}"):
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, timeout=_COMPUTE_LOCK_TIMEOUT):
+            deadline = time.monotonic() + _COMPUTE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(_POLL_INTERVAL)
+                value = cache.get(key)
+                if value is not None:
+                    return value
+            # The other worker died or is very slow; compute without the lock.
+        try:
+            value = compute()
+            cache.set(key, value, ttl)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+
+async def _ageneration(namespace: str) -> int:
+    gen = await cache.aget(_generation_key(namespace))
+    if gen is None:
+        initial = _initial_generation()
+        await cache.aadd(_generation_key(namespace), initial, timeout=None)
+        gen = await cache.aget(_generation_key(namespace)) or initial
+    return gen
+
+
+async def aget_or_compute(namespace: str, compute, ttl: int, suffix: str = ""):
+    """
+    get_or_compute for async views: compute is a coroutine function. Coalescing relies on the
+    cache.add() lock alone, which also covers concurrent coroutines in this process.
+    """
+    key = f"api:{namespace}:{await _ageneration(namespace)}:{suffix}"
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if not await cache.aadd(lock_key, 1, timeout=_COMPUTE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + _COMPUTE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_INTERVAL)
+            value = await cache.aget(key)
+            if value is not None:
+                return value
+    try:
+        value = await compute()
+        await cache.aset(key, value, ttl)
+    finally:
+        await cache.adelete(lock_key)
+    return value
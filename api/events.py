@@ -0,0 +1,109 @@
+"""
+Side effects of API write paths.
+
+Views call these from inside their transaction.atomic() blocks, next to the ledger postings.
+Rollup bumps join that transaction; cache invalidation is deferred with transaction.on_commit.
+Either way a rolled-back write leaves no trace.
+"""
+
+from django.db import transaction
+from django.db.models import F
+
+from analytics import rollups
+from audit import activity
+from audit.models import ActivityEvent
+from customers.models import Customer
+
+from . import cache as api_cache
+from . import exposure, live
+
+
+def _invalidate_dashboard() -> None:
+    transaction.on_commit(lambda: api_cache.invalidate(api_cache.DASHBOARD_SUMMARY))
+
+
+def _bump_customer_version(customer_id) -> None:
+    """Invalidates the customer's conditional-GET stamps (see api.views.MeView)."""
+    Customer.objects.filter(pk=customer_id).update(data_version=F("data_version") + 1)
+
+
+def _append_activity(event) -> None:
+    event.save()
+    payload = live.activity_payload(event)
+    transaction.on_commit(lambda: live.publish(payload))
+
+
+def payment_recorded(payment) -> None:
+    rollups.record_repayment(payment)
+    exposure.record_repayment(payment)
+    _append_activity(activity.payment_received(payment))
+    _bump_customer_version(payment.loan.application.customer_id)
+    _invalidate_dashboard()
+
+
+def application_submitted(application) -> None:
+    rollups.record_application_status(application, when=application.submitted_at)
+    _bump_customer_version(application.customer_id)
+    _invalidate_dashboard()
+
+
+def applications_submitted(applications) -> None:
+    """application_submitted for a bulk insert (applications/sync/)."""
+    if not applications:
+        return
+    rollups.record_application_statuses(applications)
+    Customer.objects.filter(pk__in={a.customer_id for a in applications}).update(
+        data_version=F("data_version") + 1
+    )
+    _invalidate_dashboard()
+
+
+def application_status_changed(application, previous_status: str, actor=None) -> None:
+    rollups.record_application_status(application, when=application.decided_at)
+    if application.decided_at is not None:
+        _append_activity(activity.application_decided(application, actor=actor))
+    _bump_customer_version(application.customer_id)
+    _invalidate_dashboard()
+
+
+def applications_decided(applications, actor=None) -> None:
+    """
+    application_status_changed for a bulk decision. applications must have customer.user and
+    product loaded (for the activity rows) and share one decided_at.
+    """
+    if not applications:
+        return
+    rollups.record_application_statuses(applications, when=applications[0].decided_at)
+    events = ActivityEvent.objects.bulk_create(
+        [activity.application_decided(a, actor=actor) for a in applications]
+    )
+    payloads = [live.activity_payload(e) for e in events]
+
+    def publish():
+        for payload in payloads:
+            live.publish(payload)
+
+    transaction.on_commit(publish)
+    Customer.objects.filter(pk__in={a.customer_id for a in applications}).update(
+        data_version=F("data_version") + 1
+    )
+    _invalidate_dashboard()
+
+
+def loan_disbursed(loan, actor=None) -> None:
+    rollups.record_disbursement(loan)
+    exposure.record_disbursement(loan)
+    _append_activity(activity.loan_disbursed(loan, actor=actor))
+    _bump_customer_version(loan.application.customer_id)
+    _invalidate_dashboard()
+
+
+def loan_status_changed(loan, previous_status: str) -> None:
+    rollups.record_loan_transition(loan, previous_status)
+    exposure.record_loan_transition(loan, previous_status)
+    _bump_customer_version(loan.application.customer_id)
+    _invalidate_dashboard()
+
+
+def customer_registered(customer) -> None:
+    _append_activity(activity.customer_registered(customer))
@@ -0,0 +1,161 @@
+"""
+Per-customer exposure (loans.CustomerExposure) and the eligibility check that reads it.
+
+The disbursement, repayment and loan status hooks in api.events adjust the customer's row
+through core.counters. Application submit, single and applications/sync/, then reads one row
+by primary key instead of aggregating the customer's loans and payments. No row means the
+customer owes nothing. Only disbursed loans count: pending applications, including earlier
+items of the same sync batch, are not exposure on either path.
+
+Rules, each disabled by 0:
+
+* EXPOSURE_MAX_ACTIVE_LOANS: open (ACTIVE or DEFAULTED) loans a customer may already hold.
+* EXPOSURE_MAX_OUTSTANDING: cap on the outstanding balance plus the requested amount.
+* EXPOSURE_DEFAULT_COOLDOWN_DAYS: days after a default before the customer may apply again.
+
+rebuild() recomputes every row from open loans and their completed payments; a defaulted
+loan's updated_at stands in for its default date.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import serializers
+
+from core.counters import bump
+from loans.models import CustomerExposure, Loan
+from payments.models import LoanPayment
+
+OPEN_STATUSES = (Loan.Status.ACTIVE, Loan.Status.DEFAULTED)
+DEFAULT_STATUSES = (Loan.Status.DEFAULTED, Loan.Status.WRITTEN_OFF)
+
+
+def _adjust(customer_id, loans: int = 0, outstanding=Decimal("0"), defaulted_at=None) -> None:
+    bump(
+        CustomerExposure,
+        {"customer_id": customer_id},
+        values={"last_default_at": defaulted_at} if defaulted_at is not None else None,
+        active_loans=loans,
+        outstanding=outstanding,
+    )
+
+
+def _remaining(loan) -> Decimal:
+    from .serializers import loan_expected_total_repayment
+
+    paid = (
+        LoanPayment.objects.filter(loan=loan, status=LoanPayment.Status.COMPLETED).aggregate(
+            s=Sum("amount")
+        )["s"]
+        or Decimal("0")
+    )
+    return max(loan_expected_total_repayment(loan) - paid, Decimal("0"))
+
+
+def record_disbursement(loan) -> None:
+    from .serializers import loan_expected_total_repayment
+
+    _adjust(
+        loan.application.customer_id,
+        loans=1,
+        outstanding=loan_expected_total_repayment(loan),
+    )
+
+
+def record_repayment(payment) -> None:
+    if payment.status != LoanPayment.Status.COMPLETED:
+        return
+    _adjust(payment.loan.application.customer_id, outstanding=-payment.amount)
+
+
+def record_loan_transition(loan, from_status: str, when=None) -> None:
+    """
+    Call after the loan's status changed and any payment that caused it was saved: a loan
+    that closes takes its remaining balance with it, and that balance must already count
+    the payment (which record_repayment subtracts on its own).
+    """
+    was_open, is_open = from_status in OPEN_STATUSES, loan.status in OPEN_STATUSES
+    defaulted_at = None
+    if loan.status in DEFAULT_STATUSES and from_status not in DEFAULT_STATUSES:
+        defaulted_at = when or timezone.now()
+    if was_open == is_open and defaulted_at is None:
+        return
+    loans, outstanding = 0, Decimal("0")
+    if was_open != is_open:
+        sign = 1 if is_open else -1
+        loans, outstanding = sign, sign * _remaining(loan)
+    _adjust(loan.application.customer_id, loans, outstanding, defaulted_at)
+
+
+def reasons(exposure, amount: Decimal, now=None) -> list[str]:
+    """Why a customer with this exposure (None: no row) may not apply for amount."""
+    if exposure is None:
+        return []
+    out = []
+    max_loans = settings.EXPOSURE_MAX_ACTIVE_LOANS
+    if max_loans and exposure.active_loans >= max_loans:
+        out.append(f"You already have {exposure.active_loans} open loan(s).")
+    max_outstanding = settings.EXPOSURE_MAX_OUTSTANDING
+    if max_outstanding and exposure.outstanding + amount > max_outstanding:
+        out.append("This amount would take your total balance over the allowed limit.")
+    cooldown = settings.EXPOSURE_DEFAULT_COOLDOWN_DAYS
+    if cooldown and exposure.last_default_at is not None:
+        if exposure.last_default_at > (now or timezone.now()) - timedelta(days=cooldown):
+            out.append("A recent loan default prevents new applications for now.")
+    return out
+
+
+def load(customer_id):
+    return CustomerExposure.objects.filter(pk=customer_id).first()
+
+
+def check(exposure, amount: Decimal) -> None:
+    """Raise ValidationError when a customer with this exposure may not apply for amount."""
+    problems = reasons(exposure, amount)
+    if problems:
+        raise serializers.ValidationError({"eligibility": problems})
+
+
+def rebuild(apps=django_apps) -> None:
+    """Replace every exposure row with a full recompute from loans and payments."""
+    from .serializers import loan_expected_total_repayment
+
+    HistoricalLoan = apps.get_model("loans", "Loan")
+    Exposure = apps.get_model("loans", "CustomerExposure")
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    rows: dict = {}
+    open_loans = (
+        HistoricalLoan.objects.filter(status__in=OPEN_STATUSES)
+        .annotate(
+            owner_id=F("application__customer_id"),
+            paid=Coalesce(
+                Sum("payments__amount", filter=Q(payments__status="COMPLETED")),
+                Value(Decimal("0")),
+                output_field=money,
+            ),
+        )
+        .order_by()
+    )
+    for loan in open_loans.iterator():
+        row = rows.setdefault(loan.owner_id, Exposure(customer_id=loan.owner_id))
+        row.active_loans += 1
+        row.outstanding += max(loan_expected_total_repayment(loan) - loan.paid, Decimal("0"))
+    # Loans keep no status history; the last change to a defaulted loan stands in for it.
+    for owner_id, at in (
+        HistoricalLoan.objects.filter(status__in=DEFAULT_STATUSES)
+        .order_by()
+        .values_list("application__customer_id")
+        .annotate(at=Max("updated_at"))
+    ):
+        rows.setdefault(owner_id, Exposure(customer_id=owner_id)).last_default_at = at
+
+    with transaction.atomic():
+        Exposure.objects.all().delete()
+        Exposure.objects.bulk_create(rows.values(), batch_size=1000)
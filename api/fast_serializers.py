@@ -0,0 +1,121 @@
+"""
+Read-only fast path for the large list endpoints.
+
+Produces the same JSON as StaffLoanPaymentSerializer / LoanApplicationListSerializer without
+building model instances or running DRF's per-field to_representation: the database returns
+flat .values() rows (customer name concatenated in SQL) and format_rows() converts decimals
+and datetimes in one loop. tests.FastSerializerParityTests pins the output to the DRF
+serializers; `manage.py bench_read_serializers` measures the gap.
+
+Cursor pagination works on these rows as-is (it reads ordering keys from dicts).
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
+from django.utils import timezone
+
+from .serializers import LoanApplicationListSerializer, StaffLoanPaymentSerializer
+
+_CENTS = Decimal("0.01")
+
+
+def display_name_expr(user_path: str):
+    """SQL for `f"{first_name} {last_name}".strip() or username` on the user at user_path."""
+    full = Trim(
+        Concat(
+            F(f"{user_path}__first_name"),
+            Value(" "),
+            F(f"{user_path}__last_name"),
+            output_field=CharField(),
+        )
+    )
+    return Coalesce(NullIf(full, Value("")), F(f"{user_path}__username"), output_field=CharField())
+
+
+def _format_datetime(value: datetime, tz) -> str:
+    value = value.astimezone(tz).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def format_rows(rows, fields: list[str], money: frozenset, datetimes: frozenset) -> list[dict]:
+    """Render .values() rows the way DRF's DecimalField(2 dp)/DateTimeField/DateField would."""
+    tz = timezone.get_current_timezone()
+    out = []
+    append = out.append
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = row[name]
+            if value is not None:
+                if name in money:
+                    value = format(Decimal(value).quantize(_CENTS), "f")
+                elif name in datetimes:
+                    value = _format_datetime(value, tz)
+                elif isinstance(value, date):
+                    value = value.isoformat()
+            item[name] = value
+        append(item)
+    return out
+
+
+PAYMENT_MONEY = frozenset({"amount"})
+PAYMENT_DATETIMES = frozenset({"paid_at", "created_at"})
+
+
+def payment_values(queryset, fields: set[str] | None = None):
+    """Flat rows for StaffLoanPaymentSerializer fields (always including the ordering keys)."""
+    columns = ["id", "loan_id", "amount", "paid_at", "method", "reference", "status", "created_at"]
+    annotations = {}
+    if fields is None or "customer_name" in fields:
+        annotations["customer_name"] = display_name_expr("loan__application__customer__user")
+    return queryset.select_related(None).values(*columns, **annotations)
+
+
+def payment_rows(rows, fields: set[str] | None = None) -> list[dict]:
+    names = [f for f in StaffLoanPaymentSerializer.Meta.fields if fields is None or f in fields]
+    return format_rows(rows, names, PAYMENT_MONEY, PAYMENT_DATETIMES)
+
+
+APPLICATION_MONEY = frozenset({"requested_amount"})
+APPLICATION_DATETIMES = frozenset({"created_at", "updated_at", "submitted_at", "decided_at"})
+
+
+def application_values(queryset, fields: set[str] | None = None):
+    """Flat rows for LoanApplicationListSerializer fields; joins only what fields need."""
+    columns = [
+        "id",
+        "requested_amount",
+        "tenure_days",
+        "status",
+        "created_at",
+        "updated_at",
+        "submitted_at",
+        "decided_at",
+    ]
+    wanted = set(LoanApplicationListSerializer.Meta.fields) if fields is None else fields
+    annotations = {}
+    if "customer_name" in wanted:
+        annotations["customer_name"] = display_name_expr("customer__user")
+    for name, path in (
+        ("customer_email", "customer__email"),
+        ("customer_phone", "customer__phone_number"),
+        ("national_id_number", "customer__national_id_number"),
+        ("product_code", "product__code"),
+        ("product_name", "product__name"),
+        ("loan_id", "loan__id"),
+    ):
+        if name in wanted:
+            annotations[name] = F(path)
+    return queryset.select_related(None).values(*columns, **annotations)
+
+
+def application_rows(rows, fields: set[str] | None = None) -> list[dict]:
+    names = [
+        f for f in LoanApplicationListSerializer.Meta.fields if fields is None or f in fields
+    ]
+    return format_rows(rows, names, APPLICATION_MONEY, APPLICATION_DATETIMES)
@@ -0,0 +1,229 @@
+"""
+Live staff-portal updates over server-sent events.
+
+Write paths publish each ActivityEvent (see api.events) once its transaction commits; the
+broker gets it to every connected staff client, which each worker holds in its in-process Hub.
+
+Brokers (settings.LIVE_EVENTS_BROKER):
+  "activity-table"  the default. The committed ActivityEvent row is the message: each worker
+                    with open streams polls audit_activityevent once per
+                    LIVE_EVENTS_POLL_INTERVAL seconds and feeds its own hub. A write from
+                    any process (other ASGI workers, the WSGI web process, admin) reaches
+                    clients on all of them at one query per worker per tick.
+  "inprocess"       publish() delivers straight to this process's hub, and nothing else does.
+                    Only correct with a single ASGI worker that also serves every write;
+                    config/gunicorn_asgi.py refuses to start it with more than one worker.
+
+Ids come from a sequence at INSERT time, so a transaction can commit an event below an id
+that has already been read. The poller therefore re-reads everything above the high-water
+mark it had OVERLAP seconds ago and skips ids it has delivered; Last-Event-ID replay re-reads
+the same window behind the client's last event, so a reconnecting client may get an event it
+already has again (same id). Only a write transaction open longer than OVERLAP can still be
+missed.
+
+Browsers' EventSource cannot set an Authorization header. Such clients POST to
+staff/live/ticket/ with their token and open the stream with ?ticket=: a signed user id that
+expires after TICKET_MAX_AGE seconds. The API token itself never goes in a URL, where access
+logs, proxies and browser history would keep it.
+
+The stream needs an ASGI server (config/gunicorn_asgi.py). Under WSGI each open stream would
+pin a worker until it timed out, so staff/live/ answers 503 there and clients keep polling
+staff/activity/.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import timedelta
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+
+from audit.models import ActivityEvent
+
+# Seconds a write transaction may stay open after inserting its ActivityEvent.
+OVERLAP = 30.0
+_QUEUE_SIZE = 100
+_REPLAY_LIMIT = 100
+_TICKET_SALT = "api.live.stream-ticket"
+TICKET_MAX_AGE = 60
+
+
+def issue_ticket(user) -> str:
+    return signing.dumps(user.pk, salt=_TICKET_SALT)
+
+
+def ticket_user_id(ticket: str):
+    """The user id a ticket was issued for, or None if it is forged or expired."""
+    try:
+        return signing.loads(ticket, salt=_TICKET_SALT, max_age=TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+def activity_payload(event: ActivityEvent) -> dict:
+    return {
+        "id": event.pk,
+        "type": event.type,
+        "title": event.title,
+        "subtitle": event.subtitle,
+        "object_id": event.object_id,
+        "at": event.occurred_at.isoformat(),
+    }
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # Slow client: drop; it can catch up with Last-Event-ID on reconnect.
+        pass
+
+
+class Hub:
+    """Subscriber registry for this process. deliver() is safe to call from any thread."""
+
+    def __init__(self):
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def deliver(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # Loop closed under us (worker shutting down).
+                self.unsubscribe(queue)
+
+
+hub = Hub()
+
+
+class InProcessBroker:
+    def publish(self, event: dict) -> None:
+        hub.deliver(event)
+
+    def ensure_listening(self) -> None:
+        pass
+
+
+class ActivityTableBroker:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def publish(self, event: dict) -> None:
+        # The committed ActivityEvent row is the message; pollers pick it up.
+        pass
+
+    def ensure_listening(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        last = await ActivityEvent.objects.order_by("-id").values_list("id", flat=True).afirst()
+        last = last or 0
+        # (when, high-water mark) per tick; the oldest one at least OVERLAP old is the floor.
+        marks = deque([(time.monotonic(), last)])
+        delivered: set[int] = set()
+        while len(hub):
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            while len(marks) > 1 and marks[1][0] <= now - OVERLAP:
+                marks.popleft()
+            floor = marks[0][1]
+            delivered = {pk for pk in delivered if pk > floor}
+            events = (
+                ActivityEvent.objects.filter(id__gt=floor)
+                .exclude(id__in=delivered)
+                .order_by("id")[:500]
+            )
+            async for event in events:
+                hub.deliver(activity_payload(event))
+                delivered.add(event.pk)
+                last = max(last, event.pk)
+            marks.append((now, last))
+
+
+_lock = threading.Lock()
+_brokers: dict[str, object] = {}
+
+
+def get_broker():
+    name = settings.LIVE_EVENTS_BROKER
+    with _lock:
+        if name not in _brokers:
+            if name == "activity-table":
+                _brokers[name] = ActivityTableBroker(settings.LIVE_EVENTS_POLL_INTERVAL)
+            elif name == "inprocess":
+                _brokers[name] = InProcessBroker()
+            else:
+                raise ImproperlyConfigured(f"Unknown LIVE_EVENTS_BROKER {name!r}.")
+        return _brokers[name]
+
+
+def publish(event: dict) -> None:
+    get_broker().publish(event)
+
+
+def _format(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@sync_to_async
+def _replay(after_id: int) -> list[dict]:
+    rows = ActivityEvent.objects.filter(id__gt=after_id)
+    last_seen = ActivityEvent.objects.filter(id=after_id).values_list("created_at", flat=True)
+    if last_seen:
+        # Events committed late, below the client's last id (see the module docstring).
+        overlap = timedelta(seconds=OVERLAP)
+        rows = ActivityEvent.objects.filter(
+            Q(id__gt=after_id) | Q(created_at__gte=last_seen[0] - overlap)
+        ).exclude(id=after_id)
+    return [activity_payload(e) for e in rows.order_by("id")[:_REPLAY_LIMIT]]
+
+
+async def event_stream(last_event_id: str | None = None, heartbeat: float = 15.0):
+    """Async SSE body: optional replay after last_event_id, then live events and keepalives."""
+    queue = hub.subscribe()
+    get_broker().ensure_listening()
+    replayed: set[int] = set()
+    try:
+        yield "retry: 5000\n\n"
+        if last_event_id and last_event_id.isdigit():
+            for event in await _replay(int(last_event_id)):
+                replayed.add(event["id"])
+                yield _format(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event["id"] in replayed:
+                # Already sent during replay.
+                continue
+            yield _format(event)
+    finally:
+        hub.unsubscribe(queue)
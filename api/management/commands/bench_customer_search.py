@@ -0,0 +1,98 @@
+"""
+Time staff search (customers.search) against an unindexed substring scan on a throwaway
+dataset.
+
+Seeds --rows customers inside a transaction that is rolled back at the end, so it is safe to
+point at a development database.
+"""
+
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from customers import search
+from customers.models import Customer
+
+User = get_user_model()
+
+_FIRST = ["Ama", "Kofi", "Akosua", "Kwame", "Efua", "Yaw", "Abena", "Kojo", "Adwoa", "Kwesi"]
+_LAST = ["Mensah", "Owusu", "Boateng", "Asante", "Appiah", "Osei", "Addo", "Ofori", "Darko"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Benchmark indexed customer search against a full substring scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options["rows"])
+                self._run(options["rows"], options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rows: int) -> None:
+        batch = 5000
+        for start in range(0, rows, batch):
+            users = User.objects.bulk_create(
+                User(
+                    username=f"bench-search-{i}",
+                    email=f"bench{i}@example.com",
+                    first_name=_FIRST[i % len(_FIRST)],
+                    last_name=f"{_LAST[i % len(_LAST)]}{i}",
+                )
+                for i in range(start, min(start + batch, rows))
+            )
+            customers = []
+            for user in users:
+                i = int(user.username.rsplit("-", 1)[1])
+                customer = Customer(
+                    user=user,
+                    national_id_number=f"BENCH-{i:09d}",
+                    date_of_birth="1990-01-01",
+                    phone_number=f"02{i:08d}",
+                    email=user.email,
+                    residential_address="Accra",
+                    occupation="Trader",
+                    monthly_income=Decimal("1000.00"),
+                )
+                search.refresh_document(customer, user)
+                customers.append(customer)
+            Customer.objects.bulk_create(customers)
+
+    def _run(self, rows: int, repeat: int) -> None:
+        probe = rows // 2
+        queries = [
+            ("name", f"{_LAST[probe % len(_LAST)]}{probe}".lower()),
+            ("phone suffix", f"{probe:08d}"[-6:]),
+            ("ghana card", f"BENCH-{probe:09d}"),
+            ("email", f"bench{probe}@"),
+        ]
+        self.stdout.write(f"{rows} customers ({search.connection.vendor})")
+        for name, q in queries:
+            indexed = _best_of(repeat, lambda: search.search_ids(q, 20))
+            scan = _best_of(repeat, lambda: search._search_scan(search.normalize_query(q), 20))
+            self.stdout.write(
+                f"{name:<13} indexed {indexed * 1000:8.2f} ms   "
+                f"scan {scan * 1000:8.2f} ms   x{scan / indexed:.1f}"
+            )
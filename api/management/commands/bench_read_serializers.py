@@ -0,0 +1,124 @@
+"""
+Compare the DRF list serializers with api.fast_serializers on a throwaway dataset.
+
+Seeds --rows payments and applications inside a transaction that is rolled back at the end,
+so it is safe to point at a development database.
+"""
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api import fast_serializers
+from api.serializers import LoanApplicationListSerializer, StaffLoanPaymentSerializer
+from customers.models import Customer
+from loans.models import Loan, LoanApplication, LoanProduct
+from payments.models import LoanPayment
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Benchmark DRF vs values()-based serializers for the staff payment/application lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options["rows"])
+                self._run(options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rows: int) -> None:
+        now = timezone.now()
+        user = User.objects.create_user(
+            username="bench-borrower", first_name="Bench", last_name="Borrower"
+        )
+        customer = Customer.objects.create(
+            user=user,
+            national_id_number="BENCH-000000000",
+            date_of_birth="1990-01-01",
+            phone_number="0200000000",
+            residential_address="Accra",
+            occupation="Trader",
+            monthly_income=Decimal("1000.00"),
+        )
+        product = LoanProduct.objects.order_by("pk").first() or LoanProduct.objects.create(
+            name="Bench",
+            code=LoanProduct.Code.QUICK,
+            min_amount=Decimal("50"),
+            max_amount=Decimal("800"),
+            max_tenure_days=90,
+            interest_rate=Decimal("10.00"),
+        )
+        applications = LoanApplication.objects.bulk_create(
+            LoanApplication(
+                customer=customer,
+                product=product,
+                requested_amount=Decimal("100.00") + i,
+                tenure_days=30,
+                status=LoanApplication.Status.SUBMITTED,
+                submitted_at=now,
+            )
+            for i in range(rows)
+        )
+        loan = Loan.objects.create(
+            application=applications[0],
+            principal_amount=Decimal("100.00"),
+            interest_rate=Decimal("10.00"),
+            tenure_months=12,
+            disbursed_at=now,
+            maturity_date=now.date() + timedelta(days=365),
+        )
+        LoanPayment.objects.bulk_create(
+            LoanPayment(loan=loan, amount=Decimal("1.25"), paid_at=now - timedelta(seconds=i))
+            for i in range(rows)
+        )
+
+    def _run(self, repeat: int) -> None:
+        payments = LoanPayment.objects.select_related("loan__application__customer__user")
+        applications = LoanApplication.objects.select_related("customer__user", "product", "loan")
+        cases = [
+            (
+                "payments",
+                lambda: StaffLoanPaymentSerializer(list(payments), many=True).data,
+                lambda: fast_serializers.payment_rows(fast_serializers.payment_values(payments)),
+            ),
+            (
+                "applications",
+                lambda: LoanApplicationListSerializer(list(applications), many=True).data,
+                lambda: fast_serializers.application_rows(
+                    fast_serializers.application_values(applications)
+                ),
+            ),
+        ]
+        for name, drf, fast in cases:
+            drf_seconds = _best_of(repeat, drf)
+            fast_seconds = _best_of(repeat, fast)
+            self.stdout.write(
+                f"{name:<13} drf {drf_seconds * 1000:8.1f} ms   "
+                f"fast {fast_seconds * 1000:8.1f} ms   x{drf_seconds / fast_seconds:.1f}"
+            )
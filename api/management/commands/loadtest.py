@@ -0,0 +1,103 @@
+"""
+HTTP load test for comparing serving profiles, e.g. WSGI against the ASGI profile:
+
+    gunicorn config.wsgi -b 127.0.0.1:8000 &
+    gunicorn config.asgi:application -c config/gunicorn_asgi.py -b 127.0.0.1:8001 &
+    python manage.py loadtest --token <staff token> \\
+        --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001
+
+Each target gets the same closed-loop load: --concurrency clients, each issuing the --path
+requests round-robin for --duration seconds.
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ["products/", "staff/dashboard-summary/", "staff/analytics/summary/"]
+
+
+def _client(base_url: str, paths: list[str], headers: dict, stop_at: float, offset: int):
+    latencies, errors = [], 0
+    with requests.Session() as session:
+        session.headers.update(headers)
+        i = offset
+        while time.monotonic() < stop_at:
+            url = f"{base_url}/api/v1/{paths[i % len(paths)]}"
+            i += 1
+            started = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=30).status_code < 400
+            except requests.RequestException:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+    return latencies, errors
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+class Command(BaseCommand):
+    help = "Closed-loop HTTP load test against one or more running API servers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=base_url, e.g. asgi=http://127.0.0.1:8001 (repeatable)",
+        )
+        parser.add_argument("--path", action="append", help="API path under /api/v1/")
+        parser.add_argument("--token", help="Authorization token sent with every request")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--warmup", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        targets = []
+        for raw in options["target"]:
+            name, sep, url = raw.partition("=")
+            if not sep or not url:
+                raise CommandError(f"--target must be name=base_url, got {raw!r}")
+            targets.append((name, url.rstrip("/")))
+        paths = options["path"] or DEFAULT_PATHS
+        headers = {"Authorization": f"Token {options['token']}"} if options["token"] else {}
+
+        self.stdout.write(
+            f"{options['concurrency']} clients x {options['duration']:g}s over {', '.join(paths)}"
+        )
+        self.stdout.write(
+            f"{'target':<10} {'requests':>9} {'errors':>7} {'req/s':>9} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for name, url in targets:
+            if options["warmup"] > 0:
+                self._run(url, paths, headers, options["concurrency"], options["warmup"])
+            latencies, errors, elapsed = self._run(
+                url, paths, headers, options["concurrency"], options["duration"]
+            )
+            ms = [v * 1000 for v in latencies]
+            self.stdout.write(
+                f"{name:<10} {len(ms):>9} {errors:>7} {len(ms) / elapsed:>9.1f} "
+                f"{_percentile(ms, 50):>8.1f} {_percentile(ms, 95):>8.1f} "
+                f"{_percentile(ms, 99):>8.1f}"
+            )
+
+    def _run(self, url, paths, headers, concurrency: int, duration: float):
+        started = time.monotonic()
+        stop_at = started + duration
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(_client, url, paths, headers, stop_at, n) for n in range(concurrency)
+            ]
+            results = [f.result() for f in futures]
+        elapsed = time.monotonic() - started
+        latencies = [v for lat, _ in results for v in lat]
+        return latencies, sum(e for _, e in results), elapsed
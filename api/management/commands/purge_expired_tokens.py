@@ -0,0 +1,19 @@
+"""Delete API tokens that have expired (see api.tokens)."""
+
+from django.core.management.base import BaseCommand
+
+from api import tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired API tokens in chunks, one short transaction per chunk. Run it "
+        "periodically (e.g. daily) so the token table only holds live tokens."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        purged = tokens.purge_expired(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired token(s)."))
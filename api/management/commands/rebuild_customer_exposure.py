@@ -0,0 +1,16 @@
+"""Recompute every customer's exposure row from loans and payments."""
+
+from django.core.management.base import BaseCommand
+
+from api import exposure
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild loans.CustomerExposure from loans and payments, e.g. after a loan's status "
+        "or a payment was changed in the admin."
+    )
+
+    def handle(self, *args, **options):
+        exposure.rebuild()
+        self.stdout.write(self.style.SUCCESS("Customer exposure rebuilt."))
@@ -60,6 +60,7 @@ class Command(BaseCommand):
             help="Password for demo borrower user (default: demo123)",
         )
 
+    @transaction.atomic
     @transaction.atomic
     def handle(self, *args, **options):
         for p in PRODUCTS:
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware for large API responses only. Bodies under GZIP_MIN_LENGTH bytes are not
+    worth the CPU, and server-sent event streams are left alone so each event is flushed as
+    soon as it is written.
+    """
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+        if not response.streaming and len(response.content) < settings.GZIP_MIN_LENGTH:
+            return response
+        return super().process_response(request, response)
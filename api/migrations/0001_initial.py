@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('authtoken', '0004_alter_tokenproxy_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenExpiry',
+            fields=[
+                ('token', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='expiry', serialize=False, to='authtoken.token')),
+                ('last_used_at', models.DateTimeField(help_text='Recorded at most once per TOKEN_TOUCH_INTERVAL_SECONDS')),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'token expiries',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    """Give tokens issued before expiry existed a full TTL from now rather than expire them."""
+    Token = apps.get_model("authtoken", "Token")
+    TokenExpiry = apps.get_model("api", "TokenExpiry")
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.TOKEN_TTL_SECONDS)
+    rows = [
+        TokenExpiry(token_id=key, last_used_at=now, expires_at=expires_at)
+        for key in Token.objects.filter(expiry__isnull=True).values_list("key", flat=True)
+    ]
+    TokenExpiry.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
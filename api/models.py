@@ -0,0 +1,27 @@
+"""
+Lifetime of API tokens; see api.tokens.
+
+rest_framework.authtoken.Token only records when it was created, so each token gets a row
+here with its last use and the moment it expires.
+"""
+
+from django.db import models
+
+
+class TokenExpiry(models.Model):
+    token = models.OneToOneField(
+        "authtoken.Token",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="expiry",
+    )
+    last_used_at = models.DateTimeField(
+        help_text="Recorded at most once per TOKEN_TOUCH_INTERVAL_SECONDS"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name_plural = "token expiries"
+
+    def __str__(self):
+        return f"{self.token_id[:8]}… expires {self.expires_at:%Y-%m-%d %H:%M}"
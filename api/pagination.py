@@ -0,0 +1,137 @@
+import json
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination
+
+
+def approximate_count(queryset) -> int:
+    """
+    Row estimate without a full COUNT(*) where the database can give one: Postgres planner
+    statistics (pg_class.reltuples for a bare table, EXPLAIN's row estimate otherwise).
+    Other backends fall back to an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _reversed(ordering: tuple) -> tuple:
+    return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in ordering)
+
+
+class DefaultCursorPagination(CursorPagination):
+    """
+    Project-wide keyset paging. Orders like the view's queryset (e.g. -created_at), with the
+    primary key appended as a tiebreak, so every page is an index range scan on the ordering
+    columns. The cursor carries the last row's value for every ordering column, tiebreak
+    included, so rows sharing a timestamp or amount page by id instead of by an offset.
+    ?page_size= is capped at max_page_size; ?count=1 adds an approximate total.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    count_query_param = "count"
+
+    def get_ordering(self, request, queryset, view):
+        if any(issubclass(b, OrderingFilter) for b in getattr(view, "filter_backends", [])):
+            ordering = super().get_ordering(request, queryset, view)
+        else:
+            ordering = tuple(f for f in queryset.query.order_by if isinstance(f, str))
+            ordering = ordering or tuple(self.ordering)
+        if not any(f.lstrip("-") in ("id", "pk") for f in ordering):
+            ordering += ("-id" if ordering[0].startswith("-") else "id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true", "approx"):
+            self.count = approximate_count(queryset)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        # As CursorPagination.paginate_queryset, but filtering on the whole keyset rather
+        # than on the first ordering column alone.
+        ordering = _reversed(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after(ordering, current_position))
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(results[-1], self.ordering)
+
+        started = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = started, following is not None
+            self.next_position, self.previous_position = current_position, following
+        else:
+            self.has_next, self.has_previous = following is not None, started
+            self.next_position, self.previous_position = following, current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values, separators=(",", ":"))
+
+    def _after(self, ordering, position) -> Q:
+        """Rows past position in ordering: (a, b) > (x, y) spelled out per column direction."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        after = None
+        for field, value in reversed(list(zip(ordering, values))):
+            name = field.lstrip("-")
+            past = Q(**{f"{name}__{'lt' if field.startswith('-') else 'gt'}": value})
+            after = past if after is None else past | (Q(**{name: value}) & after)
+        # The inclusive bound on the leading column keeps this a range scan on its index.
+        first = ordering[0]
+        bound = f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}"
+        return Q(**{bound: values[0]}) & after
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data["count"] = self.count
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count"] = {"type": "integer", "example": 123}
+        return schema
@@ -0,0 +1,205 @@
+"""
+Password checks for the token endpoints, run on a small bounded thread pool.
+
+PBKDF2 is slow on purpose. Hashed on the request threads, a morning login burst can keep
+every worker busy hashing while other API calls queue behind it. Here each check runs on one
+process-wide pool of PASSWORD_VERIFY_WORKERS threads. hashlib releases the GIL while it
+hashes, so those threads use other cores and leave the interpreter to the rest of the API.
+Each endpoint may have at most PASSWORD_VERIFY_CONCURRENCY[endpoint] checks running at once
+across all workers. The slots are leases in the PASSWORD_VERIFY_CACHE cache (cache.add on one
+key per slot, so a worker that dies mid-check frees its slot after _LEASE seconds). Under the
+sync gunicorn workers each process serves one request at a time, so only a shared cache makes
+the bound mean anything; a per-process cache only limits threaded or ASGI workers. A login
+that cannot get a slot within PASSWORD_VERIFY_QUEUE_TIMEOUT seconds gets a 429 instead of
+piling up.
+
+The user row is read on the request thread; pool threads have their own database connections
+and would not see the request's transaction. When a check succeeds against a hash the
+preferred hasher would not produce today (e.g. fewer iterations than
+PASSWORD_PBKDF2_ITERATIONS, see core.hashers), the pool re-hashes the password in the same
+slot and the request thread saves it: Django's transparent upgrade, moved off the request
+thread.
+
+stats() reports per-endpoint counts and queue/verify times for this process, and the "api"
+logger gets them every PASSWORD_VERIFY_STATS_INTERVAL seconds plus a warning for each login
+refused for want of a slot. Each login also returns its own timings in a Server-Timing header.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers, user_login_failed
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a slot held by a worker that died mid-check frees itself.
+_LEASE = 60
+_POLL = 0.01
+
+
+class LoginBusy(Throttled):
+    default_detail = "Too many sign-ins in progress. Try again shortly."
+
+
+class Timing(NamedTuple):
+    queue: float
+    verify: float
+
+    def header(self) -> str:
+        return f"queue;dur={self.queue * 1000:.1f}, verify;dur={self.verify * 1000:.1f}"
+
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_stats: dict[str, dict] = {}
+_logged_at = time.monotonic()
+_COUNTERS = ("verified", "rejected", "queue_total", "queue_max", "verify_total")
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_VERIFY_WORKERS, thread_name_prefix="password"
+            )
+        return _executor
+
+
+class Slots:
+    """PASSWORD_VERIFY_CONCURRENCY[endpoint] leases in the shared cache."""
+
+    def __init__(self, endpoint: str):
+        self.cache = caches[settings.PASSWORD_VERIFY_CACHE]
+        self.keys = [
+            f"password-slot:{endpoint}:{n}"
+            for n in range(settings.PASSWORD_VERIFY_CONCURRENCY[endpoint])
+        ]
+
+    def acquire(self, timeout: float):
+        """The key of a free slot, taken; None if none frees up within timeout."""
+        holder = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        while True:
+            for key in self.keys:
+                if self.cache.add(key, holder, timeout=_LEASE):
+                    return key
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(_POLL)
+
+    def release(self, key: str) -> None:
+        self.cache.delete(key)
+
+
+def _record(endpoint: str, queue: float, verify: float | None) -> None:
+    global _logged_at
+    with _lock:
+        s = _stats.setdefault(endpoint, dict.fromkeys(_COUNTERS, 0))
+        s["queue_total"] += queue
+        s["queue_max"] = max(s["queue_max"], queue)
+        if verify is None:
+            s["rejected"] += 1
+        else:
+            s["verified"] += 1
+            s["verify_total"] += verify
+        now = time.monotonic()
+        due = now - _logged_at >= settings.PASSWORD_VERIFY_STATS_INTERVAL
+        if due:
+            _logged_at = now
+    if verify is None:
+        logger.warning("Password check refused on %s after %.1fs in the queue", endpoint, queue)
+    if due:
+        logger.info("Password checks in this process: %s", stats())
+
+
+def stats() -> dict:
+    """Per endpoint: checks run, checks refused for want of a slot, and times in ms."""
+    with _lock:
+        out = {}
+        for endpoint, s in _stats.items():
+            waited = s["verified"] + s["rejected"]
+            out[endpoint] = {
+                "verified": s["verified"],
+                "rejected": s["rejected"],
+                "queue_avg_ms": round(s["queue_total"] / waited * 1000, 1) if waited else 0.0,
+                "queue_max_ms": round(s["queue_max"] * 1000, 1),
+                "verify_avg_ms": (
+                    round(s["verify_total"] / s["verified"] * 1000, 1) if s["verified"] else 0.0
+                ),
+            }
+        return out
+
+
+def reset_stats() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    return started, fn(*args), time.perf_counter()
+
+
+def _run(endpoint: str, fn, *args):
+    slots = Slots(endpoint)
+    queued = time.perf_counter()
+    slot = slots.acquire(timeout=settings.PASSWORD_VERIFY_QUEUE_TIMEOUT)
+    if slot is None:
+        _record(endpoint, time.perf_counter() - queued, None)
+        raise LoginBusy(wait=1)
+    try:
+        started, result, finished = _pool().submit(_timed, fn, *args).result()
+    finally:
+        slots.release(slot)
+    timing = Timing(queue=started - queued, verify=finished - started)
+    _record(endpoint, timing.queue, timing.verify)
+    return result, timing
+
+
+def _verify(password: str, encoded: str):
+    """(matches, upgraded hash or None); runs on the pool."""
+    if not hashers.check_password(password, encoded):
+        return False, None
+    preferred = hashers.get_hasher()
+    hasher = hashers.identify_hasher(encoded)
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, hashers.make_password(password, hasher=preferred)
+    return True, None
+
+
+def authenticate(request, endpoint: str, username: str, password: str):
+    """
+    ModelBackend's username/password check with the hashing on the pool.
+
+    Returns (user or None, Timing). Raises LoginBusy when no slot frees up in time.
+    """
+    User = get_user_model()
+    try:
+        user = User._default_manager.get_by_natural_key(username)
+    except User.DoesNotExist:
+        # Hash anyway so unknown usernames take as long as wrong passwords.
+        _, timing = _run(endpoint, hashers.make_password, password)
+        user = None
+    else:
+        (ok, upgraded), timing = _run(endpoint, _verify, password, user.password)
+        if upgraded:
+            user.password = upgraded
+            user.save(update_fields=["password"])
+        if not ok or not user.is_active:
+            user = None
+    if user is None:
+        user_login_failed.send(
+            sender=__name__,
+            credentials={"username": username, "password": "********************"},
+            request=request,
+        )
+    return user, timing
+
@@ -1,17 +1,24 @@
 from decimal import Decimal
 
-from django.contrib.auth import authenticate, get_user_model
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Lower
 from django.utils import timezone
 from rest_framework import serializers
 
+from audit.models import ActivityEvent
+from customers import search as customer_search
 from customers.models import Customer, CustomerConsent
 from institutions.models import Employee, FinancialInstitution
 from ledger.models import LedgerAccount, LedgerEntry
-from loans.models import Loan, LoanApplication, LoanProduct
+from loans.models import CustomerExposure, Loan, LoanApplication, LoanProduct
 from payments.models import LoanPayment
+from sync import changes
+
+from . import authentication, exposure, passwords
 
 User = get_user_model()
 
@@ -26,14 +33,39 @@ def loan_expected_total_repayment(loan: Loan) -> Decimal:
     )
 
 
-class StaffAuthTokenSerializer(serializers.Serializer):
-    """
-    Staff token login: accept Django username or email.
-    Default AuthTokenSerializer only checks USERNAME_FIELD; superusers often log in with email
-    while their username differs (e.g. createsuperuser).
-    """
+# SQL counterpart of loan_expected_total_repayment, scaled by 1200 (100 for the rate, 12 for
+# the tenor) so SQLite's integer arithmetic never truncates. Sum it, then divide once.
+EXPECTED_REPAYMENT_SCALE = Decimal("1200")
 
-    username = serializers.CharField(label="Username or email", write_only=True)
+
+def loan_expected_total_repayment_scaled_expr(prefix: str = ""):
+    return ExpressionWrapper(
+        F(f"{prefix}principal_amount")
+        * (Value(Decimal("100")) + F(f"{prefix}interest_rate"))
+        * F(f"{prefix}tenure_months"),
+        output_field=DecimalField(max_digits=24, decimal_places=4),
+    )
+
+
+def loan_total_paid_subquery(loan_ref: str = "pk"):
+    """Correlated SUM of COMPLETED payments for the loan at loan_ref; 0 when none."""
+    paid = (
+        LoanPayment.objects.filter(loan=OuterRef(loan_ref), status=LoanPayment.Status.COMPLETED)
+        .order_by()
+        .values("loan")
+        .annotate(s=Sum("amount"))
+        .values("s")
+    )
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return Coalesce(Subquery(paid, output_field=money), Value(Decimal("0")), output_field=money)
+
+
+class _PasswordLoginSerializer(serializers.Serializer):
+    """Username/password check for the token endpoints; hashing runs on api.passwords' pool."""
+
+    endpoint = None
+
+    username = serializers.CharField(label="Username", write_only=True)
     password = serializers.CharField(
         label="Password",
         style={"input_type": "password"},
@@ -41,6 +73,9 @@ class StaffAuthTokenSerializer(serializers.Serializer):
         write_only=True,
     )
 
+    def auth_username(self, username: str) -> str:
+        return username
+
     def validate(self, attrs):
         username = (attrs.get("username") or "").strip()
         password = attrs.get("password")
@@ -51,16 +86,11 @@ class StaffAuthTokenSerializer(serializers.Serializer):
                 code="authorization",
             )
 
-        auth_username = username
-        if "@" in username:
-            u = User.objects.filter(email__iexact=username).first()
-            if u is not None:
-                auth_username = u.username
-
-        user = authenticate(
-            request=self.context.get("request"),
-            username=auth_username,
-            password=password,
+        user, timing = passwords.authenticate(
+            self.context.get("request"),
+            self.endpoint,
+            self.auth_username(username),
+            password,
         )
         if not user:
             raise serializers.ValidationError(
@@ -69,9 +99,35 @@ class StaffAuthTokenSerializer(serializers.Serializer):
             )
 
         attrs["user"] = user
+        attrs["timing"] = timing
         return attrs
 
 
+class StaffAuthTokenSerializer(_PasswordLoginSerializer):
+    """
+    Staff token login: accept Django username or email.
+    Default AuthTokenSerializer only checks USERNAME_FIELD; superusers often log in with email
+    while their username differs (e.g. createsuperuser).
+    """
+
+    endpoint = "staff"
+
+    username = serializers.CharField(label="Username or email", write_only=True)
+
+    def auth_username(self, username: str) -> str:
+        if "@" in username:
+            u = User.objects.email_matches(username).first()
+            if u is not None:
+                return u.username
+        return username
+
+
+class CustomerAuthTokenSerializer(_PasswordLoginSerializer):
+    """Borrower token login by username (the sign-up email)."""
+
+    endpoint = "customer"
+
+
 class UserSelfSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -87,9 +143,9 @@ class CustomerRegisterSerializer(serializers.Serializer):
 
     def validate_email(self, value):
         e = value.strip().lower()
-        if User.objects.filter(email__iexact=e).exists():
+        if User.objects.email_matches(e).exists():
             raise serializers.ValidationError("An account with this email already exists.")
-        if User.objects.filter(username__iexact=e).exists():
+        if User.objects.username_matches(e).exists():
             raise serializers.ValidationError("An account with this email already exists.")
         return e
 
@@ -153,7 +209,79 @@ class ApplicationSubmitSerializer(serializers.Serializer):
         return value
 
 
-class LoanApplicationListSerializer(serializers.ModelSerializer):
+class CustomerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = (
+            "id",
+            "national_id_type",
+            "national_id_number",
+            "date_of_birth",
+            "phone_number",
+            "email",
+            "residential_address",
+            "occupation",
+            "monthly_income",
+            "status",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = ("id", "national_id_number", "created_at", "updated_at")
+
+
+def _csv_param(request, name: str) -> set[str]:
+    if request is None:
+        return set()
+    raw = request.query_params.get(name, "")
+    return {f.strip() for f in raw.split(",") if f.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for read serializers: ?fields=a,b keeps only those fields, ?omit=a,b
+    drops them, and ?expand=x nests the related object for names in Meta.expandable_fields
+    ({name: (serializer class, source)}). Taken from the context request, or passed as
+    fields=/omit=/expand= kwargs; a name the serializer does not have is a 400. Views call
+    requested_fields() to skip joins and annotations the response will not use.
+    """
+
+    @classmethod
+    def requested_fields(cls, request=None, fields=None, omit=None, expand=None) -> set[str]:
+        fields = set(fields) if fields is not None else _csv_param(request, "fields")
+        omit = set(omit) if omit is not None else _csv_param(request, "omit")
+        expand = set(expand) if expand is not None else _csv_param(request, "expand")
+        expandable = set(getattr(cls.Meta, "expandable_fields", {}))
+        known = set(cls.Meta.fields) | expandable
+        errors = {}
+        for param, names, allowed in (
+            ("fields", fields, known),
+            ("omit", omit, known),
+            ("expand", expand, expandable),
+        ):
+            if unknown := names - allowed:
+                errors[param] = [f"Unknown field(s): {', '.join(sorted(unknown))}."]
+        if errors:
+            raise serializers.ValidationError(errors)
+        names = fields or (set(cls.Meta.fields) | expand)
+        return (names & (set(cls.Meta.fields) | expand)) - omit
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        omit = kwargs.pop("omit", None)
+        expand = kwargs.pop("expand", None)
+        super().__init__(*args, **kwargs)
+        keep = self.requested_fields(self.context.get("request"), fields, omit, expand)
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name, (serializer_class, source) in expandable.items():
+            if name in keep:
+                extra = {"source": source} if source != name else {}
+                self.fields[name] = serializer_class(read_only=True, **extra)
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+
+class LoanApplicationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product_code = serializers.CharField(source="product.code", read_only=True)
     product_name = serializers.CharField(source="product.name", read_only=True)
     customer_name = serializers.SerializerMethodField()
@@ -182,6 +310,10 @@ class LoanApplicationListSerializer(serializers.ModelSerializer):
             "loan_id",
         )
         read_only_fields = fields
+        expandable_fields = {
+            "customer": (CustomerSerializer, "customer"),
+            "product": (LoanProductSerializer, "product"),
+        }
 
     def get_customer_name(self, obj):
         u = obj.customer.user
@@ -202,7 +334,18 @@ class LoanApplicationStaffUpdateSerializer(serializers.ModelSerializer):
         extra_kwargs = {"status": {"required": True}}
 
 
-class LoanListSerializer(serializers.ModelSerializer):
+def _loan_total_paid(obj) -> Decimal:
+    """Uses the total_paid_amount annotation (loan_total_paid_subquery) when the view added it."""
+    paid = getattr(obj, "total_paid_amount", None)
+    if paid is None:
+        paid = (
+            obj.payments.filter(status=LoanPayment.Status.COMPLETED).aggregate(s=Sum("amount"))["s"]
+            or Decimal("0")
+        )
+    return Decimal(paid)
+
+
+class LoanListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product_code = serializers.CharField(source="application.product.code", read_only=True)
     customer_name = serializers.SerializerMethodField()
     application_id = serializers.IntegerField(source="application.id", read_only=True)
@@ -229,6 +372,7 @@ class LoanListSerializer(serializers.ModelSerializer):
             "outstanding_balance",
         )
         read_only_fields = fields
+        expandable_fields = {"customer": (CustomerSerializer, "application.customer")}
 
     def get_customer_name(self, obj):
         u = obj.application.customer.user
@@ -236,22 +380,14 @@ class LoanListSerializer(serializers.ModelSerializer):
         return name or u.username
 
     def get_total_paid(self, obj):
-        t = (
-            obj.payments.filter(status=LoanPayment.Status.COMPLETED).aggregate(s=Sum("amount"))["s"]
-            or Decimal("0")
-        )
-        return str(t.quantize(Decimal("0.01")))
+        return str(_loan_total_paid(obj).quantize(Decimal("0.01")))
 
     def get_total_repayment_due(self, obj):
         return str(loan_expected_total_repayment(obj))
 
     def get_outstanding_balance(self, obj):
         due = loan_expected_total_repayment(obj)
-        paid = (
-            obj.payments.filter(status=LoanPayment.Status.COMPLETED).aggregate(s=Sum("amount"))["s"]
-            or Decimal("0")
-        )
-        out = max(Decimal("0"), due - paid)
+        out = max(Decimal("0"), due - _loan_total_paid(obj))
         return str(out.quantize(Decimal("0.01")))
 
 
@@ -265,6 +401,73 @@ class DisburseLoanSerializer(serializers.Serializer):
     maturity_date = serializers.DateField(required=False, allow_null=True)
 
 
+class ApplicationSyncRequestSerializer(serializers.Serializer):
+    # Items are validated one by one in the view so a bad item does not reject the batch.
+    applications = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_applications(self, value):
+        limit = settings.APPLICATION_SYNC_MAX_ITEMS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} applications per sync.")
+        return value
+
+
+DECISION_STATUSES = (
+    LoanApplication.Status.APPROVED,
+    LoanApplication.Status.REJECTED,
+    LoanApplication.Status.CANCELLED,
+)
+
+
+class ApplicationDecisionItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=DECISION_STATUSES)
+    justification = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class ApplicationDecisionsSerializer(serializers.Serializer):
+    decisions = ApplicationDecisionItemSerializer(many=True, allow_empty=False)
+
+    def validate_decisions(self, value):
+        limit = settings.APPLICATION_DECISIONS_MAX_ITEMS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} decisions per request.")
+        return value
+
+
+class StaffSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=customer_search.MIN_QUERY_LENGTH, max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    """sync/ query string: a cursor per resource (omit all four to start from scratch)."""
+
+    applications = serializers.IntegerField(min_value=0, required=False)
+    loans = serializers.IntegerField(min_value=0, required=False)
+    payments = serializers.IntegerField(min_value=0, required=False)
+    customers = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        return min(value, settings.SYNC_MAX_LIMIT)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=100, required=False)
+    path = serializers.CharField(max_length=2000)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        limit = settings.BATCH_MAX_REQUESTS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} sub-requests per batch.")
+        return value
+
+
 class CustomerPaymentCreateSerializer(serializers.Serializer):
     loan_id = serializers.IntegerField(min_value=1)
     amount = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -332,7 +535,7 @@ class LedgerEntrySerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class CollectionsLoanSerializer(serializers.ModelSerializer):
+class CollectionsLoanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.SerializerMethodField()
     customer_phone = serializers.CharField(source="application.customer.phone_number", read_only=True)
     customer_email = serializers.EmailField(source="application.customer.email", read_only=True)
@@ -354,6 +557,7 @@ class CollectionsLoanSerializer(serializers.ModelSerializer):
             "outstanding_balance",
         )
         read_only_fields = fields
+        expandable_fields = {"customer": (CustomerSerializer, "application.customer")}
 
     def get_customer_name(self, obj):
         u = obj.application.customer.user
@@ -362,11 +566,16 @@ class CollectionsLoanSerializer(serializers.ModelSerializer):
 
     def get_outstanding_balance(self, obj):
         due = loan_expected_total_repayment(obj)
-        paid = (
-            obj.payments.filter(status=LoanPayment.Status.COMPLETED).aggregate(s=Sum("amount"))["s"]
-            or Decimal("0")
-        )
-        return str(max(Decimal("0"), due - paid).quantize(Decimal("0.01")))
+        return str(max(Decimal("0"), due - _loan_total_paid(obj)).quantize(Decimal("0.01")))
+
+
+class ActivityEventSerializer(serializers.ModelSerializer):
+    at = serializers.DateTimeField(source="occurred_at", read_only=True)
+
+    class Meta:
+        model = ActivityEvent
+        fields = ("id", "type", "title", "subtitle", "object_id", "at")
+        read_only_fields = fields
 
 
 class FinancialInstitutionSerializer(serializers.ModelSerializer):
@@ -415,26 +624,6 @@ class StaffEmployeeCreateSerializer(serializers.Serializer):
     role = serializers.ChoiceField(choices=Employee.Role.choices)
 
 
-class CustomerSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Customer
-        fields = (
-            "id",
-            "national_id_type",
-            "national_id_number",
-            "date_of_birth",
-            "phone_number",
-            "email",
-            "residential_address",
-            "occupation",
-            "monthly_income",
-            "status",
-            "created_at",
-            "updated_at",
-        )
-        read_only_fields = ("id", "national_id_number", "created_at", "updated_at")
-
-
 class CustomerUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
@@ -462,39 +651,96 @@ def split_full_name(full_name: str) -> tuple[str, str]:
     return parts[0], " ".join(parts[1:])
 
 
-def create_application_from_validated(validated: dict) -> LoanApplication:
-    code = PRODUCT_SLUG_TO_CODE[validated["selectedProduct"]]
-    product = LoanProduct.objects.get(code=code)
+def _application_terms(validated: dict, product: LoanProduct) -> tuple[Decimal, int]:
+    """Requested amount (checked against the product limits) and tenure in days."""
     amount = Decimal(validated["loanAmount"])
     if amount < product.min_amount or amount > product.max_amount:
         raise serializers.ValidationError(
             {"loanAmount": f"Amount must be between {product.min_amount} and {product.max_amount}."}
         )
-
     tenure_days = min(int(product.max_tenure_days), 180)
     if tenure_days < 1:
         tenure_days = 30
+    return amount, tenure_days
+
+
+def _check_applicant_user(user) -> None:
+    if not user.is_customer():
+        raise serializers.ValidationError(
+            {"email": "This email is already registered with a different account type."}
+        )
+
+
+def _check_card_owner(existing_by_card, user) -> None:
+    if existing_by_card is None:
+        return
+    if existing_by_card.user_id is None:
+        # Planned in the same sync batch, both user and customer still unsaved.
+        other = existing_by_card.user is not user
+    else:
+        other = existing_by_card.user_id != user.id
+    if other:
+        raise serializers.ValidationError(
+            {"ghanaCardNumber": "This Ghana Card is already linked to another account."}
+        )
+
+
+def _profile_card_is_pending(customer: Customer, national_id: str) -> bool:
+    """True for a PENDING- placeholder card; raises if the profile has a different real card."""
+    profile_id = customer.national_id_number.strip().upper()
+    pending_profile = profile_id.startswith("PENDING-")
+    if not pending_profile and profile_id != national_id:
+        raise serializers.ValidationError(
+            {"ghanaCardNumber": "Ghana Card does not match the profile for this email."}
+        )
+    return pending_profile
+
+
+def _new_applicant_user(email: str, first: str, last: str):
+    user = User(
+        username=email,
+        email=email,
+        first_name=first[:150],
+        last_name=last[:150],
+        type=User.UserType.CUSTOMER,
+    )
+    user.set_unusable_password()
+    return user
+
+
+def _new_applicant_customer(user, validated: dict, national_id: str, email: str) -> Customer:
+    return Customer(
+        user=user,
+        national_id_type=Customer.IDType.GHANACARD,
+        national_id_number=national_id,
+        date_of_birth=validated["dateOfBirth"],
+        phone_number=validated["phone"].strip(),
+        email=email,
+        residential_address="Provided at application — update in profile",
+        occupation="Applicant",
+        monthly_income=Decimal("0.00"),
+        status=Customer.Status.ACTIVE,
+    )
+
+
+APPLICATION_CONSENT_VERSION = "2025-01"
+
+
+def create_application_from_validated(validated: dict) -> LoanApplication:
+    code = PRODUCT_SLUG_TO_CODE[validated["selectedProduct"]]
+    product = LoanProduct.objects.get(code=code)
+    amount, tenure_days = _application_terms(validated, product)
 
     first, last = split_full_name(validated["fullName"])
     email = validated["email"].strip().lower()
 
     with transaction.atomic():
-        user = User.objects.filter(email__iexact=email).first()
+        user = User.objects.email_matches(email).first()
         if user is None:
-            user = User(
-                username=email,
-                email=email,
-                first_name=first[:150],
-                last_name=last[:150],
-                type=User.UserType.CUSTOMER,
-            )
-            user.set_unusable_password()
+            user = _new_applicant_user(email, first, last)
             user.save()
         else:
-            if not user.is_customer():
-                raise serializers.ValidationError(
-                    {"email": "This email is already registered with a different account type."}
-                )
+            _check_applicant_user(user)
             if first:
                 user.first_name = first[:150]
             if last:
@@ -502,21 +748,12 @@ def create_application_from_validated(validated: dict) -> LoanApplication:
             user.save(update_fields=["first_name", "last_name"])
 
         national_id = validated["ghanaCardNumber"].strip().upper()
-
-        existing_by_card = Customer.objects.filter(national_id_number=national_id).first()
-        if existing_by_card and existing_by_card.user_id != user.id:
-            raise serializers.ValidationError(
-                {"ghanaCardNumber": "This Ghana Card is already linked to another account."}
-            )
+        _check_card_owner(Customer.objects.filter(national_id_number=national_id).first(), user)
 
         if hasattr(user, "customer_profile"):
             customer = user.customer_profile
-            profile_id = customer.national_id_number.strip().upper()
-            pending_profile = profile_id.startswith("PENDING-")
-            if not pending_profile and profile_id != national_id:
-                raise serializers.ValidationError(
-                    {"ghanaCardNumber": "Ghana Card does not match the profile for this email."}
-                )
+            exposure.check(exposure.load(customer.pk), amount)
+            pending_profile = _profile_card_is_pending(customer, national_id)
             customer.phone_number = validated["phone"].strip()
             customer.email = email
             customer.date_of_birth = validated["dateOfBirth"]
@@ -526,18 +763,8 @@ def create_application_from_validated(validated: dict) -> LoanApplication:
                 update_fields.append("national_id_number")
             customer.save(update_fields=update_fields)
         else:
-            customer = Customer.objects.create(
-                user=user,
-                national_id_type=Customer.IDType.GHANACARD,
-                national_id_number=national_id,
-                date_of_birth=validated["dateOfBirth"],
-                phone_number=validated["phone"].strip(),
-                email=email,
-                residential_address="Provided at application — update in profile",
-                occupation="Applicant",
-                monthly_income=Decimal("0.00"),
-                status=Customer.Status.ACTIVE,
-            )
+            customer = _new_applicant_customer(user, validated, national_id, email)
+            customer.save()
 
         application = LoanApplication.objects.create(
             customer=customer,
@@ -546,13 +773,206 @@ def create_application_from_validated(validated: dict) -> LoanApplication:
             tenure_days=tenure_days,
             status=LoanApplication.Status.SUBMITTED,
             submitted_at=timezone.now(),
+            client_reference=validated.get("clientRef") or None,
         )
 
         CustomerConsent.objects.get_or_create(
             customer=customer,
             consent_type=CustomerConsent.ConsentType.TERMS_AND_CONDITIONS,
-            version="2025-01",
+            version=APPLICATION_CONSENT_VERSION,
             defaults={},
         )
 
     return application
+
+
+class ApplicationSyncItemSerializer(ApplicationSubmitSerializer):
+    clientRef = serializers.CharField(max_length=64, required=False, allow_blank=True)
+
+
+class _ApplicationBatch:
+    """
+    Bulk counterpart of create_application_from_validated for applications/sync/.
+
+    Prefetches every referenced product, user (by email), customer (by Ghana Card) and
+    consent up front, then walks the items in order with the same checks, so the result
+    matches submitting them one by one. As there, the exposure check reads loans only, so an
+    earlier item for the same customer does not count against a later one. New and changed
+    rows are collected and written with bulk_create/bulk_update.
+    """
+
+    def __init__(self, items: list[dict]):
+        emails = {v["email"].strip().lower() for v in items}
+        cards = {v["ghanaCardNumber"].strip().upper() for v in items}
+        codes = {PRODUCT_SLUG_TO_CODE[v["selectedProduct"]] for v in items}
+        refs = {v["clientRef"] for v in items if v.get("clientRef")}
+
+        self.products = {p.code: p for p in LoanProduct.objects.filter(code__in=codes)}
+        self.users = {}
+        for user in (
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails)
+            .select_related("customer_profile")
+            .order_by("pk")
+        ):
+            self.users.setdefault(user.email_lower, user)
+        self.customers_by_card = {
+            c.national_id_number: c
+            for c in Customer.objects.filter(national_id_number__in=cards)
+        }
+        self.profiles = {
+            user.pk: user.customer_profile
+            for user in self.users.values()
+            if hasattr(user, "customer_profile")
+        }
+        self.exposures = CustomerExposure.objects.in_bulk(
+            [c.pk for c in self.profiles.values()]
+        )
+        self.consented = set(
+            CustomerConsent.objects.filter(
+                customer__in=list(self.profiles.values()) + list(self.customers_by_card.values()),
+                consent_type=CustomerConsent.ConsentType.TERMS_AND_CONDITIONS,
+                version=APPLICATION_CONSENT_VERSION,
+            ).values_list("customer_id", flat=True)
+        )
+        self.existing_refs = dict(
+            LoanApplication.objects.filter(client_reference__in=refs).values_list(
+                "client_reference", "pk"
+            )
+        )
+
+        self.new_users, self.changed_users = [], {}
+        self.new_customers, self.changed_customers = [], {}
+        self.applications, self.consents = [], []
+        self.now = timezone.now()
+
+    def add(self, validated: dict) -> LoanApplication:
+        """Plan one item; raises ValidationError (nothing planned) when it would fail alone."""
+        code = PRODUCT_SLUG_TO_CODE[validated["selectedProduct"]]
+        product = self.products.get(code)
+        if product is None:
+            raise serializers.ValidationError({"selectedProduct": "Unknown product."})
+        amount, tenure_days = _application_terms(validated, product)
+
+        first, last = split_full_name(validated["fullName"])
+        email = validated["email"].strip().lower()
+        national_id = validated["ghanaCardNumber"].strip().upper()
+
+        user = self.users.get(email)
+        if user is not None:
+            _check_applicant_user(user)
+        new_user = user is None
+        if new_user:
+            user = _new_applicant_user(email, first, last)
+        _check_card_owner(self.customers_by_card.get(national_id), user)
+        if user.pk:
+            customer = self.profiles.get(user.pk)
+        else:
+            customer = getattr(user, "_planned_profile", None)
+        pending_profile = customer is not None and _profile_card_is_pending(customer, national_id)
+        if customer is not None:
+            exposure.check(self.exposures.get(customer.pk), amount)
+
+        # All checks passed: record the changes.
+        if new_user:
+            self.users[email] = user
+            self.new_users.append(user)
+        else:
+            if first:
+                user.first_name = first[:150]
+            if last:
+                user.last_name = last[:150]
+            if user.pk:
+                self.changed_users[user.pk] = user
+        if customer is None:
+            customer = _new_applicant_customer(user, validated, national_id, email)
+            self.new_customers.append(customer)
+            if user.pk:
+                self.profiles[user.pk] = customer
+            else:
+                user._planned_profile = customer
+            self.customers_by_card[national_id] = customer
+        else:
+            customer.phone_number = validated["phone"].strip()
+            customer.email = email
+            customer.date_of_birth = validated["dateOfBirth"]
+            if pending_profile:
+                self.customers_by_card.pop(customer.national_id_number, None)
+                customer.national_id_number = national_id
+                self.customers_by_card[national_id] = customer
+            if not customer._state.adding:
+                self.changed_customers[customer.pk] = customer
+
+        application = LoanApplication(
+            customer=customer,
+            product=product,
+            requested_amount=amount,
+            tenure_days=tenure_days,
+            status=LoanApplication.Status.SUBMITTED,
+            submitted_at=self.now,
+            client_reference=validated.get("clientRef") or None,
+        )
+        self.applications.append(application)
+        if customer.pk not in self.consented:
+            self.consented.add(customer.pk)
+            self.consents.append(
+                CustomerConsent(
+                    customer=customer,
+                    consent_type=CustomerConsent.ConsentType.TERMS_AND_CONDITIONS,
+                    version=APPLICATION_CONSENT_VERSION,
+                )
+            )
+        return application
+
+    def save(self) -> None:
+        # Bulk writes skip the signals that number changes for sync/ and index search.
+        changes.stamp([*self.new_customers, *self.changed_customers.values(), *self.applications])
+        for customer in [*self.new_customers, *self.changed_customers.values()]:
+            customer_search.refresh_document(customer, customer.user)
+        User.objects.bulk_create(self.new_users)
+        User.objects.bulk_update(self.changed_users.values(), ["first_name", "last_name"])
+        Customer.objects.bulk_create(self.new_customers)
+        Customer.objects.bulk_update(
+            self.changed_customers.values(),
+            [
+                "phone_number",
+                "email",
+                "date_of_birth",
+                "national_id_number",
+                "change_seq",
+                "search_document",
+            ],
+        )
+        # bulk_update sends no post_save, so evict cached principals here.
+        stale = {*self.changed_users, *(c.user_id for c in self.changed_customers.values())}
+        for user_id in stale:
+            authentication.invalidate_user(user_id)
+        LoanApplication.objects.bulk_create(self.applications)
+        CustomerConsent.objects.bulk_create(self.consents, ignore_conflicts=True)
+
+
+def create_applications_from_validated(items: list[dict]) -> list[dict]:
+    """
+    Bulk submit for applications/sync/. Returns one result per item, in order:
+    {"status": "created" | "duplicate", "application": <LoanApplication or pk>} or
+    {"status": "error", "errors": {...}}. Items with a clientRef that already exists are
+    reported as duplicates, so an agent can safely resend a batch. Call inside
+    transaction.atomic().
+    """
+    batch = _ApplicationBatch(items)
+    results = []
+    for validated in items:
+        ref = validated.get("clientRef") or None
+        if ref and ref in batch.existing_refs:
+            results.append({"status": "duplicate", "application": batch.existing_refs[ref]})
+            continue
+        try:
+            application = batch.add(validated)
+        except serializers.ValidationError as exc:
+            results.append({"status": "error", "errors": exc.detail})
+            continue
+        if ref:
+            batch.existing_refs[ref] = application
+        results.append({"status": "created", "application": application})
+    batch.save()
+    return results
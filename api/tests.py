@@ -0,0 +1,1952 @@
+import asyncio
+import gzip
+import io
+import json
+import threading
+import uuid
+from base64 import b64decode
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from importlib.util import find_spec
+from unittest import skipUnless
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.transaction import TransactionManagementError
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from analytics.models import DailyApplicationCount
+from audit.models import ActivityEvent
+from customers.models import Customer
+from institutions.models import Employee, FinancialInstitution
+from loans.models import CustomerExposure, Loan, LoanApplication, LoanApproval, LoanProduct
+from payments.models import LoanPayment
+
+from . import authentication, events, exposure, live, passwords, tokens, velocity
+from .models import TokenExpiry
+from .renderers import FastJSONParser, FastJSONRenderer, MessagePackParser, MessagePackRenderer
+from .async_views import gather_reads
+from .urls import async_read_urlpatterns
+
+User = get_user_model()
+
+
+class ApiTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        authentication.clear_cache()
+        velocity.reset()
+        self.fi = FinancialInstitution.objects.create(
+            legal_name="JashFin Bank Ltd",
+            trading_name="JashFin",
+            company_registration_number="RC12345678",
+            license_number="LIC-0001",
+            licensing_act="Act 930",
+            institution_type=FinancialInstitution.InstitutionType.BANK,
+            minimum_required_capital=1000000,
+            declared_paid_up_capital=1000000,
+        )
+        self.staff_user = User.objects.create_user(
+            username="officer",
+            email="officer@example.com",
+            password="password123",
+            type=User.UserType.EMPLOYEE,
+        )
+        self.employee = Employee.objects.create(
+            user=self.staff_user,
+            institution=self.fi,
+            role=Employee.Role.CREDIT_OFFICER,
+        )
+        self.product = LoanProduct.objects.create(
+            name="Quickcredit",
+            code=LoanProduct.Code.QUICK,
+            description="Fast emergency loans.",
+            min_amount=Decimal("50.00"),
+            max_amount=Decimal("800.00"),
+            max_tenure_days=90,
+            interest_rate=Decimal("10.00"),
+        )
+        self.borrower = User.objects.create_user(
+            username="ama@example.com",
+            email="ama@example.com",
+            password="password123",
+            first_name="Ama",
+            last_name="Mensah",
+        )
+        self.customer = Customer.objects.create(
+            user=self.borrower,
+            national_id_number="GHA-000000001-1",
+            date_of_birth="1998-01-01",
+            phone_number="0241234567",
+            email="ama@example.com",
+            residential_address="Accra",
+            occupation="Trader",
+            monthly_income=Decimal("1000.00"),
+        )
+        self.application = LoanApplication.objects.create(
+            customer=self.customer,
+            product=self.product,
+            requested_amount=Decimal("500.00"),
+            tenure_days=90,
+            status=LoanApplication.Status.APPROVED,
+            submitted_at=timezone.now(),
+        )
+        self.loan = Loan.objects.create(
+            application=self.application,
+            principal_amount=Decimal("500.00"),
+            interest_rate=Decimal("10.00"),
+            tenure_months=12,
+            status=Loan.Status.ACTIVE,
+            disbursed_at=timezone.now(),
+            maturity_date=timezone.now().date() + timedelta(days=365),
+        )
+
+    def make_payment(self, **kwargs):
+        defaults = {
+            "loan": self.loan,
+            "amount": Decimal("10.00"),
+            "paid_at": timezone.now(),
+            "method": LoanPayment.Method.MOMO,
+        }
+        defaults.update(kwargs)
+        return LoanPayment.objects.create(**defaults)
+
+
+class StaffLoanPaymentListTests(ApiTestCase):
+    url = "/api/v1/staff/payments/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+
+    def test_list_is_cursor_paginated_newest_first(self):
+        now = timezone.now()
+        payments = [self.make_payment(paid_at=now - timedelta(hours=i)) for i in range(5)]
+
+        res = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([p["id"] for p in res.data["results"]], [payments[0].id, payments[1].id])
+        self.assertIsNotNone(res.data["next"])
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual([p["id"] for p in res.data["results"]], [payments[2].id, payments[3].id])
+
+    def test_page_size_is_capped(self):
+        res = self.client.get(self.url, {"page_size": 10000})
+        self.assertEqual(res.status_code, 200)
+        self.assertLessEqual(len(res.data["results"]), 200)
+
+    def test_filters(self):
+        now = timezone.now()
+        cash = self.make_payment(method=LoanPayment.Method.CASH, recorded_by=self.staff_user)
+        self.make_payment(method=LoanPayment.Method.MOMO, status=LoanPayment.Status.FAILED)
+        old = self.make_payment(paid_at=now - timedelta(days=10))
+
+        res = self.client.get(self.url, {"method": "cash"})
+        self.assertEqual([p["id"] for p in res.data["results"]], [cash.id])
+
+        res = self.client.get(self.url, {"recorded_by": self.staff_user.id})
+        self.assertEqual([p["id"] for p in res.data["results"]], [cash.id])
+
+        res = self.client.get(self.url, {"status": "FAILED", "loan": self.loan.id})
+        self.assertEqual(len(res.data["results"]), 1)
+
+        to = (now - timedelta(days=5)).date().isoformat()
+        res = self.client.get(self.url, {"paid_to": to})
+        self.assertEqual([p["id"] for p in res.data["results"]], [old.id])
+
+    def test_invalid_filter_is_rejected(self):
+        res = self.client.get(self.url, {"paid_from": "yesterday"})
+        self.assertEqual(res.status_code, 400)
+        res = self.client.get(self.url, {"method": "CHEQUE"})
+        self.assertEqual(res.status_code, 400)
+
+
+class StaffDashboardSummaryTests(ApiTestCase):
+    url = "/api/v1/staff/dashboard-summary/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+
+    def test_collection_rate_matches_per_loan_computation(self):
+        self.make_payment(amount=Decimal("110.00"))
+        self.make_payment(amount=Decimal("40.00"), status=LoanPayment.Status.FAILED)
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        # 500 * 1.10 * 12/12 = 550 due; 110 completed -> 20%.
+        self.assertEqual(res.data["collection_rate_percent"], 20.0)
+        self.assertEqual(res.data["approved_awaiting_disbursement"], 0)
+        self.assertEqual(res.data["accounts_in_default"], 0)
+
+    def test_summary_is_cached_until_a_write_invalidates_it(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                "/api/v1/staff/payments/",
+                {"loan_id": self.loan.id, "amount": "55.00", "method": "CASH"},
+            )
+        self.assertEqual(res.status_code, 201)
+        res = self.client.get(self.url)
+        self.assertEqual(res.data["collection_rate_percent"], 10.0)
+
+
+class StaffAnalyticsSummaryTests(ApiTestCase):
+    url = "/api/v1/staff/analytics/summary/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+
+    def disburse(self):
+        app = LoanApplication.objects.create(
+            customer=self.customer,
+            product=self.product,
+            requested_amount=Decimal("200.00"),
+            tenure_days=30,
+            status=LoanApplication.Status.APPROVED,
+        )
+        res = self.client.post("/api/v1/staff/loans/disburse/", {"application_id": app.id})
+        self.assertEqual(res.status_code, 201)
+        return res.data
+
+    def test_reads_rollups_kept_current_by_write_paths(self):
+        self.disburse()
+        self.disburse()
+        res = self.client.get(self.url, {"granularity": "day"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["disbursements"]), 1)
+        self.assertEqual(res.data["disbursements"][0]["total"], "400.00")
+        self.assertEqual(res.data["disbursements"][0]["count"], 2)
+        self.assertNotIn("disbursements_by_month", res.data)
+        # setUp's loan bypassed the API, so only the two disbursed loans are counted.
+        self.assertEqual(res.data["loans_by_status"], [{"status": "ACTIVE", "count": 2}])
+        self.assertEqual(
+            [(r["from_status"], r["to_status"], r["count"]) for r in res.data["loan_transitions"]],
+            [("", "ACTIVE", 2)],
+        )
+
+    def test_rebuild_repairs_status_changes_made_outside_the_api(self):
+        from analytics import rollups
+
+        self.disburse()
+        with self.assertNumQueries(2):  # rollup rows only, not the loans table
+            rollups.loan_status_counts()
+        Loan.objects.filter(pk=self.loan.pk).update(status=Loan.Status.DEFAULTED)
+        call_command("rebuild_analytics_rollups", stdout=io.StringIO())
+        res = self.client.get(self.url)
+        self.assertEqual(
+            res.data["loans_by_status"],
+            [{"status": "ACTIVE", "count": 1}, {"status": "DEFAULTED", "count": 1}],
+        )
+
+    def test_rebuild_matches_incremental_rollups(self):
+        from analytics import rollups
+
+        self.disburse()
+        self.client.post(
+            "/api/v1/staff/payments/",
+            {"loan_id": self.loan.id, "amount": "550.00", "method": "CASH"},
+        )
+        before = self.client.get(self.url).data
+        rollups.rebuild()
+        after = self.client.get(self.url).data
+        self.assertEqual(after["repayments"], before["repayments"])
+        self.assertEqual(after["disbursements_by_month"][0]["count"], 2)
+        self.assertEqual(
+            after["loans_by_status"],
+            [{"status": "ACTIVE", "count": 1}, {"status": "COMPLETED", "count": 1}],
+        )
+
+    def test_date_range_and_granularity_are_validated(self):
+        self.assertEqual(self.client.get(self.url, {"granularity": "year"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"from": "last week"}).status_code, 400)
+        res = self.client.get(self.url, {"from": "2000-01-01", "to": "2000-12-31"})
+        self.assertEqual(res.data["disbursements"], [])
+
+
+class ActivityFeedTests(ApiTestCase):
+    url = "/api/v1/staff/activity/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+
+    def test_write_paths_append_events(self):
+        app = LoanApplication.objects.create(
+            customer=self.customer,
+            product=self.product,
+            requested_amount=Decimal("100.00"),
+            tenure_days=30,
+            status=LoanApplication.Status.SUBMITTED,
+        )
+        self.client.patch(f"/api/v1/staff/applications/{app.id}/", {"status": "APPROVED"})
+        self.client.post("/api/v1/staff/loans/disburse/", {"application_id": app.id})
+        self.client.post(
+            "/api/v1/staff/payments/",
+            {"loan_id": self.loan.id, "amount": "20.00", "method": "CASH"},
+        )
+
+        res = self.client.get(self.url)
+        self.assertEqual(
+            [e["type"] for e in res.data["results"]], ["payment", "disbursement", "application"]
+        )
+        self.assertEqual(res.data["results"][2]["title"], "Application approved")
+
+        res = self.client.get(self.url, {"type": "payment,disbursement", "page_size": 1})
+        self.assertEqual([e["type"] for e in res.data["results"]], ["payment"])
+        res = self.client.get(res.data["next"])
+        self.assertEqual([e["type"] for e in res.data["results"]], ["disbursement"])
+
+        summary = self.client.get("/api/v1/staff/dashboard-summary/").data
+        self.assertEqual(summary["recent_activity"][0]["subtitle"], "Ama Mensah · GH₵20.00")
+
+    def test_unknown_type_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"type": "login"}).status_code, 400)
+
+
+class LiveEventsTests(ApiTestCase):
+    url = "/api/v1/staff/live/"
+
+    def setUp(self):
+        super().setUp()
+        self.staff_token = Token.objects.create(user=self.staff_user)
+        self.customer_token = Token.objects.create(user=self.borrower)
+
+    async def test_requires_staff_token(self):
+        res = await self.async_client.get(self.url)
+        self.assertEqual(res.status_code, 401)
+        res = await self.async_client.get(self.url, {"token": self.staff_token.key})
+        self.assertEqual(res.status_code, 401)
+
+    async def test_ticket_opens_stream_without_token_in_url(self):
+        auth = {"authorization": f"Token {self.customer_token.key}"}
+        res = await self.async_client.post(f"{self.url}ticket/", headers=auth)
+        self.assertEqual(res.status_code, 403)
+        auth = {"authorization": f"Token {self.staff_token.key}"}
+        res = await self.async_client.post(f"{self.url}ticket/", headers=auth)
+        ticket = res.json()["ticket"]
+        self.assertNotIn(self.staff_token.key, ticket)
+        res = await self.async_client.get(self.url, {"ticket": ticket})
+        self.assertEqual(res.status_code, 200)
+        await res.streaming_content.aclose()
+        res = await self.async_client.get(self.url, {"ticket": ticket + "x"})
+        self.assertEqual(res.status_code, 401)
+        with patch.object(live, "TICKET_MAX_AGE", -1):
+            res = await self.async_client.get(self.url, {"ticket": ticket})
+        self.assertEqual(res.status_code, 401)
+
+    def test_refused_under_wsgi(self):
+        res = self.client.get(self.url, HTTP_AUTHORIZATION=f"Token {self.staff_token.key}")
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(res.streaming)
+        self.assertIn("Retry-After", res)
+
+    def test_replay_covers_events_committed_below_the_last_id(self):
+        def event(pk):
+            ActivityEvent.objects.create(
+                pk=pk, type=ActivityEvent.Type.PAYMENT, title="Paid", occurred_at=timezone.now()
+            )
+
+        event(10)
+        event(5)  # took its id before 10 but committed after it
+        self.assertEqual([e["id"] for e in async_to_sync(live._replay)(10)], [5])
+
+    @override_settings(LIVE_EVENTS_BROKER="inprocess")
+    async def test_stream_pushes_published_activity(self):
+        res = await self.async_client.get(
+            self.url, headers={"authorization": f"Token {self.staff_token.key}"}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        chunks = aiter(res.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 5000\n\n")
+
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        live.publish({"id": 7, "type": "payment", "title": "Payment received"})
+        chunk = (await asyncio.wait_for(pending, 1)).decode()
+        self.assertTrue(chunk.startswith("id: 7\nevent: payment\n"))
+        await chunks.aclose()
+
+
+@override_settings(LIVE_EVENTS_POLL_INTERVAL=0.05)
+class LiveEventsBrokerTests(APITransactionTestCase):
+    def setUp(self):
+        staff = User.objects.create_user(username="officer", password="x", is_staff=True)
+        self.token = Token.objects.create(user=staff)
+
+    async def test_activity_written_on_another_thread_reaches_the_stream(self):
+        res = await self.async_client.get(
+            "/api/v1/staff/live/", headers={"authorization": f"Token {self.token.key}"}
+        )
+        chunks = aiter(res.streaming_content)
+        await anext(chunks)
+        pending = asyncio.ensure_future(anext(chunks))
+        # Let the poller take its high-water mark first.
+        await asyncio.sleep(0.2)
+        # Stands in for a write on another worker or the WSGI process: its own thread and
+        # connection, and no publish() in this process.
+        await sync_to_async(ActivityEvent.objects.create, thread_sensitive=False)(
+            type=ActivityEvent.Type.PAYMENT, title="Payment received", occurred_at=timezone.now()
+        )
+        chunk = (await asyncio.wait_for(pending, 2)).decode()
+        self.assertIn("event: payment\n", chunk)
+        await chunks.aclose()
+
+    async def test_event_committed_below_the_high_water_mark_is_not_skipped(self):
+        res = await self.async_client.get(
+            "/api/v1/staff/live/", headers={"authorization": f"Token {self.token.key}"}
+        )
+        chunks = aiter(res.streaming_content)
+        await anext(chunks)
+        create = sync_to_async(ActivityEvent.objects.create, thread_sensitive=False)
+        await asyncio.sleep(0.2)
+        await create(pk=100, type="payment", title="First", occurred_at=timezone.now())
+        self.assertIn("id: 100\n", (await asyncio.wait_for(anext(chunks), 2)).decode())
+        # A lower id committing after 100 was read, as a slower transaction would.
+        await create(pk=50, type="payment", title="Late", occurred_at=timezone.now())
+        self.assertIn("id: 50\n", (await asyncio.wait_for(anext(chunks), 2)).decode())
+        await chunks.aclose()
+
+
+class DefaultPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+
+    def test_list_viewsets_are_cursor_paginated_with_optional_count(self):
+        for i in range(3):
+            LoanApplication.objects.create(
+                customer=self.customer,
+                product=self.product,
+                requested_amount=Decimal("100.00"),
+                tenure_days=30,
+                status=LoanApplication.Status.SUBMITTED,
+            )
+        res = self.client.get("/api/v1/staff/applications/", {"page_size": 2})
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertNotIn("count", res.data)
+        ids = [a["id"] for a in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        ids += [a["id"] for a in res.data["results"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(ids), 4)
+
+        res = self.client.get("/api/v1/staff/customers/", {"count": "1"})
+        self.assertEqual(res.data["count"], 1)
+        for url in (
+            "/api/v1/staff/loans/",
+            "/api/v1/staff/employees/",
+            "/api/v1/staff/ledger/accounts/",
+        ):
+            self.assertIn("results", self.client.get(url).data)
+
+    def test_rows_sharing_the_ordering_value_page_by_id(self):
+        for i in range(4):
+            LoanApplication.objects.create(
+                customer=self.customer,
+                product=self.product,
+                requested_amount=Decimal("100.00"),
+                tenure_days=30,
+            )
+        LoanApplication.objects.update(created_at=timezone.now())
+        res = self.client.get("/api/v1/staff/applications/", {"page_size": 2})
+        pages = [[a["id"] for a in res.data["results"]]]
+        while res.data["next"]:
+            cursor = parse_qs(urlparse(res.data["next"]).query)["cursor"][0]
+            self.assertNotIn("o=", b64decode(cursor).decode())  # no offset into ties
+            res = self.client.get(res.data["next"])
+            pages.append([a["id"] for a in res.data["results"]])
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(ids, sorted(LoanApplication.objects.values_list("pk", flat=True))[::-1])
+        res = self.client.get(res.data["previous"])
+        self.assertEqual([a["id"] for a in res.data["results"]], pages[-2])
+
+    def test_product_catalogue_stays_unpaginated(self):
+        res = self.client.get("/api/v1/products/")
+        self.assertEqual(res.data[0]["code"], LoanProduct.Code.QUICK)
+
+
+class CustomerExposureTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+        # setUp's loan bypassed the API.
+        exposure.rebuild()
+
+    def row(self):
+        return CustomerExposure.objects.get(pk=self.customer.pk)
+
+    def payload(self, **overrides):
+        data = {
+            "fullName": "Ama Mensah",
+            "email": "ama@example.com",
+            "phone": "0241234567",
+            "dateOfBirth": "1998-01-01",
+            "ghanaCardNumber": "GHA-000000001-1",
+            "emergencyName": "Efua",
+            "emergencyPhone": "0240000001",
+            "emergencyRelation": "Sister",
+            "selectedProduct": "quickcredit",
+            "loanAmount": "300",
+            "loanPurpose": "Stock",
+            "termsAccepted": True,
+        }
+        data.update(overrides)
+        return data
+
+    def pay(self, loan_id, amount):
+        res = self.client.post(
+            "/api/v1/staff/payments/", {"loan_id": loan_id, "amount": amount}, format="json"
+        )
+        self.assertEqual(res.status_code, 201)
+
+    def test_write_paths_match_rebuild(self):
+        self.assertEqual((self.row().active_loans, self.row().outstanding), (1, Decimal("550.00")))
+        app = LoanApplication.objects.create(
+            customer=self.customer,
+            product=self.product,
+            requested_amount=Decimal("600.00"),
+            tenure_days=360,
+            status=LoanApplication.Status.APPROVED,
+        )
+        res = self.client.post("/api/v1/staff/loans/disburse/", {"application_id": app.id})
+        self.assertEqual(res.status_code, 201)
+        self.pay(self.loan.pk, "100.00")
+        self.pay(self.loan.pk, "450.00")  # settles and completes the loan
+        self.pay(res.data["id"], "60.00")
+
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.status, Loan.Status.COMPLETED)
+        row = self.row()
+        self.assertEqual((row.active_loans, row.outstanding), (1, Decimal("600.00")))
+        exposure.rebuild()
+        rebuilt = self.row()
+        self.assertEqual((rebuilt.active_loans, rebuilt.outstanding), (1, Decimal("600.00")))
+
+    def test_submit_and_sync_check_exposure(self):
+        res = self.client.post("/api/v1/applications/submit/", self.payload(), format="json")
+        self.assertEqual(res.status_code, 201)
+
+        CustomerExposure.objects.filter(pk=self.customer.pk).update(active_loans=2)
+        res = self.client.post("/api/v1/applications/submit/", self.payload(), format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("eligibility", res.data)
+
+        CustomerExposure.objects.filter(pk=self.customer.pk).update(
+            active_loans=0, outstanding=0, last_default_at=timezone.now() - timedelta(days=30)
+        )
+        res = self.client.post(
+            "/api/v1/applications/sync/",
+            {"applications": [self.payload(clientRef="agent:1")]},
+            format="json",
+        )
+        self.assertEqual(res.data["results"][0]["status"], "error")
+        self.assertIn("eligibility", res.data["results"][0]["errors"])
+
+    @override_settings(EXPOSURE_MAX_OUTSTANDING=Decimal("800"))
+    def test_outstanding_cap_includes_requested_amount(self):
+        res = self.client.post(
+            "/api/v1/applications/submit/", self.payload(loanAmount="300"), format="json"
+        )
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post(
+            "/api/v1/applications/submit/", self.payload(loanAmount="250"), format="json"
+        )
+        self.assertEqual(res.status_code, 201)
+
+
+    @override_settings(EXPOSURE_MAX_ACTIVE_LOANS=0, EXPOSURE_MAX_OUTSTANDING=Decimal("1100"))
+    def test_sync_applies_the_same_rule_as_single_submit(self):
+        # Pending applications are not exposure on either path: 550 owed + 300 fits each time.
+        res = self.client.post(
+            "/api/v1/applications/sync/",
+            {
+                "applications": [
+                    self.payload(loanAmount="300", clientRef="agent:1"),
+                    self.payload(loanAmount="300", clientRef="agent:2"),
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual([r["status"] for r in res.data["results"]], ["created", "created"])
+        for _ in range(2):
+            res = self.client.post(
+                "/api/v1/applications/submit/", self.payload(loanAmount="300"), format="json"
+            )
+            self.assertEqual(res.status_code, 201)
+
+class ApplicationQueueFilterTests(ApiTestCase):
+    url = "/api/v1/staff/applications/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+        self.edu = LoanProduct.objects.create(
+            name="Educredit",
+            code=LoanProduct.Code.EDU,
+            min_amount=Decimal("100.00"),
+            max_amount=Decimal("2000.00"),
+            max_tenure_days=180,
+            interest_rate=Decimal("8.00"),
+        )
+        now = timezone.now()
+        self.queue = [
+            LoanApplication.objects.create(
+                customer=self.customer,
+                product=product,
+                requested_amount=Decimal(amount),
+                tenure_days=30,
+                status=LoanApplication.Status.SUBMITTED,
+                submitted_at=now - timedelta(days=days),
+            )
+            for product, amount, days in (
+                (self.product, "200.00", 3),
+                (self.edu, "900.00", 1),
+                (self.product, "150.00", 2),
+            )
+        ]
+        self.application.decided_at = now - timedelta(days=10)
+        self.application.save()
+
+    def ids(self, **params):
+        res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, 200, res.data)
+        return [row["id"] for row in res.data["results"]]
+
+    def test_filters(self):
+        oldest, edu, middle = self.queue
+        self.assertEqual(
+            self.ids(status="submitted", ordering="submitted_at"), [oldest.pk, middle.pk, edu.pk]
+        )
+        self.assertEqual(
+            self.ids(status="SUBMITTED", product="QUICKCREDIT", ordering="-submitted_at"),
+            [middle.pk, oldest.pk],
+        )
+        self.assertEqual(self.ids(product=str(self.edu.pk)), [edu.pk])
+        self.assertEqual(
+            set(self.ids(status="SUBMITTED,APPROVED")),
+            {a.pk for a in self.queue} | {self.application.pk},
+        )
+        since = (timezone.now() - timedelta(days=2, hours=12)).isoformat()
+        self.assertEqual(
+            self.ids(status="SUBMITTED", submitted_from=since, ordering="submitted_at"),
+            [middle.pk, edu.pk],
+        )
+        self.assertEqual(
+            self.ids(decided_to=(timezone.now() - timedelta(days=5)).date().isoformat()),
+            [self.application.pk],
+        )
+        self.assertEqual(self.ids(ordering="decided_at"), [self.application.pk])
+        self.assertEqual(self.ids(ordering="-requested_amount")[0], edu.pk)
+        self.assertEqual(len(self.ids(customer=str(self.customer.pk))), 4)
+
+    def test_keyset_pages_follow_the_requested_ordering(self):
+        res = self.client.get(
+            self.url, {"status": "SUBMITTED", "ordering": "submitted_at", "page_size": 2}
+        )
+        ids = [row["id"] for row in res.data["results"]]
+        ids += [row["id"] for row in self.client.get(res.data["next"]).data["results"]]
+        self.assertEqual(ids, [self.queue[0].pk, self.queue[2].pk, self.queue[1].pk])
+
+    def test_rejects_unknown_values(self):
+        for params in (
+            {"status": "PENDING"},
+            {"product": "GOLDCREDIT"},
+            {"ordering": "customer"},
+            {"submitted_from": "yesterday"},
+            {"customer": "42"},
+        ):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+
+class ApplicationClaimTests(ApiTestCase):
+    url = "/api/v1/staff/applications/next/"
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.queue = [
+            LoanApplication.objects.create(
+                customer=self.customer,
+                product=self.product,
+                requested_amount=Decimal("100.00"),
+                tenure_days=30,
+                status=LoanApplication.Status.SUBMITTED,
+                submitted_at=now - timedelta(hours=hours),
+            )
+            for hours in (3, 2)
+        ]
+        other = User.objects.create_user(username="officer2", type=User.UserType.EMPLOYEE)
+        self.other_employee = Employee.objects.create(
+            user=other, institution=self.fi, role=Employee.Role.CREDIT_OFFICER
+        )
+
+    def claim(self, user):
+        self.client.force_authenticate(user)
+        return self.client.post(self.url)
+
+    def test_reviewers_get_different_applications_oldest_first(self):
+        first = self.claim(self.staff_user)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data["id"], self.queue[0].pk)
+        self.assertIsNotNone(first.data["lease_expires_at"])
+        second = self.claim(self.other_employee.user)
+        self.assertEqual(second.data["id"], self.queue[1].pk)
+        self.assertEqual(self.claim(self.staff_user).data["id"], self.queue[0].pk)
+        self.queue[0].refresh_from_db()
+        self.assertEqual(self.queue[0].assigned_to, self.employee)
+
+        third = User.objects.create_user(username="officer3", type=User.UserType.EMPLOYEE)
+        Employee.objects.create(user=third, institution=self.fi, role=Employee.Role.SUPERVISOR)
+        self.assertEqual(self.claim(third).status_code, 204)
+
+    def test_expired_leases_are_reclaimed_and_released(self):
+        self.claim(self.staff_user)
+        LoanApplication.objects.filter(pk=self.queue[0].pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(self.claim(self.other_employee.user).data["id"], self.queue[0].pk)
+
+        LoanApplication.objects.filter(pk=self.queue[0].pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        out = io.StringIO()
+        call_command("release_application_leases", stdout=out)
+        self.assertIn("Released 1", out.getvalue())
+        self.queue[0].refresh_from_db()
+        self.assertIsNone(self.queue[0].assigned_to)
+
+    def test_decision_ends_the_claim(self):
+        claimed = self.claim(self.staff_user).data["id"]
+        res = self.client.patch(
+            f"/api/v1/staff/applications/{claimed}/", {"status": "APPROVED"}, format="json"
+        )
+        self.assertEqual(res.status_code, 200)
+        application = LoanApplication.objects.get(pk=claimed)
+        self.assertIsNone(application.assigned_to)
+        self.assertIsNone(application.lease_expires_at)
+        self.assertEqual(self.claim(self.staff_user).data["id"], self.queue[1].pk)
+
+    def test_requires_an_employee(self):
+        admin = User.objects.create_user(username="root", is_staff=True)
+        self.assertEqual(self.claim(admin).status_code, 403)
+        self.assertEqual(self.claim(self.borrower).status_code, 403)
+
+
+class ApplicationDecisionsTests(ApiTestCase):
+    url = "/api/v1/staff/applications/decisions/"
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+        self.pending = [
+            LoanApplication.objects.create(
+                customer=self.customer,
+                product=self.product,
+                requested_amount=Decimal("100.00"),
+                tenure_days=30,
+                status=status,
+                submitted_at=timezone.now(),
+            )
+            for status in (
+                LoanApplication.Status.SUBMITTED,
+                LoanApplication.Status.SUBMITTED,
+                LoanApplication.Status.UNDER_REVIEW,
+            )
+        ]
+
+    def test_applies_decisions_in_bulk(self):
+        a, b, c = self.pending
+        res = self.client.post(
+            self.url,
+            {
+                "decisions": [
+                    {"id": a.pk, "status": "APPROVED", "justification": "Good history"},
+                    {"id": b.pk, "status": "REJECTED"},
+                    {"id": c.pk, "status": "APPROVED"},
+                    {"id": a.pk, "status": "REJECTED"},
+                    {"id": self.application.pk, "status": "REJECTED"},
+                    {"id": 999999, "status": "APPROVED"},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [r["outcome"] for r in res.data["results"]],
+            ["decided", "decided", "decided", "duplicate", "invalid_transition", "not_found"],
+        )
+        for app in self.pending:
+            app.refresh_from_db()
+            self.assertIsNotNone(app.decided_at)
+        self.assertEqual([a.status, b.status, c.status], ["APPROVED", "REJECTED", "APPROVED"])
+        self.assertEqual(a.approval.decision, LoanApproval.Decision.MANUAL_APPROVED)
+        self.assertEqual(a.approval.justification, "Good history")
+        self.assertEqual(a.approval.reviewed_by, self.employee)
+        self.assertEqual(b.approval.decision, LoanApproval.Decision.REJECTED)
+        self.assertEqual(
+            ActivityEvent.objects.filter(type=ActivityEvent.Type.APPLICATION).count(), 3
+        )
+        self.assertEqual(
+            DailyApplicationCount.objects.get(status="APPROVED", product=self.product).count, 2
+        )
+
+        cursor = min(app.change_seq for app in self.pending) - 1
+        res = self.client.get("/api/v1/sync/", {"applications": cursor})
+        self.assertEqual(len(res.data["applications"]["changes"]), 3)
+
+    def test_validates_request(self):
+        for body in (
+            {"decisions": []},
+            {"decisions": [{"id": self.pending[0].pk, "status": "SUBMITTED"}]},
+        ):
+            self.assertEqual(self.client.post(self.url, body, format="json").status_code, 400)
+        with self.settings(APPLICATION_DECISIONS_MAX_ITEMS=1):
+            body = {"decisions": [{"id": a.pk, "status": "APPROVED"} for a in self.pending]}
+            self.assertEqual(self.client.post(self.url, body, format="json").status_code, 400)
+
+
+class SparseFieldsetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+        self.make_payment(amount=Decimal("50.00"))
+
+    def test_fields_and_omit(self):
+        res = self.client.get("/api/v1/staff/loans/", {"fields": "id,status"})
+        self.assertEqual(set(res.data["results"][0]), {"id", "status"})
+        res = self.client.get("/api/v1/staff/loans/", {"omit": "total_paid,outstanding_balance"})
+        row = res.data["results"][0]
+        self.assertNotIn("total_paid", row)
+        self.assertIn("total_repayment_due", row)
+
+    def test_unknown_field_names_are_rejected(self):
+        res = self.client.get(
+            "/api/v1/staff/loans/", {"fields": "id,stauts", "expand": "product"}
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("stauts", res.data["fields"][0])
+        self.assertIn("product", res.data["expand"][0])
+
+    def test_balances_are_annotated_not_queried_per_loan(self):
+        for i in range(3):
+            app = LoanApplication.objects.create(
+                customer=self.customer,
+                product=self.product,
+                requested_amount=Decimal("100.00"),
+                tenure_days=30,
+                status=LoanApplication.Status.APPROVED,
+            )
+            Loan.objects.create(
+                application=app,
+                principal_amount=Decimal("100.00"),
+                interest_rate=Decimal("10.00"),
+                tenure_months=12,
+                disbursed_at=timezone.now(),
+                maturity_date=timezone.now().date(),
+            )
+        with self.assertNumQueries(1):
+            res = self.client.get("/api/v1/staff/loans/")
+        by_id = {r["id"]: r for r in res.data["results"]}
+        self.assertEqual(by_id[self.loan.id]["total_paid"], "50.00")
+        self.assertEqual(by_id[self.loan.id]["outstanding_balance"], "500.00")
+
+    def test_expand_nests_related_object(self):
+        res = self.client.get(
+            "/api/v1/staff/applications/", {"fields": "id,customer", "expand": "customer"}
+        )
+        row = res.data["results"][0]
+        self.assertEqual(set(row), {"id", "customer"})
+        self.assertEqual(row["customer"]["national_id_number"], self.customer.national_id_number)
+
+
+class FastSerializerParityTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.staff_user)
+        nameless = User.objects.create_user(username="kofi@example.com", password="x")
+        other = Customer.objects.create(
+            user=nameless,
+            national_id_number="GHA-000000002-2",
+            date_of_birth="1990-05-05",
+            phone_number="0209999999",
+            email=None,
+            residential_address="Kumasi",
+            occupation="Farmer",
+            monthly_income=Decimal("0.00"),
+        )
+        LoanApplication.objects.create(
+            customer=other,
+            product=self.product,
+            requested_amount=Decimal("75.5"),
+            tenure_days=30,
+            status=LoanApplication.Status.SUBMITTED,
+        )
+        self.make_payment(amount=Decimal("12.30"), reference="MOMO-1")
+        self.make_payment(amount=Decimal("7"), recorded_by=self.staff_user)
+
+    def test_payment_rows_match_drf_serializer(self):
+        from .fast_serializers import payment_rows, payment_values
+        from .serializers import StaffLoanPaymentSerializer
+
+        qs = LoanPayment.objects.order_by("-paid_at", "-id")
+        expected = StaffLoanPaymentSerializer(qs, many=True).data
+        self.assertEqual(payment_rows(payment_values(qs)), [dict(r) for r in expected])
+
+    def test_application_rows_match_drf_serializer(self):
+        from .fast_serializers import application_rows, application_values
+        from .serializers import LoanApplicationListSerializer
+
+        qs = LoanApplication.objects.order_by("-created_at", "-id")
+        expected = LoanApplicationListSerializer(qs, many=True).data
+        self.assertEqual(application_rows(application_values(qs)), [dict(r) for r in expected])
+
+        subset = {"id", "customer_name", "loan_id"}
+        self.assertEqual(
+            application_rows(application_values(qs, subset), subset),
+            [{k: r[k] for k in ("id", "customer_name", "loan_id")} for r in expected],
+        )
+
+    def test_list_endpoints_serve_fast_rows(self):
+        res = self.client.get("/api/v1/staff/applications/")
+        self.assertEqual(res.data["results"][0]["customer_name"], "kofi@example.com")
+        self.assertEqual(res.data["results"][0]["requested_amount"], "75.50")
+        res = self.client.get("/api/v1/staff/payments/", {"page_size": 1})
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertIsNotNone(self.client.get(res.data["next"]).data["results"])
+
+
+class RendererTests(ApiTestCase):
+    payload = {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "amount": Decimal("12.50"),
+        "at": datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        "day": date(2026, 3, 1),
+        "name": "Ama Mensah · GH₵",
+        "rows": [{"n": 1, "ok": True, "none": None}],
+        3: "int key",
+    }
+
+    def test_json_renderer_matches_stock_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload)
+        )
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload, "application/json; indent=2"),
+            JSONRenderer().render(self.payload, "application/json; indent=2"),
+        )
+
+    def test_json_parser_round_trip(self):
+        body = FastJSONRenderer().render(self.payload)
+        parsed = FastJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parsed["amount"], 12.5)
+        self.assertEqual(parsed["at"], "2026-03-01T09:30:15.123456Z")
+        self.assertEqual(parsed["name"], self.payload["name"])
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b"{not json"))
+
+    @skipUnless(find_spec("msgpack"), "msgpack not installed")
+    def test_msgpack_round_trip(self):
+        payload = {k: v for k, v in self.payload.items() if isinstance(k, str)}
+        parsed = MessagePackParser().parse(io.BytesIO(MessagePackRenderer().render(payload)))
+        expected = FastJSONParser().parse(io.BytesIO(FastJSONRenderer().render(payload)))
+        self.assertEqual(parsed, expected)
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b"\xc1"))
+
+    @skipUnless(find_spec("msgpack"), "msgpack not installed")
+    def test_msgpack_content_negotiation(self):
+        self.client.force_authenticate(self.staff_user)
+        self.make_payment(amount=Decimal("25.00"))
+        res = self.client.get("/api/v1/staff/payments/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        data = MessagePackParser().parse(io.BytesIO(res.content))
+        self.assertEqual(data["results"][0]["amount"], "25.00")
+
+    def test_large_responses_are_gzipped(self):
+        self.client.force_authenticate(self.staff_user)
+        for _ in range(30):
+            self.make_payment()
+        res = self.client.get("/api/v1/staff/payments/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(res.content))["results"]), 30)
+
+        res = self.client.get("/api/v1/staff/payments/", {"page_size": 1})
+        self.assertFalse(res.has_header("Content-Encoding"))
+
+
+class ConditionalGetTests(ApiTestCase):
+    def login(self, user):
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def revalidate(self, url, etag, queries):
+        with self.assertNumQueries(queries):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_me_is_stamped_by_customer_version(self):
+        self.login(self.borrower)
+        first = self.client.get("/api/v1/me/")
+        self.assertEqual(first.status_code, 200)
+        # Auth is served from the token cache; only the version stamp is read.
+        self.revalidate("/api/v1/me/", first["ETag"], queries=1)
+
+        events.payment_recorded(self.make_payment(amount=Decimal("40.00")))
+        second = self.client.get("/api/v1/me/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.data["loans"][0]["total_paid"], "40.00")
+
+    def test_me_etag_covers_products_and_representation(self):
+        self.login(self.borrower)
+        first = self.client.get("/api/v1/me/")
+        self.assertIn("Accept", first["Vary"])
+        indented = self.client.get(
+            "/api/v1/me/",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+            HTTP_ACCEPT="application/json; indent=2",
+        )
+        self.assertEqual(indented.status_code, 200)
+        self.assertNotEqual(indented["ETag"], first["ETag"])
+
+        self.product.name = "Quickcredit Plus"
+        self.product.save()
+        res = self.client.get("/api/v1/me/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["applications"][0]["product_name"], "Quickcredit Plus")
+
+    def test_customer_detail_supports_etag_and_last_modified(self):
+        self.login(self.borrower)
+        first = self.client.get("/api/v1/me/customer/")
+        self.assertIn("Last-Modified", first)
+        self.revalidate("/api/v1/me/customer/", first["ETag"], queries=1)
+        res = self.client.get(
+            "/api/v1/me/customer/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(res.status_code, 304)
+
+        self.client.patch("/api/v1/me/customer/", {"occupation": "Tailor"}, format="json")
+        res = self.client.get("/api/v1/me/customer/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["occupation"], "Tailor")
+
+    def test_product_catalogue_changes_etag(self):
+        first = self.client.get("/api/v1/products/")
+        self.revalidate("/api/v1/products/", first["ETag"], queries=1)
+        self.revalidate(f"/api/v1/products/{self.product.pk}/", first["ETag"], queries=1)
+
+        self.product.is_active = False
+        self.product.save()
+        res = self.client.get("/api/v1/products/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data, [])
+
+    def test_staff_institution(self):
+        self.login(self.staff_user)
+        first = self.client.get("/api/v1/staff/institution/")
+        self.assertEqual(first.status_code, 200)
+        self.revalidate("/api/v1/staff/institution/", first["ETag"], queries=1)
+        self.fi.trading_name = "JashFin MFB"
+        self.fi.save()
+        res = self.client.get("/api/v1/staff/institution/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.data["trading_name"], "JashFin MFB")
+
+
+class CachedTokenAuthenticationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_principal_resolved_in_one_query_then_cached(self):
+        url = "/api/v1/staff/institution/"
+        with self.assertNumQueries(3):
+            # token + user + employee_profile, then the institution stamp and row.
+            self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_customer_permission_uses_preloaded_profile(self):
+        token = Token.objects.create(user=self.borrower)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/api/v1/me/customer/")
+        with self.assertNumQueries(2):
+            # Version stamp and the customer row; nothing for auth or IsCustomerUser.
+            self.assertEqual(self.client.get("/api/v1/me/customer/").status_code, 200)
+        # Staff endpoints still reject borrowers from the cached principal.
+        self.assertEqual(self.client.get("/api/v1/staff/institution/").status_code, 403)
+
+    def test_logout_revokes_token(self):
+        self.client.get("/api/v1/staff/institution/")
+        self.assertEqual(self.client.post("/api/v1/auth/logout/").status_code, 204)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+        self.assertEqual(self.client.get("/api/v1/staff/institution/").status_code, 401)
+
+    def test_user_and_profile_changes_evict_cache(self):
+        self.client.get("/api/v1/staff/institution/")
+        self.staff_user.is_active = False
+        self.staff_user.save()
+        self.assertEqual(self.client.get("/api/v1/staff/institution/").status_code, 401)
+
+        self.staff_user.is_active = True
+        self.staff_user.save()
+        self.client.get("/api/v1/me/staff/")
+        self.employee.role = Employee.Role.ADMIN
+        self.employee.save()
+        res = self.client.get("/api/v1/me/staff/")
+        self.assertEqual(res.data["employee_role"], Employee.Role.ADMIN)
+
+    def test_user_change_revokes_principals_cached_by_other_workers(self):
+        self.client.get("/api/v1/staff/institution/")
+        other_worker = dict(authentication._principals)
+        self.staff_user.is_active = False
+        self.staff_user.save()
+        # That worker missed the local eviction; the shared generation has moved on.
+        authentication._principals.update(other_worker)
+        self.assertEqual(self.client.get("/api/v1/staff/institution/").status_code, 401)
+
+    def test_each_hit_gets_fresh_instances(self):
+        auth = authentication.CachedTokenAuthentication()
+        first, _ = auth.authenticate_credentials(self.token.key)
+        first.first_name = "Changed"
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+            self.assertIsNot(user, first)
+            self.assertEqual(user.first_name, "")
+            self.assertIs(token.user, user)
+            self.assertIs(user.employee_profile.user, user)
+            self.assertFalse(hasattr(user, "customer_profile"))
+
+    def test_profile_patch_does_not_write_back_cached_fields(self):
+        token = Token.objects.create(user=self.borrower)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/api/v1/me/customer/")
+        # Changed behind the cache's back (e.g. on another worker).
+        Customer.objects.filter(pk=self.customer.pk).update(status=Customer.Status.SUSPENDED)
+        User.objects.filter(pk=self.borrower.pk).update(email="new@example.com")
+
+        self.client.patch("/api/v1/me/customer/", {"occupation": "Tailor"}, format="json")
+        self.client.patch("/api/v1/me/user/", {"first_name": "Akosua"}, format="json")
+        self.customer.refresh_from_db()
+        self.borrower.refresh_from_db()
+        self.assertEqual(self.customer.status, Customer.Status.SUSPENDED)
+        self.assertEqual(self.customer.occupation, "Tailor")
+        self.assertEqual(self.borrower.email, "new@example.com")
+        self.assertEqual(self.borrower.first_name, "Akosua")
+
+
+class CaseInsensitiveUserLookupTests(ApiTestCase):
+    def test_emails_are_stored_lowercased(self):
+        user = User.objects.create_user(username="Kofi", email=" Kofi@Example.COM ")
+        self.assertEqual(user.email, "kofi@example.com")
+        self.assertEqual(User.objects.email_matches("KOFI@example.com").get(), user)
+        self.assertEqual(User.objects.username_matches("kofi").get(), user)
+
+    def test_staff_login_by_email_ignores_case(self):
+        res = self.client.post(
+            "/api/v1/auth/staff-token/",
+            {"username": "Officer@Example.com", "password": "password123"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("token", res.data)
+
+    def test_register_rejects_email_in_other_case(self):
+        res = self.client.post(
+            "/api/v1/auth/customer-register/",
+            {"fullName": "Ama Mensah", "email": "AMA@example.com", "password": "password123"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("email", res.data)
+
+    @skipUnless(connection.vendor == "sqlite", "query plan text is SQLite specific")
+    def test_lookups_use_lower_indexes(self):
+        plan = User.objects.email_matches("ama@example.com").explain()
+        self.assertIn("user_email_lower_idx", plan)
+        plan = User.objects.username_matches("officer").explain()
+        self.assertIn("user_username_lower_idx", plan)
+
+
+class PasswordPoolTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        passwords.reset_stats()
+
+    def login(self, path="/api/v1/auth/customer-token/", username="ama@example.com"):
+        return self.client.post(
+            path, {"username": username, "password": "password123"}, format="json"
+        )
+
+    def test_customer_login_reports_queue_and_verify_time(self):
+        res = self.login()
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("token", res.data)
+        self.assertRegex(res["Server-Timing"], r"^queue;dur=[\d.]+, verify;dur=[\d.]+$")
+        bad = self.client.post(
+            "/api/v1/auth/customer-token/",
+            {"username": "nobody@example.com", "password": "password123"},
+            format="json",
+        )
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(passwords.stats()["customer"]["verified"], 2)
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_login_upgrades_hash_to_configured_iterations(self):
+        old = self.borrower.password
+        self.assertNotIn("$1000$", old)
+        self.assertEqual(self.login().status_code, 200)
+        self.borrower.refresh_from_db()
+        self.assertTrue(self.borrower.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(self.borrower.check_password("password123"))
+        # Already at the budget: nothing left to upgrade.
+        self.assertEqual(self.login().status_code, 200)
+        upgraded = self.borrower.password
+        self.borrower.refresh_from_db()
+        self.assertEqual(self.borrower.password, upgraded)
+
+    @override_settings(
+        PASSWORD_VERIFY_CONCURRENCY={"staff": 1, "customer": 1}, PASSWORD_VERIFY_QUEUE_TIMEOUT=0
+    )
+    def test_full_endpoint_refuses_without_blocking_the_other(self):
+        # Held by another worker: the slots live in the shared cache.
+        slots = passwords.Slots("customer")
+        slot = slots.acquire(timeout=0)
+        try:
+            with self.assertLogs("api.passwords", "WARNING"):
+                self.assertEqual(self.login().status_code, 429)
+            staff = self.login("/api/v1/auth/staff-token/", "officer@example.com")
+            self.assertEqual(staff.status_code, 200)
+        finally:
+            slots.release(slot)
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(passwords.stats()["customer"]["rejected"], 1)
+
+    @override_settings(PASSWORD_VERIFY_STATS_INTERVAL=0)
+    def test_stats_are_logged(self):
+        with self.assertLogs("api.passwords", "INFO") as logs:
+            self.login()
+        self.assertIn("'customer': {'verified': 1", logs.output[-1])
+
+
+class TokenLifecycleTests(ApiTestCase):
+    url = "/api/v1/me/staff/"
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_concurrent_first_logins_share_one_token(self):
+        winner = Token.objects.create(user=self.borrower)
+        # This login looked before the other one committed its token.
+        with patch("django.db.models.query.QuerySet.first", return_value=None):
+            self.assertEqual(tokens.issue(self.borrower), winner)
+
+    def age(self, **delta):
+        TokenExpiry.objects.filter(pk=self.token.pk).update(
+            last_used_at=F("last_used_at") - timedelta(**delta),
+            expires_at=F("expires_at") - timedelta(**delta),
+        )
+
+    def test_use_is_recorded_at_most_once_per_interval(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            # Cached principal, used within the interval: no write.
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.age(minutes=10)
+        authentication.clear_cache()
+        self.client.get(self.url)
+        expiry = TokenExpiry.objects.get(pk=self.token.pk)
+        self.assertLess(timezone.now() - expiry.last_used_at, timedelta(minutes=1))
+        self.assertGreater(expiry.expires_at, timezone.now() + timedelta(days=29))
+
+    def test_expired_token_is_refused_and_replaced_on_login(self):
+        self.age(days=31)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        res = self.client.post(
+            "/api/v1/auth/staff-token/",
+            {"username": "officer", "password": "password123"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res.data["token"], self.token.key)
+        self.assertIn("expires_at", res.data)
+
+    def test_rotate_issues_new_key_and_revokes_old(self):
+        res = self.client.post("/api/v1/auth/rotate-token/")
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res.data["token"], self.token.key)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {res.data['token']}")
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_rotated_and_purged_keys_fail_on_workers_with_a_warm_cache(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        other_worker = dict(authentication._principals)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post("/api/v1/auth/rotate-token/")
+        authentication._principals.update(other_worker)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {res.data['token']}")
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        other_worker = dict(authentication._principals)
+        TokenExpiry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(tokens.purge_expired(), 1)
+        authentication._principals.update(other_worker)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_purge_deletes_only_expired_tokens_in_chunks(self):
+        others = [
+            Token.objects.create(
+                user=User.objects.create_user(username=f"old{i}", email=f"old{i}@example.com")
+            )
+            for i in range(5)
+        ]
+        TokenExpiry.objects.filter(pk__in=[t.pk for t in others]).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(tokens.purge_expired(chunk_size=2), 5)
+        self.assertEqual(list(Token.objects.values_list("pk", flat=True)), [self.token.pk])
+        self.assertFalse(TokenExpiry.objects.exclude(pk=self.token.pk).exists())
+        call_command("purge_expired_tokens", stdout=io.StringIO())
+        self.assertTrue(Token.objects.filter(pk=self.token.pk).exists())
+
+
+@override_settings(VELOCITY_LIMITS={"register": {"ip": (3, 3600), "ip+email": (2, 3600)}})
+class VelocityTests(ApiTestCase):
+    url = "/api/v1/auth/customer-register/"
+
+    def register(self, email, ip="203.0.113.7"):
+        return self.client.post(
+            self.url,
+            {"fullName": "Kofi Boateng", "email": email, "password": "a-long-passphrase"},
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def test_rejects_bursts_per_identifier_and_ip_before_any_query(self):
+        self.assertEqual(self.register("kofi@example.com").status_code, 201)
+        self.assertEqual(self.register(" KOFI@example.com").status_code, 400)
+        with self.assertNumQueries(0):
+            res = self.register("Kofi@Example.com")
+        self.assertEqual(res.status_code, 429)
+        self.assertIn("Retry-After", res)
+        # The same email from another address is not locked out.
+        self.assertEqual(self.register("kofi@example.com", "198.51.100.9").status_code, 400)
+
+    def test_rejects_bursts_per_ip(self):
+        for n in range(3):
+            self.assertEqual(self.register(f"user{n}@example.com").status_code, 201)
+        self.assertEqual(self.register("user3@example.com").status_code, 429)
+        self.assertEqual(self.register("user3@example.com", "198.51.100.9").status_code, 201)
+
+    def test_sliding_window_weights_previous_bucket(self):
+        store = velocity.LocalStore()
+        for _ in range(10):
+            store.hit("k", 60, 1000 * 60 + 30)
+        # Halfway into the next bucket, half of the previous one still counts.
+        now = 1001 * 60 + 30
+        self.assertEqual(store.hit("k", 60, now).estimate(now, 60), 6)
+        self.assertEqual(store.hit("k", 60, 1003 * 60), (1, 0))
+
+    def test_retry_after_follows_the_sliding_estimate(self):
+        # 48s into the bucket one more attempt fits: 3 + 10 * (1 - 48/60) = 5.
+        self.assertEqual(velocity.Count(2, 10).retry_after(5, 60 * 1000, 60), 48)
+        # Over the limit on this bucket alone: wait it out, then 36s for 1 + 10 * 0.4 = 5.
+        self.assertEqual(velocity.Count(10, 0).retry_after(5, 60 * 1000 + 30, 60), 30 + 36)
+
+    def test_proxy_count(self):
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="1.2.3.4, 198.51.100.1"
+        )
+        with override_settings(VELOCITY_PROXY_COUNT=0):
+            self.assertEqual(velocity.client_ip(request), "10.0.0.2")
+        with override_settings(VELOCITY_PROXY_COUNT=1):
+            self.assertEqual(velocity.client_ip(request), "198.51.100.1")
+        with override_settings(VELOCITY_PROXY_COUNT=3):
+            self.assertEqual(velocity.client_ip(request), "10.0.0.2")
+        with override_settings(VELOCITY_PROXY_COUNT=-1):
+            with self.assertRaises(ImproperlyConfigured):
+                velocity.client_ip(request)
+
+
+class MePayloadCacheTests(ApiTestCase):
+    url = "/api/v1/me/"
+
+    def setUp(self):
+        super().setUp()
+        token = Token.objects.create(user=self.borrower)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def add_loan(self, payments):
+        app = LoanApplication.objects.create(
+            customer=self.customer,
+            product=self.product,
+            requested_amount=Decimal("200.00"),
+            tenure_days=60,
+            status=LoanApplication.Status.APPROVED,
+        )
+        loan = Loan.objects.create(
+            application=app,
+            principal_amount=Decimal("200.00"),
+            interest_rate=Decimal("10.00"),
+            tenure_months=12,
+            disbursed_at=timezone.now(),
+            maturity_date=timezone.now().date() + timedelta(days=365),
+        )
+        for _ in range(payments):
+            self.make_payment(loan=loan)
+
+    def test_cold_build_uses_constant_queries(self):
+        self.client.get("/api/v1/me/customer/")  # warm the auth cache
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        cache.clear()
+        for _ in range(3):
+            self.add_loan(payments=2)
+        self.client.get("/api/v1/me/customer/")  # clearing the cache dropped auth generations
+        with self.assertNumQueries(4):
+            res = self.client.get(self.url)
+        self.assertEqual(len(res.data["loans"]), 4)
+        self.assertEqual(
+            sorted(loan["total_paid"] for loan in res.data["loans"]),
+            ["0.00", "20.00", "20.00", "20.00"],
+        )
+
+    def test_repeat_visit_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            again = self.client.get(self.url)
+        self.assertEqual(again.data, first.data)
+
+    def test_payload_rebuilt_when_customer_data_changes(self):
+        self.client.get(self.url)
+        events.payment_recorded(self.make_payment(amount=Decimal("55.00")))
+        res = self.client.get(self.url)
+        self.assertEqual(res.data["loans"][0]["total_paid"], "55.00")
+
+        self.client.patch("/api/v1/me/user/", {"first_name": "Akosua"}, format="json")
+        res = self.client.get(self.url)
+        self.assertEqual(res.data["user"]["first_name"], "Akosua")
+        self.assertEqual(res.data["applications"][0]["customer_name"], "Akosua Mensah")
+
+
+class ApplicationSyncTests(ApiTestCase):
+    url = "/api/v1/applications/sync/"
+
+    def setUp(self):
+        super().setUp()
+        token = Token.objects.create(user=self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def item(self, **overrides):
+        n = overrides.pop("n", 1)
+        data = {
+            "fullName": f"Kofi Boateng{n}",
+            "email": f"kofi{n}@example.com",
+            "phone": "0240000000",
+            "dateOfBirth": "2000-05-01",
+            "ghanaCardNumber": f"GHA-10000000{n}-1",
+            "emergencyName": "Efua",
+            "emergencyPhone": "0240000001",
+            "emergencyRelation": "Sister",
+            "selectedProduct": "quickcredit",
+            "loanAmount": "300",
+            "loanPurpose": "Stock",
+            "termsAccepted": True,
+            "clientRef": f"device-a:{n}",
+        }
+        data.update(overrides)
+        return data
+
+    def sync(self, *items):
+        res = self.client.post(self.url, {"applications": list(items)}, format="json")
+        self.assertEqual(res.status_code, 200)
+        return res.data["results"]
+
+    def test_creates_applications_and_reports_each_item(self):
+        results = self.sync(
+            self.item(n=1),
+            self.item(n=2, loanAmount="5000"),
+            self.item(n=3, termsAccepted=False),
+            # Existing borrower, same email in another case.
+            self.item(n=4, email="AMA@example.com", ghanaCardNumber="GHA-000000001-1"),
+            self.item(n=5, ghanaCardNumber="GHA-000000001-1"),
+        )
+        self.assertEqual(
+            [r["status"] for r in results], ["created", "error", "error", "created", "error"]
+        )
+        self.assertEqual([r["index"] for r in results], [0, 1, 2, 3, 4])
+        self.assertIn("loanAmount", results[1]["errors"])
+        self.assertIn("termsAccepted", results[2]["errors"])
+        self.assertIn("ghanaCardNumber", results[4]["errors"])
+
+        created = LoanApplication.objects.get(pk=results[0]["application_id"])
+        self.assertEqual(created.client_reference, "device-a:1")
+        self.assertEqual(created.status, LoanApplication.Status.SUBMITTED)
+        self.assertEqual(created.customer.user.email, "kofi1@example.com")
+        self.assertFalse(created.customer.user.has_usable_password())
+        self.assertTrue(created.customer.consents.exists())
+        self.assertEqual(
+            LoanApplication.objects.get(pk=results[3]["application_id"]).customer, self.customer
+        )
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.data_version, 1)
+        self.assertEqual(User.objects.get(pk=self.borrower.pk).first_name, "Kofi")
+
+    def test_resending_a_batch_is_idempotent(self):
+        first = self.sync(self.item(n=1), self.item(n=2))
+        again = self.sync(self.item(n=1), self.item(n=2), self.item(n=3))
+        self.assertEqual([r["status"] for r in again], ["duplicate", "duplicate", "created"])
+        self.assertEqual(
+            [r["application_id"] for r in again[:2]], [r["application_id"] for r in first]
+        )
+        self.assertEqual(LoanApplication.objects.filter(client_reference__isnull=False).count(), 3)
+
+    def test_in_batch_repeats_match_sequential_submits(self):
+        results = self.sync(
+            self.item(n=1),
+            self.item(n=1, clientRef="device-a:1b", loanAmount="400"),
+            self.item(n=1),
+            self.item(n=2, ghanaCardNumber="GHA-100000001-1"),
+        )
+        self.assertEqual(
+            [r["status"] for r in results], ["created", "created", "duplicate", "error"]
+        )
+        self.assertEqual(results[2]["application_id"], results[0]["application_id"])
+        self.assertEqual(Customer.objects.filter(email="kofi1@example.com").count(), 1)
+        self.assertEqual(User.objects.filter(email="kofi2@example.com").count(), 0)
+
+    def test_staff_only_and_size_limit(self):
+        with self.settings(APPLICATION_SYNC_MAX_ITEMS=1):
+            res = self.client.post(
+                self.url, {"applications": [self.item(n=1), self.item(n=2)]}, format="json"
+            )
+        self.assertEqual(res.status_code, 400)
+        token = Token.objects.create(user=self.borrower)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        res = self.client.post(self.url, {"applications": [self.item()]}, format="json")
+        self.assertEqual(res.status_code, 403)
+
+
+class SyncTests(ApiTestCase):
+    url = "/api/v1/sync/"
+
+    def login(self, user):
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def sync(self, **cursors):
+        res = self.client.get(self.url, cursors)
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def test_returns_only_changes_after_the_cursor(self):
+        self.login(self.staff_user)
+        first = self.sync()
+        self.assertEqual(set(first), {"applications", "loans", "payments", "customers"})
+        self.assertEqual([r["id"] for r in first["loans"]["changes"]], [self.loan.pk])
+        cursors = {name: part["cursor"] for name, part in first.items()}
+
+        payment = self.make_payment(amount=Decimal("25.00"))
+        self.application.status = LoanApplication.Status.UNDER_REVIEW
+        self.application.save(update_fields=["status"])
+        second = self.sync(**cursors)
+        self.assertEqual([r["id"] for r in second["payments"]["changes"]], [payment.pk])
+        self.assertEqual(second["payments"]["changes"][0]["amount"], "25.00")
+        self.assertEqual(second["applications"]["changes"][0]["status"], "UNDER_REVIEW")
+        self.assertEqual(second["loans"]["changes"], [])
+        self.assertEqual(second["loans"]["cursor"], cursors["loans"])
+
+        cursors = {name: part["cursor"] for name, part in second.items()}
+        payment_id = payment.pk
+        payment.delete()
+        third = self.sync(payments=cursors["payments"])
+        self.assertEqual(list(third), ["payments"])
+        self.assertEqual(third["payments"]["changes"], [])
+        self.assertEqual(third["payments"]["deleted"], [payment_id])
+        self.assertGreater(third["payments"]["cursor"], cursors["payments"])
+
+    def test_partial_save_stamps_in_the_same_update(self):
+        before = self.application.change_seq
+        self.application.status = LoanApplication.Status.UNDER_REVIEW
+        with CaptureQueriesContext(connection) as queries:
+            self.application.save(update_fields=["status"])
+        table = LoanApplication._meta.db_table
+        updates = [q["sql"] for q in queries if q["sql"].startswith(f'UPDATE "{table}"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"change_seq"', updates[0])
+        self.application.refresh_from_db()
+        self.assertGreater(self.application.change_seq, before)
+
+    def test_postgresql_refuses_tracked_writes_under_autocommit(self):
+        self.application.status = LoanApplication.Status.UNDER_REVIEW
+        with (
+            patch.object(connection, "vendor", "postgresql"),
+            patch.object(connection, "in_atomic_block", False),
+            self.assertRaises(TransactionManagementError),
+        ):
+            self.application.save(update_fields=["status"])
+
+    def test_pages_through_changes_in_sequence_order(self):
+        self.login(self.staff_user)
+        payments = [self.make_payment() for _ in range(3)]
+        cursor, seen = 0, []
+        while True:
+            part = self.sync(payments=cursor, limit=2)["payments"]
+            seen += [r["id"] for r in part["changes"]]
+            cursor = part["cursor"]
+            if not part["has_more"]:
+                break
+        self.assertEqual(seen, [p.pk for p in payments])
+
+    def test_borrowers_only_see_their_own_rows(self):
+        other_user = User.objects.create_user(username="kwame", email="kwame@example.com")
+        other = Customer.objects.create(
+            user=other_user,
+            national_id_number="GHA-000000002-2",
+            date_of_birth="1990-01-01",
+            phone_number="0240000002",
+            residential_address="Kumasi",
+            occupation="Farmer",
+            monthly_income=Decimal("800.00"),
+        )
+        LoanApplication.objects.create(
+            customer=other, product=self.product, requested_amount=Decimal("100.00"), tenure_days=30
+        )
+        self.make_payment()
+        self.login(self.borrower)
+        data = self.sync()
+        self.assertEqual([r["id"] for r in data["customers"]["changes"]], [str(self.customer.pk)])
+        self.assertEqual(
+            [r["id"] for r in data["applications"]["changes"]], [self.application.pk]
+        )
+        self.assertEqual(len(data["payments"]["changes"]), 1)
+
+    def test_rejects_bad_cursors_and_other_users(self):
+        self.login(self.staff_user)
+        self.assertEqual(self.client.get(self.url, {"loans": "abc"}).status_code, 400)
+        self.login(User.objects.create_user(username="nobody"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class StaffSearchTests(ApiTestCase):
+    url = "/api/v1/staff/search/"
+
+    def setUp(self):
+        super().setUp()
+        token = Token.objects.create(user=self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        kwame = User.objects.create_user(
+            username="kwame", email="kwame@example.com", first_name="Kwame", last_name="Amankwah"
+        )
+        self.other = Customer.objects.create(
+            user=kwame,
+            national_id_number="GHA-000000002-2",
+            date_of_birth="1990-01-01",
+            phone_number="0209876543",
+            residential_address="Kumasi",
+            occupation="Farmer",
+            monthly_income=Decimal("800.00"),
+        )
+
+    def search(self, q, **params):
+        res = self.client.get(self.url, {"q": q, **params})
+        self.assertEqual(res.status_code, 200)
+        return res.data["results"]
+
+    def test_matches_name_phone_id_and_email(self):
+        result = self.search("mensah")
+        self.assertEqual([r["id"] for r in result], [self.customer.pk])
+        self.assertEqual(result[0]["name"], "Ama Mensah")
+        self.assertEqual([a["id"] for a in result[0]["applications"]], [self.application.pk])
+        self.assertEqual(result[0]["loans"][0]["principal_amount"], "500.00")
+        self.assertEqual([r["id"] for r in self.search("6543")], [self.other.pk])
+        self.assertEqual([r["id"] for r in self.search("gha-000000002")], [self.other.pk])
+        self.assertEqual([r["id"] for r in self.search("ama@exam")], [self.customer.pk])
+        self.assertEqual(len(self.search("example.com")), 2)
+        self.assertEqual(len(self.search("example.com", limit=1)), 1)
+        self.assertEqual(self.search("nobody-here"), [])
+
+    def test_index_follows_customer_and_user_updates(self):
+        self.borrower.last_name = "Owusu"
+        self.borrower.save()
+        self.assertEqual(self.search("mensah"), [])
+        self.assertEqual([r["id"] for r in self.search("owusu")], [self.customer.pk])
+
+        self.other.phone_number = "0551112222"
+        self.other.save(update_fields=["phone_number"])
+        self.assertEqual(self.search("6543"), [])
+        self.assertEqual([r["id"] for r in self.search("1112222")], [self.other.pk])
+
+        self.other.delete()
+        self.assertEqual(self.search("kwame"), [])
+
+    def test_index_survives_customer_rowids_being_renumbered(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite FTS index")
+        with connection.cursor() as cursor:
+            # What VACUUM may do to a table whose primary key is not an INTEGER PRIMARY KEY.
+            cursor.execute("UPDATE customers_customer SET rowid = rowid + 1000")
+        self.assertEqual([r["id"] for r in self.search("kwame")], [self.other.pk])
+        self.other.phone_number = "0551112222"
+        self.other.save()
+        self.assertEqual(self.search("6543"), [])
+        self.assertEqual([r["id"] for r in self.search("1112222")], [self.other.pk])
+
+    def test_saving_a_customer_reads_the_user_only_when_the_document_needs_it(self):
+        user_table = User._meta.db_table
+        customer = Customer.objects.get(pk=self.other.pk)
+        customer.occupation = "Trader"
+        with CaptureQueriesContext(connection) as ctx:
+            customer.save()
+        self.assertFalse([q for q in ctx.captured_queries if user_table in q["sql"]])
+
+        customer.phone_number = "0551112222"
+        customer.save()
+        self.assertEqual([r["id"] for r in self.search("1112222")], [self.other.pk])
+        self.assertEqual([r["id"] for r in self.search("kwame")], [self.other.pk])
+
+    def test_validation_and_permissions(self):
+        self.assertEqual(self.client.get(self.url, {"q": "ab"}).status_code, 400)
+        token = Token.objects.create(user=self.borrower)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.assertEqual(self.client.get(self.url, {"q": "mensah"}).status_code, 403)
+
+
+class BatchTests(ApiTestCase):
+    url = "/api/v1/batch/"
+
+    def setUp(self):
+        super().setUp()
+        token = Token.objects.create(user=self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_dispatches_sub_requests_in_order(self):
+        self.make_payment(amount=Decimal("30.00"))
+        res = self.client.post(
+            self.url,
+            {
+                "requests": [
+                    {"id": "me", "path": "me/staff/"},
+                    {"id": "summary", "path": "staff/dashboard-summary/"},
+                    {"path": "/api/v1/staff/payments/?page_size=1&count=1"},
+                    {"id": "products", "path": "products/"},
+                    {"id": "missing", "path": "nope/"},
+                    {"id": "borrower-only", "path": "me/"},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+        responses = res.data["responses"]
+        self.assertEqual(
+            [r["id"] for r in responses],
+            [
+                "me",
+                "summary",
+                "/api/v1/staff/payments/?page_size=1&count=1",
+                "products",
+                "missing",
+                "borrower-only",
+            ],
+        )
+        self.assertEqual([r["status"] for r in responses], [200, 200, 200, 200, 404, 403])
+        self.assertEqual(responses[0]["body"]["username"], "officer")
+        self.assertEqual(responses[2]["body"]["count"], 1)
+        self.assertEqual(responses[2]["body"]["results"][0]["amount"], "30.00")
+        self.assertIn("etag", responses[3])
+        self.assertTrue(all(r["duration_ms"] >= 0 for r in responses))
+
+    def test_rejects_streams_recursion_and_oversized_batches(self):
+        res = self.client.post(
+            self.url,
+            {"requests": [{"path": "staff/live/"}, {"path": "batch/"}]},
+            format="json",
+        )
+        self.assertEqual([r["status"] for r in res.data["responses"]], [400, 404])
+
+        with self.settings(BATCH_MAX_REQUESTS=2):
+            res = self.client.post(
+                self.url, {"requests": [{"path": "products/"}] * 3}, format="json"
+            )
+        self.assertEqual(res.status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        res = self.client.post(self.url, {"requests": [{"path": "products/"}]}, format="json")
+        self.assertEqual(res.status_code, 401)
+
+    def test_sub_requests_keep_each_views_permissions(self):
+        token = Token.objects.create(user=self.borrower)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        res = self.client.post(
+            self.url,
+            {"requests": [{"path": "me/"}, {"path": "staff/dashboard-summary/"}]},
+            format="json",
+        )
+        self.assertEqual([r["status"] for r in res.data["responses"]], [200, 403])
+
+        self.client.credentials()
+        self.client.force_login(self.borrower)  # session caller
+        res = self.client.post(
+            self.url,
+            {"requests": [{"path": "me/"}, {"path": "staff/loans/"}]},
+            format="json",
+        )
+        self.assertEqual([r["status"] for r in res.data["responses"]], [200, 403])
+
+
+class BatchConcurrencyTests(APITransactionTestCase):
+    def test_sub_requests_run_on_worker_threads(self):
+        staff = User.objects.create_user(username="officer", password="x", is_staff=True)
+        self.client.force_authenticate(staff)
+        res = self.client.post(
+            "/api/v1/batch/",
+            {
+                "requests": [
+                    {"path": "products/"},
+                    {"path": "me/staff/"},
+                    {"path": "staff/activity/"},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual([r["status"] for r in res.data["responses"]], [200, 200, 200])
+
+
+@override_settings(ROOT_URLCONF="api.tests")
+class AsyncReadViewTests(ApiTestCase):
+    """The async read views (API_ASYNC_VIEWS) must serve the same bytes as the sync views."""
+
+    def login(self, user):
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def assert_parity(self, path, **params):
+        cache.clear()
+        sync_res = self.client.get(f"/api/v1/{path}", params)
+        cache.clear()
+        async_res = self.client.get(f"/async/api/v1/{path}", params)
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        self.assertEqual(json.loads(async_res.content), json.loads(sync_res.content))
+        return sync_res, async_res
+
+    def test_me(self):
+        self.make_payment(amount=Decimal("12.00"))
+        self.login(self.borrower)
+        sync_res, async_res = self.assert_parity("me/")
+        self.assertEqual(async_res["ETag"], sync_res["ETag"])
+        res = self.client.get("/async/api/v1/me/", HTTP_IF_NONE_MATCH=sync_res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_products(self):
+        sync_res, async_res = self.assert_parity("products/")
+        self.assertEqual(async_res["ETag"], sync_res["ETag"])
+
+    def test_session_authentication_and_negotiation(self):
+        self.client.force_login(self.borrower)
+        res = self.client.get("/async/api/v1/me/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/json")
+        res = self.client.get("/async/api/v1/me/", HTTP_ACCEPT="application/xml")
+        self.assertEqual(res.status_code, 406)
+
+    @skipUnless(find_spec("msgpack"), "msgpack not installed")
+    def test_msgpack(self):
+        import msgpack
+
+        self.login(self.staff_user)
+        sync_res = self.client.get("/api/v1/staff/dashboard-summary/")
+        res = self.client.get(
+            "/async/api/v1/staff/dashboard-summary/", HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(res.content), json.loads(sync_res.content))
+
+    def test_staff_dashboard_and_analytics(self):
+        self.make_payment(amount=Decimal("80.00"))
+        self.login(self.staff_user)
+        self.assert_parity("staff/dashboard-summary/")
+        self.assert_parity("staff/analytics/summary/", granularity="day")
+        self.assert_parity("staff/analytics/summary/", granularity="hour")
+
+    def test_authentication_and_permissions(self):
+        res = self.client.get("/async/api/v1/staff/dashboard-summary/")
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+        self.login(self.borrower)
+        self.assertEqual(self.client.get("/async/api/v1/staff/dashboard-summary/").status_code, 403)
+        self.assertEqual(self.client.post("/async/api/v1/me/").status_code, 405)
+
+
+@override_settings(ROOT_URLCONF="api.tests")
+class AsyncGatherReadsTests(APITransactionTestCase):
+    def test_dashboard_reads_run_on_worker_threads(self):
+        staff = User.objects.create_user(username="officer", password="x", is_staff=True)
+        token = Token.objects.create(user=staff)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        cache.clear()
+        res = self.client.get("/async/api/v1/staff/dashboard-summary/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(json.loads(res.content)["pending_applications"], 0)
+
+    def test_pool_threads_keep_their_connections(self):
+        threads = settings.API_ASYNC_READ_THREADS
+        connects = []
+        read = LoanProduct.objects.count
+
+        def count_connect(sender, connection, **kwargs):
+            connects.append(threading.current_thread().name)
+
+        barrier = threading.Barrier(threads)
+
+        def close():
+            # One per pool thread: the barrier holds each until all of them are busy.
+            barrier.wait(timeout=5)
+            connection.close()
+
+        connection_created.connect(count_connect)
+        try:
+            with patch.dict(connection.settings_dict, {"CONN_MAX_AGE": None}):
+                for _ in range(5):
+                    async_to_sync(gather_reads)(read, read)
+        finally:
+            connection_created.disconnect(count_connect)
+            async_to_sync(gather_reads)(*[close] * threads)
+        self.assertLessEqual(len(connects), threads)
+        self.assertTrue(all(name.startswith("async-read") for name in connects))
+
+
+# URLconf for the async view tests: async read views under /async/, the regular API as usual.
+urlpatterns = [
+    path("async/api/v1/", include(async_read_urlpatterns)),
+    path("api/v1/", include("api.urls")),
+]
@@ -0,0 +1,134 @@
+"""
+Expiry, rotation and cleanup of API tokens.
+
+A token expires TOKEN_TTL_SECONDS after it was last used (api.models.TokenExpiry). Recording
+every use would turn each authenticated read into a write, so last_used_at only moves when it
+is more than TOKEN_TOUCH_INTERVAL_SECONDS old. That is one conditional UPDATE per token per
+interval, whichever worker sees it first; the cached principal in api.authentication carries
+the new value, so the rest of the interval costs nothing. A token may therefore outlive its
+last use by up to TTL + interval.
+
+Logging in again replaces an expired token. auth/rotate-token/ swaps a live one for a new key.
+purge_expired() (management command purge_expired_tokens) deletes expired tokens in small
+chunks, each in its own transaction, so no lock is held for long. Both bump the owners' auth
+generations in the shared cache once they commit, so no worker keeps accepting a rotated or
+purged key from its principal cache (see api.authentication).
+"""
+
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import cache as api_cache
+from .models import TokenExpiry
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=settings.TOKEN_TTL_SECONDS)
+
+
+def expires_at(token):
+    expiry = getattr(token, "expiry", None)
+    # Tokens created with signals disconnected (e.g. raw fixtures) have no row.
+    return expiry.expires_at if expiry is not None else token.created + _ttl()
+
+
+def is_expired(token, now=None) -> bool:
+    return expires_at(token) <= (now or timezone.now())
+
+
+def touch(token, now=None) -> bool:
+    """Record a use of token, at most once per TOKEN_TOUCH_INTERVAL_SECONDS; True if it did."""
+    expiry = getattr(token, "expiry", None)
+    if expiry is None:
+        return False
+    now = now or timezone.now()
+    stale_before = now - timedelta(seconds=settings.TOKEN_TOUCH_INTERVAL_SECONDS)
+    if expiry.last_used_at > stale_before:
+        return False
+    TokenExpiry.objects.filter(pk=token.pk, last_used_at__lte=stale_before).update(
+        last_used_at=now, expires_at=now + _ttl()
+    )
+    expiry.last_used_at = now
+    expiry.expires_at = now + _ttl()
+    return True
+
+
+def issue(user) -> Token:
+    """The user's token, replacing it first if it has expired."""
+    with transaction.atomic():
+        token = Token.objects.select_related("expiry").filter(user=user).first()
+        if token is not None and is_expired(token):
+            token.delete()
+            token = None
+        if token is None:
+            try:
+                with transaction.atomic():
+                    token = Token.objects.create(user=user)
+            except IntegrityError:
+                # A concurrent login for the same user created it first.
+                token = Token.objects.select_related("expiry").get(user=user)
+    return token
+
+
+def _revoke(user_ids) -> None:
+    for user_id in user_ids:
+        api_cache.invalidate(f"{api_cache.AUTH_USER}:{user_id}")
+
+
+def rotate(token) -> Token:
+    """Delete token and give its user a new one."""
+    with transaction.atomic():
+        user = token.user
+        token.delete()
+        transaction.on_commit(partial(_revoke, [user.pk]))
+        return Token.objects.create(user=user)
+
+
+def purge_expired(chunk_size: int = 1000, now=None) -> int:
+    """Delete expired tokens chunk by chunk; returns how many went."""
+    now = now or timezone.now()
+    candidates = [
+        TokenExpiry.objects.filter(expires_at__lte=now)
+        .order_by("expires_at")
+        .values_list("token_id", flat=True),
+        Token.objects.filter(Q(expiry__isnull=True), created__lte=now - _ttl()).values_list(
+            "pk", flat=True
+        ),
+    ]
+    purged = 0
+    for keys in candidates:
+        while True:
+            chunk = list(keys[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic():
+                # Re-checked inside the transaction: a token used since the select survives.
+                expired = Token.objects.filter(pk__in=chunk).filter(
+                    Q(expiry__expires_at__lte=now)
+                    | Q(expiry__isnull=True, created__lte=now - _ttl())
+                )
+                owners = list(expired.values_list("user_id", flat=True))
+                purged += expired.delete()[1].get(Token._meta.label, 0)
+                transaction.on_commit(partial(_revoke, owners))
+            if len(chunk) < chunk_size:
+                break
+    return purged
+
+
+def _create_expiry(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        TokenExpiry.objects.create(
+            token=instance, last_used_at=instance.created, expires_at=instance.created + _ttl()
+        )
+
+
+def connect_signals() -> None:
+    from django.db.models.signals import post_save
+
+    post_save.connect(_create_expiry, sender=Token, dispatch_uid="api-token-expiry")
@@ -1,8 +1,13 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
+    ActivityEventViewSet,
     ApplicationSubmitView,
+    ApplicationSyncView,
+    BatchView,
     CustomerObtainAuthToken,
     CustomerPaymentCreateView,
     CustomerRegisterView,
@@ -13,17 +18,25 @@ from .views import (
     LoanApplicationViewSet,
     LoanProductViewSet,
     LoanViewSet,
+    LogoutView,
     MeView,
+    RotateTokenView,
     StaffAnalyticsSummaryView,
+    StaffApplicationClaimView,
+    StaffApplicationDecisionsView,
     StaffCollectionsLoansView,
     StaffDashboardSummaryView,
     StaffEmployeeViewSet,
     StaffInstitutionView,
+    StaffLiveTicketView,
     StaffLoanDisburseView,
     StaffLoanPaymentViewSet,
     StaffMeView,
     StaffObtainAuthToken,
+    StaffSearchView,
+    SyncView,
     UserSelfDetailView,
+    staff_live_events,
 )
 
 router = DefaultRouter()
@@ -35,20 +48,43 @@ router.register(r"staff/payments", StaffLoanPaymentViewSet, basename="staff-paym
 router.register(r"staff/ledger/accounts", LedgerAccountViewSet, basename="ledger-account")
 router.register(r"staff/ledger/entries", LedgerEntryViewSet, basename="ledger-entry")
 router.register(r"staff/employees", StaffEmployeeViewSet, basename="staff-employee")
+router.register(r"staff/activity", ActivityEventViewSet, basename="staff-activity")
 
-urlpatterns = [
-    path("staff/loans/disburse/", StaffLoanDisburseView.as_view()),
+sync_read_urlpatterns = [
     path("staff/dashboard-summary/", StaffDashboardSummaryView.as_view()),
     path("staff/analytics/summary/", StaffAnalyticsSummaryView.as_view()),
+    path("me/", MeView.as_view()),
+]
+
+# Same paths and payloads; products/ only overrides the router's list route.
+async_read_urlpatterns = [
+    path("staff/dashboard-summary/", async_views.staff_dashboard_summary),
+    path("staff/analytics/summary/", async_views.staff_analytics_summary),
+    path("me/", async_views.me),
+    path("products/", async_views.product_list),
+]
+
+urlpatterns = [
+    *(async_read_urlpatterns if settings.API_ASYNC_VIEWS else sync_read_urlpatterns),
+    path("batch/", BatchView.as_view()),
+    path("sync/", SyncView.as_view()),
+    path("staff/applications/next/", StaffApplicationClaimView.as_view()),
+    path("staff/applications/decisions/", StaffApplicationDecisionsView.as_view()),
+    path("staff/loans/disburse/", StaffLoanDisburseView.as_view()),
+    path("staff/live/", staff_live_events),
+    path("staff/live/ticket/", StaffLiveTicketView.as_view()),
+    path("staff/search/", StaffSearchView.as_view()),
     path("staff/collections/loans/", StaffCollectionsLoansView.as_view()),
     path("staff/institution/", StaffInstitutionView.as_view()),
     path("me/staff/", StaffMeView.as_view()),
     path("me/payments/", CustomerPaymentCreateView.as_view()),
     path("applications/submit/", ApplicationSubmitView.as_view()),
+    path("applications/sync/", ApplicationSyncView.as_view()),
     path("auth/customer-register/", CustomerRegisterView.as_view()),
     path("auth/staff-token/", StaffObtainAuthToken.as_view()),
     path("auth/customer-token/", CustomerObtainAuthToken.as_view()),
-    path("me/", MeView.as_view()),
+    path("auth/rotate-token/", RotateTokenView.as_view()),
+    path("auth/logout/", LogoutView.as_view()),
     path("me/user/", UserSelfDetailView.as_view()),
     path("me/customer/", CustomerSelfDetailView.as_view()),
     path("", include(router.urls)),
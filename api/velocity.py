@@ -0,0 +1,203 @@
+"""
+Sliding-window velocity limits for the anonymous write endpoints.
+
+CustomerRegisterView and ApplicationSubmitView are open to anyone, and each call costs
+several queries (and, for sign-up, a password hash). check() runs first in those views,
+before the serializer touches the database. It counts the attempt against every dimension in
+VELOCITY_LIMITS[endpoint]: the client IP, the email, phone and Ghana Card number in the body,
+or a combination such as "ip+email" (that identifier from that address, so nobody can lock a
+stranger out of sign-up by spraying their email from elsewhere). If any count is over its
+limit, the attempt is refused with 429 and a Retry-After for when the next attempt would fit.
+Rejected attempts count too, so a client that keeps hammering stays blocked until it backs off.
+A person retrying a failed form a few times stays far below the limits.
+
+Counts use the sliding window counter approximation: two fixed buckets per key, with the
+previous bucket weighted by how much of it still overlaps the window. That is O(1) memory per
+key and close to an exact sliding log in practice. Identifiers are stored as short BLAKE2b
+digests, never in the clear.
+
+The client IP is REMOTE_ADDR, or with VELOCITY_PROXY_COUNT proxies in front the address the
+outermost of them appended to X-Forwarded-For. Set it to exactly the number of proxies: too
+low and every client shares the proxy's address, too high and clients pick their own.
+
+The store is in-process by default (a bounded dict behind one lock, so a check costs
+microseconds), which limits each worker separately. Set VELOCITY_CACHE to a Django cache
+alias (e.g. a Redis-backed one) to share counts across workers and hosts.
+"""
+
+import hashlib
+import re
+import threading
+import time
+
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import Throttled
+
+_MAX_KEYS = 100_000
+
+
+class TooManyAttempts(Throttled):
+    default_detail = "Too many attempts. Please wait a while before trying again."
+
+
+class Count(NamedTuple):
+    """Attempts in the current and previous fixed buckets of a key."""
+
+    current: int
+    previous: int
+
+    def estimate(self, now: float, window: int) -> float:
+        return self.current + self.previous * (1 - (now % window) / window)
+
+    def retry_after(self, limit: int, now: float, window: int) -> float:
+        """Seconds until the estimate leaves room for one more attempt, if none arrive."""
+        elapsed = now % window
+        room = max(limit - 1, 0)
+        if self.current <= room:
+            # The previous bucket's weight has to fade enough within this bucket.
+            fade = 1 - (room - self.current) / self.previous if self.previous else 0
+            return max(fade * window - elapsed, 0.0)
+        # This bucket becomes the previous one and has to fade in the next.
+        return window - elapsed + (1 - room / self.current) * window
+
+
+class LocalStore:
+    """Counters for this process only; a slot is [bucket, current, previous, window]."""
+
+    def __init__(self, max_keys: int = _MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._slots: dict[str, list] = {}
+
+    def hit(self, key: str, window: int, now: float) -> Count:
+        bucket = int(now // window)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if len(self._slots) >= self.max_keys:
+                    self._prune(now)
+                slot = self._slots[key] = [bucket, 0, 0, window]
+            elif slot[0] != bucket:
+                slot[2] = slot[1] if slot[0] == bucket - 1 else 0
+                slot[0], slot[1] = bucket, 0
+            slot[1] += 1
+            return Count(slot[1], slot[2])
+
+    def _prune(self, now: float) -> None:
+        stale = [k for k, s in self._slots.items() if s[0] < int(now // s[3]) - 1]
+        for key in stale:
+            del self._slots[key]
+        if len(self._slots) >= self.max_keys:
+            self._slots.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots.clear()
+
+
+class CacheStore:
+    """Counters in a Django cache, shared by every process that uses the same alias."""
+
+    def __init__(self, alias: str):
+        self.cache = caches[alias]
+
+    def hit(self, key: str, window: int, now: float) -> Count:
+        bucket = int(now // window)
+        current_key = f"velocity:{key}:{bucket}"
+        self.cache.add(current_key, 0, timeout=2 * window)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr().
+            self.cache.set(current_key, 1, timeout=2 * window)
+            current = 1
+        previous = self.cache.get(f"velocity:{key}:{bucket - 1}", 0)
+        return Count(current, previous)
+
+    def clear(self) -> None:
+        pass
+
+
+_lock = threading.Lock()
+_stores: dict[str, object] = {}
+
+
+def _store():
+    alias = settings.VELOCITY_CACHE
+    with _lock:
+        if alias not in _stores:
+            _stores[alias] = CacheStore(alias) if alias else LocalStore()
+        return _stores[alias]
+
+
+def reset() -> None:
+    """Forget this process's counters (tests)."""
+    with _lock:
+        for store in _stores.values():
+            store.clear()
+
+
+def _proxy_count() -> int:
+    proxies = settings.VELOCITY_PROXY_COUNT
+    if not isinstance(proxies, int) or isinstance(proxies, bool) or proxies < 0:
+        raise ImproperlyConfigured(
+            f"VELOCITY_PROXY_COUNT must be a non-negative integer, not {proxies!r}."
+        )
+    return proxies
+
+
+def client_ip(request) -> str:
+    """Client address; with VELOCITY_PROXY_COUNT proxies in front, the hop they appended."""
+    proxies = _proxy_count()
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    if proxies and forwarded:
+        hops = [h.strip() for h in forwarded.split(",") if h.strip()]
+        # Fewer hops than proxies: the request skipped one, so the header proves nothing.
+        if len(hops) >= proxies:
+            return hops[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _body_value(data, field: str) -> str:
+    value = data.get(field) if hasattr(data, "get") else None
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _identifiers(request) -> dict[str, str]:
+    """Normalised so trivial variations of one identifier share a count."""
+    data = request.data
+    return {
+        "ip": client_ip(request),
+        "email": _body_value(data, "email").lower(),
+        # Last nine digits: 024..., +23324... and 23324... are the same number.
+        "phone": re.sub(r"\D", "", _body_value(data, "phone"))[-9:],
+        "card": _body_value(data, "ghanaCardNumber").upper(),
+    }
+
+
+def _digest(value: str) -> str:
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+def check(endpoint: str, request) -> None:
+    """Count this attempt; raise TooManyAttempts when any dimension is over its limit."""
+    limits = settings.VELOCITY_LIMITS.get(endpoint)
+    if not limits:
+        return
+    store = _store()
+    now = time.time()
+    identifiers = _identifiers(request)
+    wait = None
+    for dimension, (limit, window) in limits.items():
+        parts = [identifiers.get(name, "") for name in dimension.split("+")]
+        if not all(parts):
+            continue
+        count = store.hit(f"{endpoint}:{dimension}:{_digest(chr(0).join(parts))}", window, now)
+        if count.estimate(now, window) > limit:
+            wait = max(wait or 0.0, count.retry_after(limit, now, window))
+    if wait is not None:
+        raise TooManyAttempts(wait=max(wait, 1))
@@ -1,31 +1,55 @@
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
 from decimal import Decimal
 
+import hashlib
 import uuid
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
-from django.db.models import Count, Exists, OuterRef, Sum
-from django.db.models.functions import TruncMonth
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Subquery, Sum
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from rest_framework.authtoken.models import Token
 from rest_framework import mixins, serializers as drf_serializers, status, viewsets
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from analytics import rollups
+from audit.models import ActivityEvent
+from customers import search as customer_search
 from customers.models import Customer, CustomerConsent
 from institutions.models import Employee, FinancialInstitution
 from ledger.models import LedgerAccount, LedgerEntry
-from loans.models import Loan, LoanApplication, LoanProduct
+from loans import review_queue
+from loans.models import Loan, LoanApplication, LoanApproval, LoanProduct
 from payments.models import LoanPayment
+from sync import changes
 
+from . import cache as api_cache
+from .authentication import CachedTokenAuthentication
+from . import batch, events, fast_serializers, live, tokens, velocity
 from .permissions import IsCustomerUser, IsStaffUser
 from .serializers import (
+    EXPECTED_REPAYMENT_SCALE,
+    ActivityEventSerializer,
+    ApplicationDecisionsSerializer,
     ApplicationSubmitSerializer,
+    ApplicationSyncItemSerializer,
+    ApplicationSyncRequestSerializer,
+    BatchRequestSerializer,
     CollectionsLoanSerializer,
+    CustomerAuthTokenSerializer,
     CustomerPaymentCreateSerializer,
     CustomerRegisterSerializer,
     CustomerSerializer,
@@ -43,19 +67,42 @@ from .serializers import (
     StaffEmployeeCreateSerializer,
     StaffLoanPaymentSerializer,
     StaffRecordPaymentSerializer,
+    StaffSearchQuerySerializer,
+    SyncQuerySerializer,
     UserSelfSerializer,
     create_application_from_validated,
+    create_applications_from_validated,
     loan_expected_total_repayment,
+    loan_expected_total_repayment_scaled_expr,
+    loan_total_paid_subquery,
     split_full_name,
 )
 
 User = get_user_model()
 
 
+def _stamp_etag(*parts) -> str:
+    """
+    ETag from cheap version stamps (counters, updated_at, row counts) rather than the body, so
+    If-None-Match can be answered with a 304 before anything is serialized.
+    """
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+
+def _media_type(request) -> str:
+    """
+    The negotiated media type, as an ETag part: JSON and MessagePack bodies of one resource
+    are different representations and must not validate each other's ETags. The views that
+    use it also send Vary: Accept.
+    """
+    return getattr(request, "accepted_media_type", None) or ""
+
+
 class CustomerRegisterView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        velocity.check("register", request)
         ser = CustomerRegisterSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         d = ser.validated_data
@@ -71,7 +118,7 @@ class CustomerRegisterView(APIView):
                 type=User.UserType.CUSTOMER,
             )
             pending_id = f"PENDING-{uuid.uuid4().hex}"[:50]
-            Customer.objects.create(
+            customer = Customer.objects.create(
                 user=user,
                 national_id_type=Customer.IDType.GHANACARD,
                 national_id_number=pending_id,
@@ -89,28 +136,122 @@ class CustomerRegisterView(APIView):
                 version="2025-01",
                 defaults={},
             )
-            token, _ = Token.objects.get_or_create(user=user)
-        return Response({"token": token.key}, status=status.HTTP_201_CREATED)
+            token = tokens.issue(user)
+            events.customer_registered(customer)
+        return Response(
+            {"token": token.key, "expires_at": tokens.expires_at(token)},
+            status=status.HTTP_201_CREATED,
+        )
 
 
 class ApplicationSubmitView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        velocity.check("submit", request)
         ser = ApplicationSubmitSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         try:
-            application = create_application_from_validated(ser.validated_data)
+            with transaction.atomic():
+                application = create_application_from_validated(ser.validated_data)
+                events.application_submitted(application)
         except drf_serializers.ValidationError as e:
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         out = LoanApplicationListSerializer(application).data
         return Response(out, status=status.HTTP_201_CREATED)
 
 
+class ApplicationSyncView(APIView):
+    """
+    POST {"applications": [{...applications/submit/ fields..., "clientRef": "..."}, ...]}
+
+    Uploads applications a field agent captured offline, in one transaction with bulk
+    writes. Returns {"results": [{"index", "clientRef", "status", ...}, ...]} in input order:
+    "created" and "duplicate" (clientRef already synced) carry application_id, "error"
+    carries errors. Invalid items are reported without rejecting the rest.
+    """
+
+    permission_classes = [IsAuthenticated, IsStaffUser]
+
+    def post(self, request):
+        ser = ApplicationSyncRequestSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        items = ser.validated_data["applications"]
+
+        results = [None] * len(items)
+        valid = []
+        for index, raw in enumerate(items):
+            item = ApplicationSyncItemSerializer(data=raw)
+            if item.is_valid():
+                valid.append((index, item.validated_data))
+            else:
+                results[index] = {"status": "error", "errors": item.errors}
+
+        try:
+            with transaction.atomic():
+                outcomes = create_applications_from_validated([v for _, v in valid])
+        except IntegrityError:
+            # Lost a race with a concurrent sync or submit; redo the items one at a time.
+            outcomes = [self._sync_one(v) for _, v in valid]
+        created = []
+        with transaction.atomic():
+            for (index, _), outcome in zip(valid, outcomes):
+                application = outcome.pop("application", None)
+                if isinstance(application, LoanApplication):
+                    if outcome["status"] == "created":
+                        created.append(application)
+                    application = application.pk
+                if application is not None:
+                    outcome["application_id"] = application
+                results[index] = outcome
+            events.applications_submitted(created)
+
+        for index, (raw, result) in enumerate(zip(items, results)):
+            ref = raw.get("clientRef") or None
+            results[index] = {"index": index, "clientRef": ref, **result}
+        return Response({"results": results})
+
+    @staticmethod
+    def _sync_one(validated):
+        ref = validated.get("clientRef") or None
+        try:
+            with transaction.atomic():
+                return {
+                    "status": "created",
+                    "application": create_application_from_validated(validated),
+                }
+        except drf_serializers.ValidationError as e:
+            return {"status": "error", "errors": e.detail}
+        except IntegrityError:
+            existing = LoanApplication.objects.filter(client_reference=ref).first() if ref else None
+            if existing is None:
+                raise
+            return {"status": "duplicate", "application": existing.pk}
+
+
+def _product_catalogue_etag(request, *args, **kwargs):
+    stamp = LoanProduct.objects.filter(is_active=True).aggregate(
+        n=Count("id"), last=Max("updated_at")
+    )
+    return _stamp_etag("products", _media_type(request), stamp["n"], stamp["last"])
+
+
+@method_decorator(vary_on_headers("Accept"), name="list")
+@method_decorator(vary_on_headers("Accept"), name="retrieve")
+@method_decorator(condition(etag_func=_product_catalogue_etag), name="list")
+@method_decorator(condition(etag_func=_product_catalogue_etag), name="retrieve")
 class LoanProductViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     queryset = LoanProduct.objects.filter(is_active=True).order_by("name")
     serializer_class = LoanProductSerializer
+    # Small fixed catalogue; the public site reads it as a plain array.
+    pagination_class = None
+
+
+def _wants_expanded(request, serializer_class) -> bool:
+    """True when ?expand= names a nested relation (served by the full DRF serializer)."""
+    fields = serializer_class.requested_fields(request)
+    return bool(fields & set(serializer_class.Meta.expandable_fields))
 
 
 class LoanApplicationViewSet(
@@ -119,12 +260,86 @@ class LoanApplicationViewSet(
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
+    """
+    Staff review queue. Filters: status (comma-separated), product (id or code), customer,
+    submitted_from/submitted_to, decided_from/decided_to (ISO date or datetime). ?ordering=
+    one of ORDERING_FIELDS, "-" for descending (default -created_at). Ordering by
+    submitted_at or decided_at lists only applications that have that timestamp. The
+    composite indexes on LoanApplication cover status (and product) with each ordering.
+    """
+
     permission_classes = [IsAuthenticated, IsStaffUser]
-    queryset = LoanApplication.objects.select_related(
-        "customer", "customer__user", "product"
-    ).prefetch_related("loan").order_by("-created_at")
+    queryset = LoanApplication.objects.order_by("-created_at")
     serializer_class = LoanApplicationListSerializer
     http_method_names = ["get", "patch", "head", "options"]
+    ORDERING_FIELDS = ("created_at", "submitted_at", "decided_at", "requested_amount")
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action in ("partial_update", "update"):
+            return qs.select_related("customer__user", "product")
+        if self.action == "list":
+            qs = self._filter_queue(qs, self.request.query_params)
+        fields = LoanApplicationListSerializer.requested_fields(self.request)
+        related = []
+        if fields & {"customer_name"}:
+            related.append("customer__user")
+        elif fields & {"customer_email", "customer_phone", "national_id_number", "customer"}:
+            related.append("customer")
+        if fields & {"product_code", "product_name", "product"}:
+            related.append("product")
+        if "loan_id" in fields:
+            related.append("loan")
+        return qs.select_related(*related)
+
+    def _filter_queue(self, qs, params):
+        st = params.get("status")
+        if st:
+            statuses = {
+                _choice_param("status", v, LoanApplication.Status) for v in st.split(",") if v
+            }
+            qs = qs.filter(status__in=statuses)
+        product = params.get("product", "").strip()
+        if product:
+            if product.isdigit():
+                qs = qs.filter(product_id=int(product))
+            else:
+                qs = qs.filter(product__code=_choice_param("product", product, LoanProduct.Code))
+        customer = params.get("customer")
+        if customer:
+            try:
+                qs = qs.filter(customer_id=uuid.UUID(customer.strip()))
+            except ValueError:
+                raise drf_serializers.ValidationError({"customer": "Must be a customer id."})
+        for field in ("submitted", "decided"):
+            start, end = params.get(f"{field}_from"), params.get(f"{field}_to")
+            if start:
+                qs = qs.filter(**{f"{field}_at__gte": _datetime_param(f"{field}_from", start)})
+            if end:
+                bound = _datetime_param(f"{field}_to", end, end_of_day=True)
+                qs = qs.filter(**{f"{field}_at__lt": bound})
+
+        ordering = params.get("ordering", "").strip()
+        if ordering:
+            field = ordering.lstrip("-")
+            if field not in self.ORDERING_FIELDS:
+                raise drf_serializers.ValidationError(
+                    {"ordering": f"Must be one of: {', '.join(self.ORDERING_FIELDS)}."}
+                )
+            if field in ("submitted_at", "decided_at"):
+                # Keyset pagination cannot page past NULLs in the ordering column.
+                qs = qs.filter(**{f"{field}__isnull": False})
+            qs = qs.order_by(ordering, "-id" if ordering.startswith("-") else "id")
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        if _wants_expanded(request, LoanApplicationListSerializer):
+            return super().list(request, *args, **kwargs)
+        fields = LoanApplicationListSerializer.requested_fields(request)
+        qs = self.filter_queryset(self.get_queryset())
+        rows = fast_serializers.application_values(qs, fields)
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(fast_serializers.application_rows(page, fields))
 
     def get_serializer_class(self):
         if self.action in ("partial_update", "update"):
@@ -132,29 +347,173 @@ class LoanApplicationViewSet(
         return LoanApplicationListSerializer
 
     def perform_update(self, serializer):
-        instance = serializer.save()
-        if "status" in serializer.validated_data:
-            st = serializer.validated_data["status"]
-            if st in (
-                LoanApplication.Status.APPROVED,
-                LoanApplication.Status.REJECTED,
-                LoanApplication.Status.CANCELLED,
-            ):
-                instance.decided_at = timezone.now()
-                instance.save(update_fields=["decided_at"])
+        previous_status = serializer.instance.status
+        with transaction.atomic():
+            instance = serializer.save()
+            if "status" in serializer.validated_data:
+                st = serializer.validated_data["status"]
+                if st in (
+                    LoanApplication.Status.APPROVED,
+                    LoanApplication.Status.REJECTED,
+                    LoanApplication.Status.CANCELLED,
+                ):
+                    instance.decided_at = timezone.now()
+                    review_queue.release(instance)
+                    instance.save(
+                        update_fields=["decided_at", "assigned_to", "lease_expires_at"]
+                    )
+                if st != previous_status:
+                    events.application_status_changed(
+                        instance, previous_status, actor=self.request.user
+                    )
+
+
+class StaffApplicationClaimView(APIView):
+    """
+    POST staff/applications/next/: claim the oldest unclaimed SUBMITTED application for review.
+
+    Returns it with lease_expires_at (200), or 204 when the queue is empty. Calling again while
+    the lease is live renews it and returns the same application; see loans.review_queue.
+    """
+
+    permission_classes = [IsAuthenticated, IsStaffUser]
+
+    def post(self, request):
+        employee = getattr(request.user, "employee_profile", None)
+        if employee is None:
+            raise PermissionDenied("Only employees can claim applications for review.")
+        application = review_queue.claim_next(employee)
+        if application is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        application = (
+            LoanApplication.objects.select_related("customer__user", "product", "loan")
+            .get(pk=application.pk)
+        )
+        out = LoanApplicationListSerializer(application).data
+        out["lease_expires_at"] = drf_serializers.DateTimeField().to_representation(
+            application.lease_expires_at
+        )
+        return Response(out)
+
+
+class StaffApplicationDecisionsView(APIView):
+    """
+    POST staff/applications/decisions/
+    {"decisions": [{"id": 12, "status": "APPROVED", "justification": "..."}, ...]}
+
+    Decides many SUBMITTED/UNDER_REVIEW applications in one transaction. There is one UPDATE
+    per target status, guarded by the current status. LoanApproval rows go in with
+    bulk_create and side effects run in bulk. Returns {"results": [{"id", "status",
+    "outcome"}]} in input order, where outcome is "decided", "not_found",
+    "invalid_transition" or "duplicate".
+    """
+
+    permission_classes = [IsAuthenticated, IsStaffUser]
+    DECIDABLE = (LoanApplication.Status.SUBMITTED, LoanApplication.Status.UNDER_REVIEW)
+    APPROVAL_DECISIONS = {
+        LoanApplication.Status.APPROVED: LoanApproval.Decision.MANUAL_APPROVED,
+        LoanApplication.Status.REJECTED: LoanApproval.Decision.REJECTED,
+    }
+
+    def post(self, request):
+        ser = ApplicationDecisionsSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        decisions = ser.validated_data["decisions"]
+        now = timezone.now()
+
+        with transaction.atomic():
+            current = dict(
+                LoanApplication.objects.select_for_update()
+                .filter(pk__in={d["id"] for d in decisions})
+                .values_list("pk", "status")
+            )
+            results, accepted, seen = [], {}, set()
+            for item in decisions:
+                pk, target = item["id"], item["status"]
+                result = {"id": pk, "status": target, "outcome": "decided"}
+                if pk in seen:
+                    result["outcome"] = "duplicate"
+                elif pk not in current:
+                    result["outcome"] = "not_found"
+                elif current[pk] not in self.DECIDABLE:
+                    result["outcome"] = "invalid_transition"
+                    result["detail"] = f"Cannot move a {current[pk]} application to {target}."
+                else:
+                    accepted[pk] = item
+                seen.add(pk)
+                results.append(result)
+
+            for target in {item["status"] for item in accepted.values()}:
+                pks = [pk for pk, item in accepted.items() if item["status"] == target]
+                updated = LoanApplication.objects.filter(
+                    pk__in=pks, status__in=self.DECIDABLE
+                ).update(
+                    status=target,
+                    decided_at=now,
+                    updated_at=now,
+                    assigned_to=None,
+                    lease_expires_at=None,
+                    change_seq=changes.update_expression(pks),
+                )
+                if updated != len(pks):
+                    # Changed since the read above (no row locks on this backend).
+                    applied = set(
+                        LoanApplication.objects.filter(
+                            pk__in=pks, status=target, decided_at=now
+                        ).values_list("pk", flat=True)
+                    )
+                    for pk in set(pks) - applied:
+                        del accepted[pk]
+                    for result in results:
+                        if result["outcome"] == "decided" and result["id"] not in accepted:
+                            result["outcome"] = "invalid_transition"
+
+            LoanApproval.objects.bulk_create(
+                [
+                    LoanApproval(
+                        loan_id=pk,
+                        reviewed_by=getattr(request.user, "employee_profile", None),
+                        decision=self.APPROVAL_DECISIONS[item["status"]],
+                        justification=item["justification"],
+                    )
+                    for pk, item in accepted.items()
+                    if item["status"] in self.APPROVAL_DECISIONS
+                ],
+                update_conflicts=True,
+                unique_fields=["loan"],
+                update_fields=["reviewed_by", "decision", "justification", "timestamp"],
+            )
+            decided = list(
+                LoanApplication.objects.filter(pk__in=list(accepted)).select_related(
+                    "customer__user", "product"
+                )
+            )
+            events.applications_decided(decided, actor=request.user)
+        return Response({"results": results})
+
+
+def _loan_read_queryset(qs, fields: set[str]):
+    """Join and annotate only what the requested Loan list/collections fields read."""
+    related = ["application"]
+    if fields & {"customer_name", "customer_phone", "customer_email", "customer"}:
+        related.append("application__customer__user")
+    if "product_code" in fields:
+        related.append("application__product")
+    qs = qs.select_related(*related)
+    if fields & {"total_paid", "outstanding_balance"}:
+        qs = qs.annotate(total_paid_amount=loan_total_paid_subquery())
+    return qs
 
 
 class LoanViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated, IsStaffUser]
-    queryset = (
-        Loan.objects.select_related(
-            "application", "application__customer", "application__customer__user", "application__product"
-        )
-        .prefetch_related("payments")
-        .order_by("-created_at")
-    )
+    queryset = Loan.objects.order_by("-created_at")
     serializer_class = LoanListSerializer
 
+    def get_queryset(self):
+        fields = LoanListSerializer.requested_fields(self.request)
+        return _loan_read_queryset(super().get_queryset(), fields)
+
 
 def _post_repayment_ledger(loan: Loan, amount: Decimal) -> None:
     recv, _ = LedgerAccount.objects.get_or_create(
@@ -268,11 +627,57 @@ class StaffLoanDisburseView(APIView):
                 maturity_date=maturity_date,
             )
             _post_disbursement_ledger(loan)
+            events.loan_disbursed(loan, actor=request.user)
 
         out = LoanListSerializer(loan).data
         return Response(out, status=status.HTTP_201_CREATED)
 
 
+def _int_param(name: str, value: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise drf_serializers.ValidationError({name: "Must be an integer."})
+
+
+def _choice_param(name: str, value: str, choices) -> str:
+    value = value.strip().upper()
+    if value not in choices.values:
+        raise drf_serializers.ValidationError(
+            {name: f"Must be one of: {', '.join(choices.values)}."}
+        )
+    return value
+
+
+def _date_param(name: str, value: str) -> date:
+    d = parse_date(value.strip())
+    if d is None:
+        raise drf_serializers.ValidationError({name: "Must be an ISO date (YYYY-MM-DD)."})
+    return d
+
+
+def _datetime_param(name: str, value: str, end_of_day: bool = False) -> datetime:
+    """
+    Parse an ISO datetime or date query param. A bare date is the start of that day,
+    or the start of the next day when end_of_day (for exclusive upper bounds).
+    """
+    value = value.strip()
+    try:
+        dt = parse_datetime(value)
+        if dt is None:
+            d = parse_date(value)
+            if d is None:
+                raise ValueError(value)
+            if end_of_day:
+                d += timedelta(days=1)
+            dt = datetime.combine(d, time.min)
+    except ValueError:
+        raise drf_serializers.ValidationError({name: "Must be an ISO date or datetime."})
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
 def _loan_total_paid(loan: Loan) -> Decimal:
     t = (
         LoanPayment.objects.filter(loan=loan, status=LoanPayment.Status.COMPLETED).aggregate(
@@ -289,6 +694,7 @@ def _maybe_complete_loan(loan: Loan) -> None:
     if loan.status == Loan.Status.ACTIVE and paid >= due:
         loan.status = Loan.Status.COMPLETED
         loan.save(update_fields=["status"])
+        events.loan_status_changed(loan, Loan.Status.ACTIVE)
 
 
 class CustomerPaymentCreateView(APIView):
@@ -334,20 +740,54 @@ class CustomerPaymentCreateView(APIView):
             )
             _post_repayment_ledger(loan, amount)
             _maybe_complete_loan(loan)
+            events.payment_recorded(payment)
         return Response(StaffLoanPaymentSerializer(payment).data, status=status.HTTP_201_CREATED)
 
 
 class StaffLoanPaymentViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet):
+    """
+    Staff payment listing. Filters: loan, method, status, recorded_by, paid_from, paid_to
+    (ISO date or datetime). Cursor-paginated on (paid_at, id).
+    """
+
     permission_classes = [IsAuthenticated, IsStaffUser]
-    queryset = LoanPayment.objects.select_related(
-        "loan", "loan__application", "loan__application__customer", "loan__application__customer__user"
-    ).order_by("-paid_at", "-id")
+    queryset = LoanPayment.objects.select_related("loan__application__customer__user").order_by(
+        "-paid_at", "-id"
+    )
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        params = self.request.query_params
+        loan_id = params.get("loan")
+        if loan_id:
+            qs = qs.filter(loan_id=_int_param("loan", loan_id))
+        method = params.get("method")
+        if method:
+            qs = qs.filter(method=_choice_param("method", method, LoanPayment.Method))
+        st = params.get("status")
+        if st:
+            qs = qs.filter(status=_choice_param("status", st, LoanPayment.Status))
+        recorded_by = params.get("recorded_by")
+        if recorded_by:
+            qs = qs.filter(recorded_by_id=_int_param("recorded_by", recorded_by))
+        paid_from = params.get("paid_from")
+        if paid_from:
+            qs = qs.filter(paid_at__gte=_datetime_param("paid_from", paid_from))
+        paid_to = params.get("paid_to")
+        if paid_to:
+            qs = qs.filter(paid_at__lt=_datetime_param("paid_to", paid_to, end_of_day=True))
+        return qs
 
     def get_serializer_class(self):
         if self.action == "create":
             return StaffRecordPaymentSerializer
         return StaffLoanPaymentSerializer
 
+    def list(self, request, *args, **kwargs):
+        rows = fast_serializers.payment_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(fast_serializers.payment_rows(page))
+
     def create(self, request, *args, **kwargs):
         ser = StaffRecordPaymentSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -384,6 +824,7 @@ class StaffLoanPaymentViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, vi
             )
             _post_repayment_ledger(loan, amount)
             _maybe_complete_loan(loan)
+            events.payment_recorded(payment)
         return Response(
             StaffLoanPaymentSerializer(payment).data,
             status=status.HTTP_201_CREATED,
@@ -396,32 +837,93 @@ class CustomerRecordViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CustomerSerializer
 
 
+def _customer_stamp(request) -> dict:
+    """
+    Version columns for the signed-in customer, read fresh: request.user comes from the auth
+    cache (api.authentication) and may lag another worker's writes by up to its TTL.
+    """
+    if not hasattr(request, "_customer_stamp"):
+        request._customer_stamp = (
+            Customer.objects.filter(pk=request.user.customer_profile.pk)
+            .values(
+                "pk",
+                "data_version",
+                "updated_at",
+                "user__email",
+                "user__first_name",
+                "user__last_name",
+                # me/ embeds product details in each application.
+                products_updated_at=Subquery(
+                    LoanProduct.objects.order_by("-updated_at").values("updated_at")[:1]
+                ),
+            )
+            .get()
+        )
+    return request._customer_stamp
+
+
+def _fresh_customer(request) -> Customer:
+    return Customer.objects.get(pk=request.user.customer_profile.pk)
+
+
+def _me_version(request) -> str:
+    return _stamp_etag("me", *_customer_stamp(request).values())
+
+
+def _me_etag(request):
+    return _stamp_etag(_me_version(request), _media_type(request))
+
+
+def _me_profile(customer_pk) -> dict:
+    customer = Customer.objects.select_related("user").get(pk=customer_pk)
+    user = customer.user
+    return {
+        "user": {
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+        },
+        "customer": CustomerSerializer(customer).data,
+    }
+
+
+def _me_applications(customer_pk) -> list:
+    apps = LoanApplication.objects.filter(customer_id=customer_pk).select_related(
+        "customer__user", "product", "loan"
+    )
+    return LoanApplicationListSerializer(apps, many=True).data
+
+
+def _me_loans(customer_pk) -> list:
+    loans_qs = _loan_read_queryset(
+        Loan.objects.filter(application__customer_id=customer_pk),
+        set(LoanListSerializer.Meta.fields),
+    )
+    return LoanListSerializer(loans_qs, many=True).data
+
+
+def _me_payload(customer_pk) -> dict:
+    """Borrower home screen: three queries however many applications, loans and payments."""
+    return {
+        **_me_profile(customer_pk),
+        "applications": _me_applications(customer_pk),
+        "loans": _me_loans(customer_pk),
+    }
+
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated, IsCustomerUser]
 
+    @method_decorator(vary_on_headers("Accept"))
+    @method_decorator(condition(etag_func=_me_etag))
     def get(self, request):
-        user = request.user
-        customer = user.customer_profile
-        apps = (
-            LoanApplication.objects.filter(customer=customer)
-            .select_related("product")
-            .prefetch_related("loan")
+        stamp = _customer_stamp(request)
+        data = api_cache.get_or_compute(
+            api_cache.ME_PAYLOAD,
+            lambda: _me_payload(stamp["pk"]),
+            api_cache.ME_PAYLOAD_TTL,
+            suffix=f"{stamp['pk']}:{_me_version(request)}",
         )
-        loans_qs = (
-            Loan.objects.filter(application__customer=customer)
-            .select_related("application", "application__product", "application__customer__user")
-            .prefetch_related("payments")
-        )
-        data = {
-            "user": {
-                "email": user.email,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-            },
-            "customer": CustomerSerializer(customer).data,
-            "applications": LoanApplicationListSerializer(apps, many=True).data,
-            "loans": LoanListSerializer(loans_qs, many=True).data,
-        }
         return Response(data)
 
 
@@ -429,31 +931,56 @@ class UserSelfDetailView(APIView):
     permission_classes = [IsAuthenticated, IsCustomerUser]
 
     def patch(self, request):
-        ser = UserSelfSerializer(request.user, data=request.data, partial=True)
+        user = User.objects.get(pk=request.user.pk)
+        ser = UserSelfSerializer(user, data=request.data, partial=True)
         ser.is_valid(raise_exception=True)
         ser.save()
-        return Response(UserSelfSerializer(request.user).data)
+        return Response(UserSelfSerializer(user).data)
+
+
+def _customer_self_etag(request):
+    stamp = _customer_stamp(request)
+    return _stamp_etag(
+        "customer", _media_type(request), stamp["pk"], stamp["updated_at"].isoformat()
+    )
+
+
+def _customer_self_last_modified(request):
+    return _customer_stamp(request)["updated_at"]
 
 
 class CustomerSelfDetailView(APIView):
     permission_classes = [IsAuthenticated, IsCustomerUser]
 
+    @method_decorator(vary_on_headers("Accept"))
+    @method_decorator(
+        condition(etag_func=_customer_self_etag, last_modified_func=_customer_self_last_modified)
+    )
     def get(self, request):
-        return Response(CustomerSerializer(request.user.customer_profile).data)
+        return Response(CustomerSerializer(_fresh_customer(request)).data)
 
     def patch(self, request):
-        ser = CustomerUpdateSerializer(
-            request.user.customer_profile, data=request.data, partial=True
-        )
+        customer = _fresh_customer(request)
+        ser = CustomerUpdateSerializer(customer, data=request.data, partial=True)
         ser.is_valid(raise_exception=True)
-        ser.save()
-        return Response(CustomerSerializer(request.user.customer_profile).data)
+        with transaction.atomic():
+            ser.save()
+        return Response(CustomerSerializer(customer).data)
+
+
+def _token_response(user, timing) -> Response:
+    token = tokens.issue(user)
+    response = Response({"token": token.key, "expires_at": tokens.expires_at(token)})
+    response["Server-Timing"] = timing.header()
+    return response
 
 
 class StaffObtainAuthToken(ObtainAuthToken):
     """Token auth for staff; requires is_staff, superuser, or institutions.Employee."""
 
     serializer_class = StaffAuthTokenSerializer
+    # Clients re-login with whatever (possibly expired) token they still hold.
+    authentication_classes = ()
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data, context={"request": request})
@@ -464,15 +991,15 @@ class StaffObtainAuthToken(ObtainAuthToken):
                 {"detail": "Not a staff account."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        from rest_framework.authtoken.models import Token
-
-        token, _ = Token.objects.get_or_create(user=user)
-        return Response({"token": token.key})
+        return _token_response(user, serializer.validated_data["timing"])
 
 
 class CustomerObtainAuthToken(ObtainAuthToken):
     """Token auth for borrowers (customer_profile required)."""
 
+    serializer_class = CustomerAuthTokenSerializer
+    authentication_classes = ()
+
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
@@ -482,10 +1009,113 @@ class CustomerObtainAuthToken(ObtainAuthToken):
                 {"detail": "Not a customer account."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        from rest_framework.authtoken.models import Token
+        return _token_response(user, serializer.validated_data["timing"])
+
+
+class RotateTokenView(APIView):
+    """Swaps the caller's token for a new one; the old key stops working immediately."""
+
+    def post(self, request):
+        if not isinstance(request.auth, Token):
+            return Response(
+                {"detail": "Token authentication required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # request.auth may be a cached copy of a token another worker already deleted.
+        current = Token.objects.select_related("user").filter(pk=request.auth.pk).first()
+        if current is None:
+            raise AuthenticationFailed("Invalid token.")
+        token = tokens.rotate(current)
+        return Response({"token": token.key, "expires_at": tokens.expires_at(token)})
+
+
+class LogoutView(APIView):
+    """Deletes the caller's token; the auth cache entry is evicted with it."""
+
+    def post(self, request):
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BatchView(APIView):
+    """
+    POST {"requests": [{"id": "summary", "path": "staff/dashboard-summary/"}, ...]}
+
+    Runs up to BATCH_MAX_REQUESTS GET sub-requests in-process (see api/batch.py) and returns
+    {"responses": [{"id", "status", "body", "duration_ms"}, ...]} in request order. Paths are
+    relative to the API root, or absolute under it; each keeps its own permission checks.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ser = BatchRequestSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        prefix = request.path[: -len("batch/")]
+        started = timezone.now()
+        responses = batch.run(request, ser.validated_data["requests"], prefix)
+        elapsed = (timezone.now() - started).total_seconds() * 1000
+        return Response({"responses": responses, "duration_ms": round(elapsed, 1)})
+
+
+def _sync_rows(resource: str, ids: list) -> list:
+    """Current state of the changed rows, shaped like the matching list endpoints."""
+    if not ids:
+        return []
+    if resource == "applications":
+        qs = LoanApplication.objects.filter(pk__in=ids).order_by("change_seq")
+        return fast_serializers.application_rows(fast_serializers.application_values(qs))
+    if resource == "loans":
+        fields = set(LoanListSerializer.Meta.fields)
+        qs = _loan_read_queryset(Loan.objects.filter(pk__in=ids).order_by("change_seq"), fields)
+        return LoanListSerializer(qs, many=True).data
+    if resource == "payments":
+        qs = LoanPayment.objects.filter(pk__in=ids).order_by("change_seq")
+        return fast_serializers.payment_rows(fast_serializers.payment_values(qs))
+    qs = Customer.objects.filter(pk__in=ids).order_by("change_seq")
+    return CustomerSerializer(qs, many=True).data
+
+
+class SyncView(APIView):
+    """
+    GET sync/?applications=<cursor>&loans=<cursor>&payments=<cursor>&customers=<cursor>
+
+    Delta sync for the mobile app and the staff portal. For each requested resource (all four
+    when no cursor is given) it returns up to `limit` changes after the cursor:
+    {"changes": [rows as in the list endpoints], "deleted": [ids], "cursor", "has_more"}.
+    Clients store `cursor` and send it back next time; see sync.changes. Borrowers only see
+    their own rows; staff see everything.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if IsStaffUser().has_permission(request, self):
+            customer_id = None
+        elif IsCustomerUser().has_permission(request, self):
+            customer_id = request.user.customer_profile.pk
+        else:
+            raise PermissionDenied()
 
-        token, _ = Token.objects.get_or_create(user=user)
-        return Response({"token": token.key})
+        ser = SyncQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+        params = ser.validated_data
+        limit = params.get("limit", settings.SYNC_DEFAULT_LIMIT)
+        resources = [r for r in changes.RESOURCES if r in params] or list(changes.RESOURCES)
+
+        payload = {}
+        for resource in resources:
+            changed, deleted, cursor, has_more = changes.changes_since(
+                resource, params.get(resource, 0), limit, customer_id=customer_id
+            )
+            payload[resource] = {
+                "changes": _sync_rows(resource, changed),
+                "deleted": deleted,
+                "cursor": cursor,
+                "has_more": has_more,
+            }
+        return Response(payload)
 
 
 class StaffMeView(APIView):
@@ -515,154 +1145,380 @@ class StaffMeView(APIView):
         return Response(payload)
 
 
+def _dashboard_loan_totals() -> dict:
+    start_mtd = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    active = Q(status=Loan.Status.ACTIVE)
+    return (
+        Loan.objects.annotate(_due_scaled=loan_expected_total_repayment_scaled_expr())
+        .annotate(_paid=loan_total_paid_subquery())
+        .aggregate(
+            disbursed_mtd=Sum("principal_amount", filter=Q(disbursed_at__gte=start_mtd)),
+            in_default=Count(
+                "id", filter=Q(status__in=[Loan.Status.DEFAULTED, Loan.Status.WRITTEN_OFF])
+            ),
+            total_due_scaled=Sum("_due_scaled", filter=active),
+            total_paid=Sum("_paid", filter=active),
+        )
+    )
+
+
+def _dashboard_application_counts() -> dict:
+    return LoanApplication.objects.aggregate(
+        pending=Count(
+            "id",
+            filter=Q(
+                status__in=[
+                    LoanApplication.Status.SUBMITTED,
+                    LoanApplication.Status.UNDER_REVIEW,
+                ]
+            ),
+        ),
+        approved_waiting=Count(
+            "id", filter=Q(status=LoanApplication.Status.APPROVED, loan__isnull=True)
+        ),
+    )
+
+
+def _dashboard_recent_activity() -> list:
+    return [
+        {"type": e.type, "title": e.title, "subtitle": e.subtitle, "at": e.occurred_at.isoformat()}
+        for e in ActivityEvent.objects.order_by("-occurred_at", "-id")[:10]
+    ]
+
+
+def _compose_dashboard_summary(loan_totals: dict, app_counts: dict, recent: list) -> dict:
+    """Shape the three independent dashboard reads (see api.async_views for the async path)."""
+    disbursed_mtd = loan_totals["disbursed_mtd"] or Decimal("0")
+    in_default = loan_totals["in_default"]
+    total_due = (
+        Decimal(loan_totals["total_due_scaled"] or 0) / EXPECTED_REPAYMENT_SCALE
+    ).quantize(Decimal("0.01"))
+    total_paid_portfolio = loan_totals["total_paid"] or Decimal("0")
+    pending = app_counts["pending"]
+    approved_waiting = app_counts["approved_waiting"]
+
+    if total_due > 0:
+        collection_rate = float(
+            (Decimal(total_paid_portfolio) / Decimal(total_due) * Decimal("100")).quantize(
+                Decimal("0.1")
+            )
+        )
+    else:
+        collection_rate = 100.0
+
+    return {
+        "total_disbursed_mtd": str(Decimal(disbursed_mtd).quantize(Decimal("0.01"))),
+        "pending_applications": pending,
+        "approved_awaiting_disbursement": approved_waiting,
+        "collection_rate_percent": collection_rate,
+        "accounts_in_default": in_default,
+        "quick_actions": {
+            "pending_applications": pending,
+            "accounts_in_default": in_default,
+        },
+        "recent_activity": recent,
+    }
+
+
+def _dashboard_summary() -> dict:
+    return _compose_dashboard_summary(
+        _dashboard_loan_totals(), _dashboard_application_counts(), _dashboard_recent_activity()
+    )
+
+
 class StaffDashboardSummaryView(APIView):
+    """Cached for DASHBOARD_SUMMARY_TTL seconds; write paths invalidate via api.events."""
+
     permission_classes = [IsAuthenticated, IsStaffUser]
 
     def get(self, request):
-        now = timezone.now()
-        start_mtd = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        disbursed_mtd = Loan.objects.filter(disbursed_at__gte=start_mtd).aggregate(
-            s=Sum("principal_amount")
-        )["s"] or Decimal("0")
-
-        pending = LoanApplication.objects.filter(
-            status__in=[
-                LoanApplication.Status.SUBMITTED,
-                LoanApplication.Status.UNDER_REVIEW,
-            ]
-        ).count()
-
-        has_loan = Exists(Loan.objects.filter(application_id=OuterRef("pk")))
-        approved_waiting = (
-            LoanApplication.objects.filter(status=LoanApplication.Status.APPROVED)
-            .annotate(_has_loan=has_loan)
-            .filter(_has_loan=False)
-            .count()
+        return Response(
+            api_cache.get_or_compute(
+                api_cache.DASHBOARD_SUMMARY,
+                _dashboard_summary,
+                ttl=api_cache.DASHBOARD_SUMMARY_TTL,
+            )
         )
 
-        in_default = Loan.objects.filter(
-            status__in=[Loan.Status.DEFAULTED, Loan.Status.WRITTEN_OFF]
-        ).count()
-
-        active_loans = Loan.objects.filter(status=Loan.Status.ACTIVE).prefetch_related("payments")
-        total_due = Decimal("0")
-        total_paid_portfolio = Decimal("0")
-        for ln in active_loans:
-            total_due += loan_expected_total_repayment(ln)
-            total_paid_portfolio += _loan_total_paid(ln)
-
-        if total_due > 0:
-            collection_rate = float(
-                (total_paid_portfolio / total_due * Decimal("100")).quantize(Decimal("0.1"))
-            )
-        else:
-            collection_rate = 100.0
 
-        recent = []
-        for pay in (
-            LoanPayment.objects.select_related(
-                "loan__application__customer__user", "loan__application__product"
-            )
-            .order_by("-created_at")[:8]
-        ):
-            u = pay.loan.application.customer.user
-            name = f"{u.first_name} {u.last_name}".strip() or u.username
-            recent.append(
-                {
-                    "type": "payment",
-                    "title": "Payment received",
-                    "subtitle": f"{name} · GH₵{pay.amount}",
-                    "at": pay.paid_at.isoformat(),
-                }
-            )
-        for app in (
-            LoanApplication.objects.select_related("customer__user", "product")
-            .filter(decided_at__isnull=False)
-            .order_by("-decided_at")[:5]
-        ):
-            if app.status == LoanApplication.Status.APPROVED:
-                title = "Application approved"
-            elif app.status == LoanApplication.Status.REJECTED:
-                title = "Application rejected"
-            else:
-                title = f"Application {app.status}"
-            u = app.customer.user
-            name = f"{u.first_name} {u.last_name}".strip() or u.username
-            dt = app.decided_at or app.updated_at
-            recent.append(
-                {
-                    "type": "application",
-                    "title": title,
-                    "subtitle": f"{name} · {app.product.code}",
-                    "at": dt.isoformat(),
-                }
-            )
-        recent.sort(key=lambda x: x["at"], reverse=True)
-        recent = recent[:10]
+class StaffLiveTicketView(APIView):
+    """Short-lived ticket for opening staff/live/ from an EventSource; see api/live.py."""
 
+    permission_classes = [IsAuthenticated, IsStaffUser]
+
+    def post(self, request):
         return Response(
+            {"ticket": live.issue_ticket(request.user), "expires_in": live.TICKET_MAX_AGE}
+        )
+
+
+@sync_to_async
+def _live_events_user(request):
+    """Token from the Authorization header, or a ticket from staff/live/ticket/ as ?ticket=."""
+    ticket = request.GET.get("ticket")
+    if ticket:
+        user_id = live.ticket_user_id(ticket)
+        user = None
+        if user_id is not None:
+            user = (
+                User.objects.select_related("employee_profile")
+                .filter(pk=user_id, is_active=True)
+                .first()
+            )
+    else:
+        parts = request.headers.get("Authorization", "").split()
+        if len(parts) != 2 or parts[0].lower() != "token":
+            return None
+        try:
+            user, _ = CachedTokenAuthentication().authenticate_credentials(parts[1])
+        except AuthenticationFailed:
+            return None
+    if user is None:
+        return None
+    request.user = user
+    if not IsStaffUser().has_permission(request, None):
+        return None
+    return user
+
+
+async def staff_live_events(request):
+    """Server-sent events stream of staff activity (ASGI only; see api/live.py)."""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if isinstance(request, WSGIRequest):
+        # Under WSGI the endless stream would hold a sync worker until gunicorn kills it,
+        # and EventSource would reconnect straight away.
+        return JsonResponse(
             {
-                "total_disbursed_mtd": str(disbursed_mtd.quantize(Decimal("0.01"))),
-                "pending_applications": pending,
-                "approved_awaiting_disbursement": approved_waiting,
-                "collection_rate_percent": collection_rate,
-                "accounts_in_default": in_default,
-                "quick_actions": {
-                    "pending_applications": pending,
-                    "accounts_in_default": in_default,
-                },
-                "recent_activity": recent,
-            }
+                "detail": "Live updates are not available on this server. "
+                "Keep polling staff/activity/."
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "3600"},
+        )
+    if await _live_events_user(request) is None:
+        return JsonResponse(
+            {"detail": "Staff authentication credentials were not provided or are invalid."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    return StreamingHttpResponse(
+        live.event_stream(request.headers.get("Last-Event-ID")),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _analytics_params(params) -> tuple:
+    granularity = params.get("granularity", "month")
+    if granularity not in rollups.GRANULARITIES:
+        raise drf_serializers.ValidationError(
+            {"granularity": f"Must be one of: {', '.join(rollups.GRANULARITIES)}."}
         )
+    start = _date_param("from", params["from"]) if params.get("from") else None
+    end = _date_param("to", params["to"]) if params.get("to") else None
+    return granularity, start, end
+
+
+def _analytics_payload(
+    granularity,
+    start,
+    end,
+    disbursements,
+    repayments,
+    applications,
+    loan_transitions,
+    loans_by_status,
+) -> dict:
+    def money(v) -> str:
+        return str(Decimal(v).quantize(Decimal("0.01")))
+
+    payload = {
+        "granularity": granularity,
+        "from": start.isoformat() if start else None,
+        "to": end.isoformat() if end else None,
+        "disbursements": [
+            {"period": r["period"].isoformat(), "total": money(r["total"]), "count": r["count"]}
+            for r in disbursements
+        ],
+        "repayments": [
+            {"period": r["period"].isoformat(), "total": money(r["total"]), "count": r["count"]}
+            for r in repayments
+        ],
+        "applications": [
+            {
+                "period": r["period"].isoformat(),
+                "product_code": r["product_code"],
+                "status": r["status"],
+                "count": r["count"],
+            }
+            for r in applications
+        ],
+        "loan_transitions": [
+            {
+                "period": r["period"].isoformat(),
+                "from_status": r["from_status"],
+                "to_status": r["to_status"],
+                "count": r["count"],
+            }
+            for r in loan_transitions
+        ],
+        "loans_by_status": loans_by_status,
+    }
+    if granularity == "month":
+        # Original response shape, kept for existing portal charts.
+        payload["disbursements_by_month"] = [
+            {
+                "month": datetime.combine(
+                    r["period"], time.min, tzinfo=dt_timezone.utc
+                ).isoformat(),
+                "total": money(r["total"]),
+                "count": r["count"],
+            }
+            for r in disbursements
+        ]
+    return payload
 
 
 class StaffAnalyticsSummaryView(APIView):
+    """
+    Reads the analytics daily rollups. Query params: from/to (ISO dates, inclusive) and
+    granularity (day, week or month; default month).
+    """
+
     permission_classes = [IsAuthenticated, IsStaffUser]
 
     def get(self, request):
-        by_month = (
-            Loan.objects.filter(disbursed_at__isnull=False)
-            .annotate(m=TruncMonth("disbursed_at"))
-            .values("m")
-            .annotate(total=Sum("principal_amount"), count=Count("id"))
-            .order_by("m")
-        )
-        series = []
-        for row in by_month:
-            m = row["m"]
-            series.append(
-                {
-                    "month": m.isoformat() if m else None,
-                    "total": str((row["total"] or Decimal("0")).quantize(Decimal("0.01"))),
-                    "count": row["count"],
-                }
-            )
-        status_rows = Loan.objects.values("status").annotate(count=Count("id"))
+        granularity, start, end = _analytics_params(request.query_params)
         return Response(
-            {
-                "disbursements_by_month": series,
-                "loans_by_status": list(status_rows),
-            }
+            _analytics_payload(
+                granularity,
+                start,
+                end,
+                disbursements=rollups.amount_series("DailyDisbursement", start, end, granularity),
+                repayments=rollups.amount_series("DailyRepayment", start, end, granularity),
+                applications=rollups.application_series(start, end, granularity),
+                loan_transitions=rollups.transition_series(start, end, granularity),
+                loans_by_status=rollups.loan_status_counts(),
+            )
         )
 
 
+class ActivityEventViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Staff activity feed, newest first. Filter: type (comma-separated ActivityEvent types)."""
+
+    permission_classes = [IsAuthenticated, IsStaffUser]
+    queryset = ActivityEvent.objects.order_by("-occurred_at", "-id")
+    serializer_class = ActivityEventSerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        types = self.request.query_params.get("type")
+        if types:
+            wanted = [t.strip().lower() for t in types.split(",") if t.strip()]
+            unknown = set(wanted) - set(ActivityEvent.Type.values)
+            if unknown:
+                raise drf_serializers.ValidationError(
+                    {"type": f"Must be among: {', '.join(ActivityEvent.Type.values)}."}
+                )
+            qs = qs.filter(type__in=wanted)
+        return qs
+
+
 class StaffCollectionsLoansView(APIView):
     permission_classes = [IsAuthenticated, IsStaffUser]
 
     def get(self, request):
-        qs = (
-            Loan.objects.filter(status__in=[Loan.Status.DEFAULTED, Loan.Status.WRITTEN_OFF])
-            .select_related("application__customer__user", "application__product")
-            .prefetch_related("payments")
-            .order_by("-id")
+        qs = Loan.objects.filter(
+            status__in=[Loan.Status.DEFAULTED, Loan.Status.WRITTEN_OFF]
+        ).order_by("-id")
+        qs = _loan_read_queryset(qs, CollectionsLoanSerializer.requested_fields(request))
+        return Response(
+            CollectionsLoanSerializer(qs, many=True, context={"request": request}).data
+        )
+
+
+def _search_results(customer_ids: list) -> list:
+    """Matched customers in rank order, each with their applications and loans (4 queries)."""
+    if not customer_ids:
+        return []
+    customers = {
+        row["id"]: row
+        for row in Customer.objects.filter(pk__in=customer_ids).values(
+            "id",
+            "email",
+            "phone_number",
+            "national_id_number",
+            "status",
+            name=fast_serializers.display_name_expr("user"),
         )
-        return Response(CollectionsLoanSerializer(qs, many=True).data)
+    }
+    for row in customers.values():
+        row["applications"], row["loans"] = [], []
+
+    app_fields = ["id", "product_code", "requested_amount", "status", "submitted_at"]
+    app_rows = list(
+        LoanApplication.objects.filter(customer_id__in=customer_ids)
+        .order_by("-created_at", "-id")
+        .values("id", "customer_id", "requested_amount", "status", "submitted_at")
+        .annotate(product_code=F("product__code"))
+    )
+    for row, item in zip(
+        app_rows,
+        fast_serializers.format_rows(
+            app_rows, app_fields, frozenset({"requested_amount"}), frozenset({"submitted_at"})
+        ),
+    ):
+        customers[row["customer_id"]]["applications"].append(item)
+
+    loan_fields = ["id", "application_id", "principal_amount", "status", "disbursed_at"]
+    loan_rows = list(
+        Loan.objects.filter(application__customer_id__in=customer_ids)
+        .order_by("-created_at", "-id")
+        .values(*loan_fields)
+        .annotate(customer_id=F("application__customer_id"))
+    )
+    for row, item in zip(
+        loan_rows,
+        fast_serializers.format_rows(
+            loan_rows, loan_fields, frozenset({"principal_amount"}), frozenset({"disbursed_at"})
+        ),
+    ):
+        customers[row["customer_id"]]["loans"].append(item)
+
+    return [customers[pk] for pk in customer_ids if pk in customers]
+
+
+class StaffSearchView(APIView):
+    """
+    GET staff/search/?q=<name fragment | phone digits | Ghana Card | email>&limit=20
+
+    Ranked customer matches from the search index (customers.search), each with their
+    applications and loans.
+    """
+
+    permission_classes = [IsAuthenticated, IsStaffUser]
+
+    def get(self, request):
+        ser = StaffSearchQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+        q, limit = ser.validated_data["q"], ser.validated_data["limit"]
+        ids = customer_search.search_ids(q, limit)
+        return Response({"query": q, "results": _search_results(ids)})
+
+
+def _institution_etag(request):
+    qs = FinancialInstitution.objects.values_list("pk", "updated_at")
+    row = qs.filter(is_active=True).first() or qs.first()
+    if row is None:
+        return None
+    return _stamp_etag("institution", _media_type(request), *row)
 
 
 class StaffInstitutionView(APIView):
     permission_classes = [IsAuthenticated, IsStaffUser]
 
+    @method_decorator(vary_on_headers("Accept"))
+    @method_decorator(condition(etag_func=_institution_etag))
     def get(self, request):
         fi = FinancialInstitution.objects.filter(is_active=True).first()
         if fi is None:
@@ -725,12 +1581,12 @@ class StaffEmployeeViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, views
             )
         uname = d["username"].strip()
         email = d["email"].strip().lower()
-        if User.objects.filter(username__iexact=uname).exists():
+        if User.objects.username_matches(uname).exists():
             return Response(
                 {"username": ["A user with this username already exists."]},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if User.objects.filter(email__iexact=email).exists():
+        if User.objects.email_matches(email).exists():
             return Response(
                 {"email": ["A user with this email already exists."]},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,63 @@
+"""Builders for ActivityEvent rows, shared by the API write paths and the backfill migration."""
+
+from django.utils import timezone
+
+from .models import ActivityEvent
+
+
+def _display_name(user) -> str:
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def payment_received(payment) -> ActivityEvent:
+    customer = payment.loan.application.customer
+    return ActivityEvent(
+        type=ActivityEvent.Type.PAYMENT,
+        title="Payment received",
+        subtitle=f"{_display_name(customer.user)} · GH₵{payment.amount}",
+        object_id=str(payment.pk),
+        actor_id=payment.recorded_by_id,
+        occurred_at=payment.paid_at,
+    )
+
+
+def application_decided(application, actor=None) -> ActivityEvent:
+    if application.status == "APPROVED":
+        title = "Application approved"
+    elif application.status == "REJECTED":
+        title = "Application rejected"
+    else:
+        title = f"Application {application.status}"
+    return ActivityEvent(
+        type=ActivityEvent.Type.APPLICATION,
+        title=title,
+        subtitle=f"{_display_name(application.customer.user)} · {application.product.code}",
+        object_id=str(application.pk),
+        actor=actor,
+        occurred_at=application.decided_at or application.updated_at or timezone.now(),
+    )
+
+
+def loan_disbursed(loan, actor=None) -> ActivityEvent:
+    application = loan.application
+    return ActivityEvent(
+        type=ActivityEvent.Type.DISBURSEMENT,
+        title="Loan disbursed",
+        subtitle=(
+            f"{_display_name(application.customer.user)} · "
+            f"{application.product.code} · GH₵{loan.principal_amount}"
+        ),
+        object_id=str(loan.pk),
+        actor=actor,
+        occurred_at=loan.disbursed_at,
+    )
+
+
+def customer_registered(customer) -> ActivityEvent:
+    return ActivityEvent(
+        type=ActivityEvent.Type.REGISTRATION,
+        title="New customer registered",
+        subtitle=_display_name(customer.user),
+        object_id=str(customer.pk),
+        occurred_at=customer.created_at or timezone.now(),
+    )
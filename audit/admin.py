@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ActivityEvent
+
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ("occurred_at", "type", "title", "subtitle", "actor")
+    list_filter = ("type",)
+    date_hierarchy = "occurred_at"
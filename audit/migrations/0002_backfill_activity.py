@@ -0,0 +1,55 @@
+from django.db import migrations
+
+from audit import activity
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    ActivityEvent = apps.get_model("audit", "ActivityEvent")
+    LoanPayment = apps.get_model("payments", "LoanPayment")
+    LoanApplication = apps.get_model("loans", "LoanApplication")
+    Loan = apps.get_model("loans", "Loan")
+    Customer = apps.get_model("customers", "Customer")
+
+    sources = [
+        (
+            activity.payment_received,
+            LoanPayment.objects.select_related("loan__application__customer__user"),
+        ),
+        (
+            activity.application_decided,
+            LoanApplication.objects.filter(decided_at__isnull=False).select_related(
+                "customer__user", "product"
+            ),
+        ),
+        (
+            activity.loan_disbursed,
+            Loan.objects.select_related("application__customer__user", "application__product"),
+        ),
+        (activity.customer_registered, Customer.objects.select_related("user")),
+    ]
+    fields = [f.attname for f in ActivityEvent._meta.concrete_fields if not f.primary_key]
+    batch = []
+    for build, qs in sources:
+        for obj in qs.order_by("pk").iterator(chunk_size=BATCH_SIZE):
+            event = build(obj)
+            batch.append(ActivityEvent(**{f: getattr(event, f) for f in fields}))
+            if len(batch) >= BATCH_SIZE:
+                ActivityEvent.objects.bulk_create(batch)
+                batch = []
+    ActivityEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0001_initial"),
+        ("customers", "0001_initial"),
+        ("loans", "0001_initial"),
+        ("payments", "0002_loanpayment_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
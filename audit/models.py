@@ -1,3 +1,50 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
-# Create your models here.
+
+class ActivityEvent(models.Model):
+    """Append-only staff activity feed; one row per payment, decision, disbursement, sign-up."""
+
+    class Type(models.TextChoices):
+        PAYMENT = "payment", "Payment"
+        APPLICATION = "application", "Application decision"
+        DISBURSEMENT = "disbursement", "Disbursement"
+        REGISTRATION = "registration", "Registration"
+
+    type = models.CharField(max_length=20, choices=Type.choices)
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    object_id = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Primary key of the payment, application, loan or customer",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    occurred_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-occurred_at", "-id"]
+        indexes = [
+            models.Index(fields=["-occurred_at", "-id"], name="activity_occurred_at_idx"),
+            models.Index(fields=["type", "-occurred_at", "-id"], name="activity_type_occurred_at_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Allow inserts, block updates
+        if self.pk and not kwargs.get("force_insert", False):
+            raise ValidationError("Activity events are immutable.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Activity events cannot be deleted")
+
+    def __str__(self):
+        return f"{self.type}: {self.title} @ {self.occurred_at:%Y-%m-%d %H:%M}"
@@ -2,6 +2,10 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server to use the staff live-events stream at /api/v1/staff/live/
+(api/live.py) and the async read views (api/async_views.py). The production profile is
+config/gunicorn_asgi.py (an alternative Procfile `web` command); `manage.py loadtest`
+compares it with WSGI.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for the ASGI serving profile. To serve the API with it, replace the
+Procfile's `web` command (rather than adding a second process type, which the platform's
+router would never send traffic to) with:
+
+    web: python manage.py migrate --noinput && python manage.py collectstatic --noinput && gunicorn config.asgi:application -c config/gunicorn_asgi.py
+
+Uvicorn workers run the async read views (API_ASYNC_VIEWS) and the SSE stream without pinning
+a worker per request. Database connections stay persistent (DATABASE_CONN_MAX_AGE): the async
+views' reads run on a fixed pool of API_ASYNC_READ_THREADS threads per worker, each reusing its
+own connection. Every value can be overridden from the environment.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("API_ASYNC_VIEWS", "1")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+# One event loop per core is enough; each worker multiplexes many connections.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+if workers > 1 and os.environ.get("LIVE_EVENTS_BROKER") == "inprocess":
+    # Each worker would only stream the writes it served itself.
+    raise RuntimeError(
+        "LIVE_EVENTS_BROKER=inprocess needs WEB_CONCURRENCY=1; use activity-table with "
+        f"{workers} workers."
+    )
+# Behind Railway's proxy; keep idle client connections a little longer than its keepalive.
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "75"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+# Lets open SSE streams wind down on deploys.
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# Recycle workers now and then to bound memory growth; jitter avoids restarting together.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+accesslog = "-"
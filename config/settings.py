@@ -6,6 +6,8 @@ DATABASE_URL, ALLOWED_HOSTS, CORS_ALLOWED_ORIGINS, CSRF_TRUSTED_ORIGINS.
 """
 
 import os
+from decimal import Decimal
+from importlib.util import find_spec
 from pathlib import Path
 
 import dj_database_url
@@ -56,13 +58,112 @@ CSRF_TRUSTED_ORIGINS = _csrf
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.DefaultCursorPagination",
+    "PAGE_SIZE": 50,
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# MessagePack (application/msgpack) for the mobile client, when msgpack is installed.
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].insert(1, "api.renderers.MessagePackRenderer")
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].insert(1, "api.renderers.MessagePackParser")
+
+# Seconds a resolved token (user + profiles) stays in each worker's auth cache; 0 disables it.
+# Revocations reach other workers through the default cache, so with the process-local
+# LocMemCache api/authentication.py caps this at a few seconds.
+TOKEN_AUTH_CACHE_TTL = int(os.environ.get("TOKEN_AUTH_CACHE_TTL", "60"))
+
+# Velocity limits for the anonymous auth/customer-register/ and applications/submit/
+# (api/velocity.py): (attempts, window seconds) per client IP, per applicant identifier, or
+# per "ip+identifier" pair. Sign-up counts an email per address, so a stranger cannot lock it.
+# VELOCITY_CACHE names a Django cache alias to share counts across workers; empty keeps them
+# in each process. VELOCITY_PROXY_COUNT is the exact number of reverse proxies in front of the
+# app that append to X-Forwarded-For (1 behind the platform router; 0 when clients connect
+# directly, so the header is ignored). It must be a non-negative integer.
+VELOCITY_LIMITS = {
+    "register": {"ip": (20, 3600), "ip+email": (5, 3600)},
+    "submit": {
+        "ip": (30, 3600),
+        "email": (10, 86400),
+        "phone": (10, 86400),
+        "card": (10, 86400),
+    },
+}
+VELOCITY_CACHE = os.environ.get("VELOCITY_CACHE", "")
+VELOCITY_PROXY_COUNT = int(os.environ.get("VELOCITY_PROXY_COUNT", "1"))
+
+# auth/*-token/ password checks (api/passwords.py): threads hashing passwords in each process,
+# most checks running per endpoint across all workers (slots held in the PASSWORD_VERIFY_CACHE
+# alias, which must be shared for the limit to span processes), seconds a login waits for a
+# slot before a 429, and seconds between the stats lines logged by each process.
+PASSWORD_VERIFY_WORKERS = int(os.environ.get("PASSWORD_VERIFY_WORKERS", "4"))
+PASSWORD_VERIFY_CONCURRENCY = {
+    "staff": int(os.environ.get("PASSWORD_VERIFY_STAFF_CONCURRENCY", "4")),
+    "customer": int(os.environ.get("PASSWORD_VERIFY_CUSTOMER_CONCURRENCY", "8")),
 }
+PASSWORD_VERIFY_CACHE = os.environ.get("PASSWORD_VERIFY_CACHE", "default")
+PASSWORD_VERIFY_QUEUE_TIMEOUT = float(os.environ.get("PASSWORD_VERIFY_QUEUE_TIMEOUT", "5"))
+PASSWORD_VERIFY_STATS_INTERVAL = float(os.environ.get("PASSWORD_VERIFY_STATS_INTERVAL", "60"))
+
+# API tokens (api/tokens.py) expire this many seconds after their last use. Uses are written
+# at most once per token per TOKEN_TOUCH_INTERVAL_SECONDS.
+TOKEN_TTL_SECONDS = int(os.environ.get("TOKEN_TTL_SECONDS", str(30 * 24 * 3600)))
+TOKEN_TOUCH_INTERVAL_SECONDS = int(os.environ.get("TOKEN_TOUCH_INTERVAL_SECONDS", "300"))
+
+# batch/ endpoint (api/batch.py): sub-requests per call, and threads used to run them.
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "20"))
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", "4"))
+
+# applications/sync/: most applications a field agent's device may upload in one request.
+APPLICATION_SYNC_MAX_ITEMS = int(os.environ.get("APPLICATION_SYNC_MAX_ITEMS", "500"))
+
+# staff/applications/next/: seconds a reviewer's claim on an application lasts (renewed by
+# calling the endpoint again).
+APPLICATION_REVIEW_LEASE_SECONDS = int(os.environ.get("APPLICATION_REVIEW_LEASE_SECONDS", "900"))
+
+# staff/applications/decisions/: most applications decided in one request.
+APPLICATION_DECISIONS_MAX_ITEMS = int(os.environ.get("APPLICATION_DECISIONS_MAX_ITEMS", "200"))
+
+# Application eligibility (api/exposure.py), checked on submit against each customer's
+# maintained exposure; 0 disables a rule. Amounts are in the loan currency (GHS).
+EXPOSURE_MAX_ACTIVE_LOANS = int(os.environ.get("EXPOSURE_MAX_ACTIVE_LOANS", "2"))
+EXPOSURE_MAX_OUTSTANDING = Decimal(os.environ.get("EXPOSURE_MAX_OUTSTANDING", "5000"))
+EXPOSURE_DEFAULT_COOLDOWN_DAYS = int(os.environ.get("EXPOSURE_DEFAULT_COOLDOWN_DAYS", "180"))
+
+# sync/: changes returned per resource per call (default, and the most a client may ask for).
+SYNC_DEFAULT_LIMIT = int(os.environ.get("SYNC_DEFAULT_LIMIT", "200"))
+SYNC_MAX_LIMIT = int(os.environ.get("SYNC_MAX_LIMIT", "1000"))
+
+# Serve me/, products/, staff/dashboard-summary/ and staff/analytics/summary/ from the async
+# views in api/async_views.py. Set by the ASGI profile (config/gunicorn_asgi.py); under WSGI
+# the sync views are cheaper.
+API_ASYNC_VIEWS = os.environ.get("API_ASYNC_VIEWS", "false").lower() in ("1", "true", "yes")
+# Threads per worker that run those views' concurrent reads; each keeps one persistent
+# database connection.
+API_ASYNC_READ_THREADS = int(os.environ.get("API_ASYNC_READ_THREADS", "4"))
+
+# Responses smaller than this many bytes are sent uncompressed (api/middleware.py).
+GZIP_MIN_LENGTH = int(os.environ.get("GZIP_MIN_LENGTH", "1024"))
+
+# Live staff updates (api/live.py): "activity-table" polls the activity event table, so writes
+# from any worker or process reach every stream; "inprocess" only suits a single ASGI worker
+# that serves all writes too.
+LIVE_EVENTS_BROKER = os.environ.get("LIVE_EVENTS_BROKER", "activity-table")
+LIVE_EVENTS_POLL_INTERVAL = float(os.environ.get("LIVE_EVENTS_POLL_INTERVAL", "1.0"))
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -81,12 +182,16 @@ INSTALLED_APPS = [
     "ledger",
     "payments",
     "audit",
+    "analytics",
+    "sync",
     "api",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # After WhiteNoise, which serves its own pre-compressed static files.
+    "api.middleware.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -119,7 +224,10 @@ if os.environ.get("DATABASE_URL"):
     DATABASES = {
         "default": dj_database_url.parse(
             os.environ["DATABASE_URL"],
-            conn_max_age=600,
+            # Per thread; the ASGI profile's async reads run on a fixed pool
+            # (API_ASYNC_READ_THREADS) so their connections persist too.
+            conn_max_age=int(os.environ.get("DATABASE_CONN_MAX_AGE", "600")),
+            conn_health_checks=True,
             ssl_require=os.environ.get("DATABASE_SSL_REQUIRE", "true").lower()
             in ("1", "true", "yes"),
         )
@@ -141,6 +249,17 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "core.User"
 
+# Django's default hashers, with pbkdf2_sha256 at a configurable iteration count (0 keeps
+# Django's default). Hashes at any other count are upgraded on the next token login.
+PASSWORD_HASHERS = [
+    "core.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "0"))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -157,6 +276,16 @@ STORAGES = {
     },
 }
 
+# The api logger (password check stats, batch failures) writes to stderr for the platform logs.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "api": {"handlers": ["console"], "level": os.environ.get("API_LOG_LEVEL", "INFO")},
+    },
+}
+
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 USE_X_FORWARDED_HOST = True
 
@@ -0,0 +1,29 @@
+"""
+Counter rows kept current by write paths (analytics.rollups, api.exposure).
+
+Callers bump() inside the business transaction, so a rolled-back write leaves no trace. Only
+writes that go through those paths are counted: admin edits, bulk imports and raw SQL are
+not. Each module's rebuild() recomputes its rows from the source tables, backing its data
+migration and its rebuild_* management command, which is how drift from such writes is
+repaired.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def bump(model, lookup: dict, *, values=None, **deltas) -> None:
+    """
+    Add deltas to the row matching lookup and set values on it, creating the row (with the
+    deltas as its counts) on first use.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    updates.update(values or {})
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas, **(values or {}))
+    except IntegrityError:
+        # A concurrent first write created the row between the update and the insert.
+        model.objects.filter(**lookup).update(**updates)
@@ -0,0 +1,67 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:48
+
+import core.models
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+# Login and registration match users case-insensitively; these back those lookups. On
+# PostgreSQL they are built with CREATE INDEX CONCURRENTLY so a large users table stays
+# writable during the deploy, which is why this migration is not atomic.
+INDEXES = [
+    models.Index(django.db.models.functions.text.Lower('email'), name='user_email_lower_idx'),
+    models.Index(django.db.models.functions.text.Lower('username'), name='user_username_lower_idx'),
+]
+
+
+def lowercase_emails(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    User.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+def add_indexes(apps, schema_editor):
+    model = apps.get_model('core', 'User')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in INDEXES:
+        if concurrently:
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def remove_indexes(apps, schema_editor):
+    model = apps.get_model('core', 'User')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in INDEXES:
+        if concurrently:
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', core.models.UserManager()),
+            ],
+        ),
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='user', index=index) for index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+        ),
+    ]
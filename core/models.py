@@ -1,6 +1,25 @@
 # core/models.py (or users/models.py)
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as DjangoUserManager
 from django.db import models
+from django.db.models.functions import Lower
+
+
+class UserQuerySet(models.QuerySet):
+    """Case-insensitive lookups that use the lower(email)/lower(username) indexes."""
+
+    def email_matches(self, email: str):
+        return self.alias(email_lower=Lower("email")).filter(email_lower=email.strip().lower())
+
+    def username_matches(self, username: str):
+        return self.alias(username_lower=Lower("username")).filter(
+            username_lower=username.strip().lower()
+        )
+
+
+class UserManager(DjangoUserManager.from_queryset(UserQuerySet)):
+    pass
+
 
 class User(AbstractUser):
     class UserType(models.TextChoices):
@@ -14,6 +33,20 @@ class User(AbstractUser):
         help_text="Distinguish between employee and customer users"
     )
 
+    objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+            models.Index(Lower("username"), name="user_username_lower_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Emails are stored lowercased; compare them with email_matches().
+        if self.email:
+            self.email = self.email.strip().lower()
+        super().save(*args, **kwargs)
+
     def is_employee(self):
         return self.type == self.UserType.EMPLOYEE
 
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_created_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, help_text="Bumped by api.events when this customer's applications, loans or payments change"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, help_text='Commit-ordered change sequence for sync/ (see sync.changes)'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def backfill_and_index(apps, schema_editor):
+    from customers.search import build_document, install_index
+
+    Customer = apps.get_model("customers", "Customer")
+    batch = []
+    for customer in Customer.objects.select_related("user").iterator(chunk_size=1000):
+        customer.search_document = build_document(customer, customer.user)
+        batch.append(customer)
+        if len(batch) == 1000:
+            Customer.objects.bulk_update(batch, ["search_document"])
+            batch = []
+    Customer.objects.bulk_update(batch, ["search_document"])
+    install_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from customers.search import uninstall_index
+
+    uninstall_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0005_customer_search_document"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_and_index, drop_index),
+    ]
@@ -1,9 +1,11 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from sync.models import TracksChanges
+from . import search
 
 # Create your models here.
-class Customer(models.Model):
+class Customer(TracksChanges, models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -47,12 +49,40 @@ class Customer(models.Model):
         choices=Status.choices,
         default=Status.ACTIVE
     )
+    data_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped by api.events when this customer's applications, loans or payments change",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Commit-ordered change sequence for sync/ (see sync.changes)",
+    )
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Lowercased names, email, phone and ID for staff search (see customers.search)",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="customer_created_at_idx"),
+        ]
 
     def __str__(self):
         return f"{self.national_id_type} - {self.national_id_number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets customers.search skip the user query when a save leaves these unchanged.
+        instance._search_loaded = search.loaded_fields(instance)
+        return instance
+
 class CustomerConsent(models.Model):
     class ConsentType(models.TextChoices):
         TERMS_AND_CONDITIONS = "TERMS_AND_CONDITIONS", "Terms and Conditions"
@@ -0,0 +1,262 @@
+"""
+Staff search over customers by name fragment, phone (any part, e.g. the last digits), Ghana
+Card number and email.
+
+Each customer keeps a lowercased search_document (names, email, phone, national ID),
+refreshed by the signals below whenever the customer or their user changes. Bulk writes must
+call refresh_document() themselves. The document is indexed per database:
+
+* PostgreSQL: a pg_trgm GIN index, so substring matches (LIKE '%...%') are index scans and
+  results are ranked by trigram word similarity.
+* SQLite: an FTS5 table with the trigram tokenizer, kept in sync with customers_customer by
+  triggers and ranked by bm25. Customer has a UUID primary key, so its implicit rowid is not
+  stable (VACUUM may renumber it); the FTS rows are keyed on an INTEGER PRIMARY KEY of a
+  small side table that maps them to customer ids instead. Rebuilding customers_customer
+  (SQLite ALTER TABLE) drops the triggers, so post_migrate reinstalls them and rebuilds the
+  index when any part of it is missing.
+
+Other backends fall back to an unindexed substring scan. Queries need at least
+MIN_QUERY_LENGTH characters, the shortest a trigram index can answer.
+"""
+
+from django.db import connection
+
+MIN_QUERY_LENGTH = 3
+
+_FTS_TABLE = "customers_customer_search"
+_DOC_TABLE = "customers_customer_search_doc"
+_TRGM_INDEX = "customer_search_trgm_idx"
+_DOCID = f"(SELECT docid FROM {_DOC_TABLE} WHERE customer_id = {{}}.id)"
+_SQLITE_TRIGGERS = {
+    f"{_FTS_TABLE}_ai": f"""
+        CREATE TRIGGER {_FTS_TABLE}_ai AFTER INSERT ON customers_customer BEGIN
+            INSERT INTO {_DOC_TABLE}(customer_id) VALUES (new.id);
+            INSERT INTO {_FTS_TABLE}(rowid, search_document)
+            VALUES ({_DOCID.format("new")}, new.search_document);
+        END
+    """,
+    f"{_FTS_TABLE}_ad": f"""
+        CREATE TRIGGER {_FTS_TABLE}_ad AFTER DELETE ON customers_customer BEGIN
+            DELETE FROM {_FTS_TABLE} WHERE rowid = {_DOCID.format("old")};
+            DELETE FROM {_DOC_TABLE} WHERE customer_id = old.id;
+        END
+    """,
+    f"{_FTS_TABLE}_au": f"""
+        CREATE TRIGGER {_FTS_TABLE}_au AFTER UPDATE OF search_document ON customers_customer
+        BEGIN
+            UPDATE {_FTS_TABLE} SET search_document = new.search_document
+            WHERE rowid = {_DOCID.format("new")};
+        END
+    """,
+}
+# Fields of the customer itself that feed the document (the rest come from the user).
+_CUSTOMER_FIELDS = ("email", "phone_number", "national_id_number")
+
+
+def build_document(customer, user) -> str:
+    parts = [
+        user.first_name,
+        user.last_name,
+        user.email,
+        customer.email,
+        customer.phone_number,
+        customer.national_id_number,
+    ]
+    return " ".join(p.strip() for p in parts if p and p.strip()).lower()
+
+
+def refresh_document(customer, user=None) -> bool:
+    """Recompute customer.search_document in memory; True when it changed."""
+    document = build_document(customer, user or customer.user)
+    changed = document != customer.search_document
+    customer.search_document = document
+    return changed
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.split()).lower()
+
+
+def search_ids(q: str, limit: int) -> list:
+    """Primary keys of the best matching customers, best first."""
+    q = normalize_query(q)
+    if len(q) < MIN_QUERY_LENGTH:
+        return []
+    if connection.vendor == "postgresql":
+        return _search_postgresql(q, limit)
+    if connection.vendor == "sqlite" and _sqlite_index_installed(connection):
+        return _search_sqlite(q, limit)
+    return _search_scan(q, limit)
+
+
+def _search_postgresql(q: str, limit: int) -> list:
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    from .models import Customer
+
+    return list(
+        Customer.objects.filter(search_document__contains=q)
+        .annotate(rank=TrigramWordSimilarity(q, "search_document"))
+        .order_by("-rank", "-created_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+
+def _search_sqlite(q: str, limit: int) -> list:
+    from .models import Customer
+
+    phrase = '"' + q.replace('"', '""') + '"'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT c.id FROM {_FTS_TABLE} s
+            JOIN {_DOC_TABLE} d ON d.docid = s.rowid
+            JOIN customers_customer c ON c.id = d.customer_id
+            WHERE {_FTS_TABLE} MATCH %s
+            ORDER BY s.rank, c.created_at DESC
+            LIMIT %s
+            """,
+            [phrase, limit],
+        )
+        to_pk = Customer._meta.pk.to_python
+        return [to_pk(row[0]) for row in cursor.fetchall()]
+
+
+def _search_scan(q: str, limit: int) -> list:
+    from .models import Customer
+
+    return list(
+        Customer.objects.filter(search_document__contains=q)
+        .order_by("-created_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+
+def _sqlite_index_installed(conn) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s, %s)",
+            [_FTS_TABLE, _DOC_TABLE, *_SQLITE_TRIGGERS],
+        )
+        return cursor.fetchone()[0] == 2 + len(_SQLITE_TRIGGERS)
+
+
+def install_index(conn) -> None:
+    """Create the backend's search index (idempotent); called from the migration.
+
+    On SQLite this drops and rebuilds the whole index, which also replaces older layouts.
+    """
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {_TRGM_INDEX} ON customers_customer "
+                "USING gin (search_document gin_trgm_ops)"
+            )
+        elif conn.vendor == "sqlite":
+            _drop_sqlite_index(cursor)
+            cursor.execute(
+                f"CREATE TABLE {_DOC_TABLE} "
+                "(docid INTEGER PRIMARY KEY, customer_id TEXT NOT NULL UNIQUE)"
+            )
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {_FTS_TABLE} USING fts5("
+                "search_document, tokenize='trigram')"
+            )
+            for sql in _SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            cursor.execute(
+                f"INSERT INTO {_DOC_TABLE}(customer_id) SELECT id FROM customers_customer"
+            )
+            cursor.execute(
+                f"INSERT INTO {_FTS_TABLE}(rowid, search_document) "
+                f"SELECT d.docid, c.search_document FROM {_DOC_TABLE} d "
+                "JOIN customers_customer c ON c.id = d.customer_id"
+            )
+
+
+def uninstall_index(conn) -> None:
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {_TRGM_INDEX}")
+        elif conn.vendor == "sqlite":
+            _drop_sqlite_index(cursor)
+
+
+def _drop_sqlite_index(cursor) -> None:
+    for name in _SQLITE_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cursor.execute(f"DROP TABLE IF EXISTS {_FTS_TABLE}")
+    cursor.execute(f"DROP TABLE IF EXISTS {_DOC_TABLE}")
+
+
+def _ensure_sqlite_index(sender, using="default", **kwargs):
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+
+    conn = connections[using]
+    if conn.vendor != "sqlite" or _sqlite_index_installed(conn):
+        return
+    applied = MigrationRecorder(conn).applied_migrations()
+    if ("customers", "0006_customer_search_index") in applied:
+        install_index(conn)
+
+
+def loaded_fields(customer) -> tuple:
+    """The customer's own document fields as loaded; deferred fields read as None."""
+    return tuple(customer.__dict__.get(name) for name in _CUSTOMER_FIELDS)
+
+
+def _needs_refresh(customer) -> bool:
+    # Refreshing reads customer.user. Skip that query for an existing customer whose user is
+    # not loaded and whose own fields are unchanged: user edits reach the document through
+    # _user_post_save.
+    if customer._state.adding or type(customer).user.is_cached(customer):
+        return True
+    return loaded_fields(customer) != getattr(customer, "_search_loaded", None)
+
+
+def _customer_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and update_fields is None and _needs_refresh(instance):
+        refresh_document(instance)
+
+
+def _customer_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # save(update_fields=[...]) would not write a document set in pre_save.
+    if (
+        not raw
+        and update_fields is not None
+        and "search_document" not in update_fields
+        and {"user", "user_id", *_CUSTOMER_FIELDS} & set(update_fields)
+        and refresh_document(instance)
+    ):
+        sender._base_manager.filter(pk=instance.pk).update(
+            search_document=instance.search_document
+        )
+    if not raw:
+        instance._search_loaded = loaded_fields(instance)
+
+
+_USER_FIELDS = {"first_name", "last_name", "email"}
+
+
+def _user_post_save(sender, instance, raw=False, update_fields=None, created=False, **kwargs):
+    if raw or created or (update_fields is not None and not _USER_FIELDS & set(update_fields)):
+        return
+    from .models import Customer
+
+    customer = Customer.objects.filter(user=instance).first()
+    if customer is not None and refresh_document(customer, instance):
+        Customer.objects.filter(pk=customer.pk).update(search_document=customer.search_document)
+
+
+def connect_signals(app_config) -> None:
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_migrate, post_save, pre_save
+
+    from .models import Customer
+
+    pre_save.connect(_customer_pre_save, sender=Customer, dispatch_uid="customer-search-pre")
+    post_save.connect(_customer_post_save, sender=Customer, dispatch_uid="customer-search-post")
+    post_save.connect(_user_post_save, sender=get_user_model(), dispatch_uid="customer-search-user")
+    post_migrate.connect(_ensure_sqlite_index, sender=app_config, dispatch_uid="customer-search")
@@ -128,6 +128,11 @@ class Employee(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="employee_created_at_idx"),
+        ]
+
     def is_admin(self):
         return self.role == self.Role.ADMIN
 
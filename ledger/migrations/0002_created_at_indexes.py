@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0001_initial'),
+        ('loans', '0002_created_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['-created_at', '-id'], name='ledgerentry_created_at_idx'),
+        ),
+    ]
@@ -63,6 +63,9 @@ class LedgerEntry(models.Model):
     
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="ledgerentry_created_at_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # Allow inserts, block updates
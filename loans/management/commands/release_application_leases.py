@@ -0,0 +1,16 @@
+"""Clear lapsed review claims left by staff/applications/next/."""
+
+from django.core.management.base import BaseCommand
+
+from loans import review_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Release review leases that have expired. Expired claims are already claimable again; "
+        "run this periodically so assigned_to only shows live claims."
+    )
+
+    def handle(self, *args, **options):
+        released = review_queue.release_expired()
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired review lease(s)."))
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_created_at_indexes'),
+        ('loans', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['-created_at', '-id'], name='loan_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['-created_at', '-id'], name='loanapp_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0002_created_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanproduct',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0003_loanproduct_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanapplication',
+            name='client_reference',
+            field=models.CharField(blank=True, help_text='Idempotency key from offline capture (applications/sync/)', max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0004_loanapplication_client_reference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, help_text='Commit-ordered change sequence for sync/ (see sync.changes)'),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='loanapplication',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, help_text='Commit-ordered change sequence for sync/ (see sync.changes)'),
+        ),
+    ]
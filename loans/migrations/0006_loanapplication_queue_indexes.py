@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customer_search_index'),
+        ('loans', '0005_loan_change_seq_loan_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='loanapp_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['status', '-submitted_at', '-id'], name='loanapp_status_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['status', '-decided_at', '-id'], name='loanapp_status_decided_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['product', 'status', '-submitted_at', '-id'], name='loanapp_product_queue_idx'),
+        ),
+    ]
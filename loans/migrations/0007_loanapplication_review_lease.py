@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0004_created_at_indexes'),
+        ('loans', '0006_loanapplication_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanapplication',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, help_text='Reviewer claim from staff/applications/next/ (see loans.review_queue)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_applications', to='institutions.employee'),
+        ),
+        migrations.AddField(
+            model_name='loanapplication',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
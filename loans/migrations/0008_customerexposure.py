@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customer_search_index'),
+        ('loans', '0007_loanapplication_review_lease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerExposure',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='exposure', serialize=False, to='customers.customer')),
+                ('active_loans', models.IntegerField(default=0, help_text='ACTIVE and DEFAULTED loans')),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, help_text='Expected repayment less completed payments, over those loans', max_digits=14)),
+                ('last_default_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    from api.exposure import rebuild
+
+    rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0008_customerexposure"),
+        ("payments", "0003_loanpayment_change_seq_loanpayment_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0009_backfill_customer_exposure'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['status'], name='loan_status_idx'),
+        ),
+    ]
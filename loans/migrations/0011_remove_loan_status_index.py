@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:23
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0010_loan_status_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='loan',
+            name='loan_status_idx',
+        ),
+    ]
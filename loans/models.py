@@ -1,6 +1,7 @@
 from django.db import models
 from customers.models import Customer, CustomerConsent
 from institutions.models import Employee
+from sync.models import TracksChanges
 # Create your models here.
 
 class LoanProduct(models.Model):
@@ -35,9 +36,10 @@ class LoanProduct(models.Model):
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
-class LoanApplication(models.Model):
+class LoanApplication(TracksChanges, models.Model):
     class Status(models.TextChoices):
         DRAFT = "DRAFT", "Draft"
         SUBMITTED = "SUBMITTED", "Submitted"
@@ -69,8 +71,49 @@ class LoanApplication(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Commit-ordered change sequence for sync/ (see sync.changes)",
+    )
     submitted_at = models.DateTimeField(null=True, blank=True)
     decided_at = models.DateTimeField(null=True, blank=True)
+    client_reference = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        unique=True,
+        help_text="Idempotency key from offline capture (applications/sync/)",
+    )
+    assigned_to = models.ForeignKey(
+        Employee,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="assigned_applications",
+        help_text="Reviewer claim from staff/applications/next/ (see loans.review_queue)",
+    )
+    lease_expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="loanapp_created_at_idx"),
+            # Review queue: status (and product) filters with each ordering.
+            models.Index(
+                fields=["status", "-created_at", "-id"], name="loanapp_status_created_idx"
+            ),
+            models.Index(
+                fields=["status", "-submitted_at", "-id"], name="loanapp_status_submitted_idx"
+            ),
+            models.Index(
+                fields=["status", "-decided_at", "-id"], name="loanapp_status_decided_idx"
+            ),
+            models.Index(
+                fields=["product", "status", "-submitted_at", "-id"],
+                name="loanapp_product_queue_idx",
+            ),
+        ]
 
     # def __str__(self):
         # return f"LoanApplication #{self.id} - {self.customer_id} - {self.product.code}"
@@ -81,7 +124,7 @@ class LoanApplication(models.Model):
 
 
 
-class Loan(models.Model):
+class Loan(TracksChanges, models.Model):
     class Status(models.TextChoices):
         ACTIVE = "ACTIVE", "Active"
         COMPLETED = "COMPLETED", "Completed"
@@ -117,6 +160,44 @@ class Loan(models.Model):
     maturity_date = models.DateField()
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Commit-ordered change sequence for sync/ (see sync.changes)",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="loan_created_at_idx"),
+        ]
+
+
+class CustomerExposure(models.Model):
+    """
+    What a customer owes right now, kept current by the disbursement, repayment and loan
+    status paths (api.exposure) so an eligibility check is one primary-key read.
+    """
+
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="exposure",
+    )
+    active_loans = models.IntegerField(default=0, help_text="ACTIVE and DEFAULTED loans")
+    outstanding = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Expected repayment less completed payments, over those loans",
+    )
+    last_default_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Exposure {self.customer_id}: {self.active_loans} loan(s), {self.outstanding}"
+
 
 class LoanApproval(models.Model):
     class Decision(models.TextChoices):
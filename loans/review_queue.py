@@ -0,0 +1,89 @@
+"""
+Claiming SUBMITTED applications for review (staff/applications/next/).
+
+claim_next() hands the calling employee the oldest submitted application nobody holds, and
+records the claim as assigned_to plus a lease (APPLICATION_REVIEW_LEASE_SECONDS). On
+PostgreSQL the candidate row is read with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+reviewers each take a different row without waiting on one another. The claim itself is a
+conditional UPDATE, so backends without row locks (SQLite) can never hand one row to two
+reviewers either.
+
+An employee holds one claim at a time: calling again while the lease is live returns the same
+application with a renewed lease. A decision (or cancellation) ends the claim. Expired leases
+are claimable again right away; release_expired() clears them in bulk for housekeeping (the
+release_application_leases command).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import LoanApplication
+
+_CLAIM_ATTEMPTS = 5
+
+
+def _lease_until(now):
+    return now + timedelta(seconds=settings.APPLICATION_REVIEW_LEASE_SECONDS)
+
+
+def claimable(now=None):
+    now = now or timezone.now()
+    return LoanApplication.objects.filter(status=LoanApplication.Status.SUBMITTED).filter(
+        Q(assigned_to__isnull=True) | Q(lease_expires_at__lte=now)
+    )
+
+
+def claim_next(employee) -> LoanApplication | None:
+    """The application now leased to employee, or None when the queue is empty."""
+    now = timezone.now()
+    with transaction.atomic():
+        held = (
+            LoanApplication.objects.filter(
+                assigned_to=employee,
+                status=LoanApplication.Status.SUBMITTED,
+                lease_expires_at__gt=now,
+            )
+            .order_by("submitted_at", "id")
+            .first()
+        )
+        if held is not None:
+            held.lease_expires_at = _lease_until(now)
+            LoanApplication.objects.filter(pk=held.pk).update(
+                lease_expires_at=held.lease_expires_at
+            )
+            return held
+
+        for _ in range(_CLAIM_ATTEMPTS):
+            candidate = (
+                claimable(now)
+                .select_for_update(skip_locked=True)
+                .order_by("submitted_at", "id")
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if candidate is None:
+                return None
+            claimed = claimable(now).filter(pk=candidate).update(
+                assigned_to=employee, lease_expires_at=_lease_until(now)
+            )
+            if claimed:
+                return LoanApplication.objects.get(pk=candidate)
+    return None
+
+
+def release(application) -> None:
+    """End the claim on application (after a decision); caller saves the two fields."""
+    application.assigned_to = None
+    application.lease_expires_at = None
+
+
+def release_expired(now=None) -> int:
+    """Clear every lapsed lease in one UPDATE; returns how many were released."""
+    now = now or timezone.now()
+    return LoanApplication.objects.filter(lease_expires_at__lte=now).update(
+        assigned_to=None, lease_expires_at=None
+    )
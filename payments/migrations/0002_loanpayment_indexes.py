@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0001_initial'),
+        ('payments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanpayment',
+            index=models.Index(fields=['-paid_at', '-id'], name='payment_paid_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanpayment',
+            index=models.Index(fields=['loan', '-paid_at', '-id'], name='payment_loan_paid_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanpayment',
+            index=models.Index(fields=['method', '-paid_at', '-id'], name='payment_method_paid_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanpayment',
+            index=models.Index(fields=['status', '-paid_at', '-id'], name='payment_status_paid_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanpayment',
+            index=models.Index(fields=['recorded_by', '-paid_at', '-id'], name='payment_recorder_paid_at_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_loanpayment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanpayment',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, help_text='Commit-ordered change sequence for sync/ (see sync.changes)'),
+        ),
+        migrations.AddField(
+            model_name='loanpayment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -2,9 +2,10 @@ from django.conf import settings
 from django.db import models
 
 from loans.models import Loan
+from sync.models import TracksChanges
 
 
-class LoanPayment(models.Model):
+class LoanPayment(TracksChanges, models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
         COMPLETED = "COMPLETED", "Completed"
@@ -37,9 +38,25 @@ class LoanPayment(models.Model):
         related_name="recorded_payments",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Commit-ordered change sequence for sync/ (see sync.changes)",
+    )
 
     class Meta:
         ordering = ["-paid_at", "-id"]
+        indexes = [
+            models.Index(fields=["-paid_at", "-id"], name="payment_paid_at_idx"),
+            models.Index(fields=["loan", "-paid_at", "-id"], name="payment_loan_paid_at_idx"),
+            models.Index(fields=["method", "-paid_at", "-id"], name="payment_method_paid_at_idx"),
+            models.Index(fields=["status", "-paid_at", "-id"], name="payment_status_paid_at_idx"),
+            models.Index(
+                fields=["recorded_by", "-paid_at", "-id"], name="payment_recorder_paid_at_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Payment {self.amount} on loan {self.loan_id}"
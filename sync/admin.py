@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ("resource", "object_id", "customer_id", "change_seq", "deleted_at")
+    list_filter = ("resource",)
+    date_hierarchy = "deleted_at"
@@ -0,0 +1,208 @@
+"""
+Change sequence behind the sync/ delta endpoint.
+
+Every save of a tracked model (LoanApplication, Loan, LoanPayment, Customer) stores a fresh
+number in the row's indexed change_seq column, in the same INSERT or UPDATE as the rest of the
+row (sync.models.TracksChanges adds the column to save(update_fields=...)). Every delete
+leaves a Tombstone numbered the same way. Clients remember the highest number they have seen
+per resource and ask for what lies above it, so an incremental refresh is an index range scan
+sized by the number of changes, not by the table.
+
+On PostgreSQL numbers take no lock: a number is the writing transaction's id
+(pg_current_xact_id()) shifted left by XACT_SHIFT bits, plus a counter within that
+transaction, so concurrent writers never wait on each other. Transaction ids are handed out
+in start order, not commit order, so changes_since() only serves numbers below horizon():
+the oldest transaction still in flight. Everything below it has committed or rolled back for
+good, so a client can never see N+1 and then miss N for good. A long write transaction delays
+the changes made after it started until it ends, but none are lost.
+
+Other backends (SQLite in development) run one writer at a time anyway. There numbers come
+from the single ChangeCounter row, and everything committed is served.
+
+Writes must run inside transaction.atomic (all API write paths and the admin do). Under
+autocommit the number would belong to a transaction that ended before the row was written, so
+a client could move past it before the row is visible; on PostgreSQL allocate() refuses.
+Bulk writes (bulk_create/bulk_update, QuerySet.update) send no signals and must call stamp()
+themselves.
+"""
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import BigIntegerField, Case, F, Value, When
+from django.db.transaction import TransactionManagementError
+
+from .models import ChangeCounter, Tombstone
+
+RESOURCES = {
+    Tombstone.Resource.APPLICATIONS: "loans.LoanApplication",
+    Tombstone.Resource.LOANS: "loans.Loan",
+    Tombstone.Resource.PAYMENTS: "payments.LoanPayment",
+    Tombstone.Resource.CUSTOMERS: "customers.Customer",
+}
+
+# Lookup from each tracked model to its customer's id, for borrower-scoped sync.
+CUSTOMER_LOOKUPS = {
+    Tombstone.Resource.APPLICATIONS: "customer_id",
+    Tombstone.Resource.LOANS: "application__customer_id",
+    Tombstone.Resource.PAYMENTS: "loan__application__customer_id",
+    Tombstone.Resource.CUSTOMERS: "pk",
+}
+
+
+def model_for(resource: str):
+    return apps.get_model(RESOURCES[resource])
+
+
+# Low bits of a PostgreSQL change_seq count changes within one transaction.
+XACT_SHIFT = 24
+
+
+def _current_xact_id() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_current_xact_id()::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def allocate(count: int = 1) -> int:
+    """Reserve count consecutive sequence numbers and return the highest of them."""
+    if connection.vendor == "postgresql":
+        if not connection.in_atomic_block:
+            raise TransactionManagementError(
+                "Tracked changes must be written inside transaction.atomic()."
+            )
+        xact_id = _current_xact_id()
+        # Transaction ids are never reused, so a different id means a new transaction.
+        last_id, used = getattr(connection, "_sync_change_xact", (None, 0))
+        used = (used if last_id == xact_id else 0) + count
+        if used >= 1 << XACT_SHIFT:
+            raise OverflowError("Too many tracked changes in one transaction.")
+        connection._sync_change_xact = (xact_id, used)
+        return (xact_id << XACT_SHIFT) + used
+    if not ChangeCounter.objects.filter(pk=1).update(value=F("value") + count):
+        ChangeCounter.objects.get_or_create(pk=1)
+        ChangeCounter.objects.filter(pk=1).update(value=F("value") + count)
+    return ChangeCounter.objects.values_list("value", flat=True).get(pk=1)
+
+
+def stamp(instances) -> None:
+    """Give each unsaved or about-to-be-bulk-updated instance the next change_seq."""
+    instances = list(instances)
+    if not instances:
+        return
+    first = allocate(len(instances)) - len(instances) + 1
+    for offset, instance in enumerate(instances):
+        instance.change_seq = first + offset
+
+
+def update_expression(pks):
+    """change_seq value for a QuerySet.update() over pks: a fresh number for each row."""
+    pks = list(pks)
+    first = allocate(len(pks)) - len(pks) + 1
+    return Case(
+        *(When(pk=pk, then=Value(first + offset)) for offset, pk in enumerate(pks)),
+        default=F("change_seq"),
+        output_field=BigIntegerField(),
+    )
+
+
+def horizon() -> int | None:
+    """Numbers at or above this may still be taken by a transaction in flight; None: no limit."""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        # Our own transaction is not in the xip list: its changes count as settled for us.
+        cursor.execute(
+            "SELECT COALESCE("
+            "(SELECT min(x::text::bigint) FROM pg_snapshot_xip(s) AS x), "
+            "pg_snapshot_xmax(s)::text::bigint) "
+            "FROM pg_current_snapshot() AS s"
+        )
+        return cursor.fetchone()[0] << XACT_SHIFT
+
+
+def changes_since(resource: str, cursor: int, limit: int, customer_id=None):
+    """
+    The next `limit` settled changes after cursor (see horizon()), in sequence order.
+
+    Returns (changed_ids, deleted_ids, next_cursor, has_more). changed_ids are rows that were
+    created or updated (only their latest state exists); deleted_ids come from tombstones.
+    """
+    model = model_for(resource)
+    rows = model.objects.filter(change_seq__gt=cursor)
+    tombstones = Tombstone.objects.filter(resource=resource, change_seq__gt=cursor)
+    below = horizon()
+    if below is not None:
+        rows = rows.filter(change_seq__lt=below)
+        tombstones = tombstones.filter(change_seq__lt=below)
+    if customer_id is not None:
+        rows = rows.filter(**{CUSTOMER_LOOKUPS[resource]: customer_id})
+        tombstones = tombstones.filter(customer_id=str(customer_id))
+    changed = [
+        (seq, pk, False)
+        for pk, seq in rows.order_by("change_seq").values_list("pk", "change_seq")[: limit + 1]
+    ]
+    to_pk = model._meta.pk.to_python
+    deleted = [
+        (seq, to_pk(pk), True)
+        for pk, seq in tombstones.order_by("change_seq").values_list(
+            "object_id", "change_seq"
+        )[: limit + 1]
+    ]
+    merged = sorted(changed + deleted, key=lambda change: change[0])
+    page = merged[:limit]
+    next_cursor = page[-1][0] if page else cursor
+    return (
+        [pk for _, pk, gone in page if not gone],
+        [pk for _, pk, gone in page if gone],
+        next_cursor,
+        len(merged) > limit,
+    )
+
+
+def _resource_of(model) -> str | None:
+    for resource, label in RESOURCES.items():
+        if model._meta.label == label:
+            return resource
+    return None
+
+
+def _owner_id(resource: str, instance):
+    """Customer id of a just-deleted row, read through relations that still exist."""
+    if resource == Tombstone.Resource.CUSTOMERS:
+        return instance.pk
+    lookup = CUSTOMER_LOOKUPS[resource]
+    parent_field, _, rest = lookup.partition("__")
+    if not rest:
+        return getattr(instance, lookup)
+    parent = instance._meta.get_field(parent_field).related_model
+    return (
+        parent.objects.filter(pk=getattr(instance, f"{parent_field}_id"))
+        .values_list(rest, flat=True)
+        .first()
+    )
+
+
+def _stamp_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stamp([instance])
+
+
+def _record_deleted(sender, instance, **kwargs):
+    resource = _resource_of(sender)
+    customer_id = _owner_id(resource, instance)
+    Tombstone.objects.create(
+        resource=resource,
+        object_id=str(instance.pk),
+        customer_id="" if customer_id is None else str(customer_id),
+        change_seq=allocate(),
+    )
+
+
+def connect_signals() -> None:
+    from django.db.models.signals import post_delete, pre_save
+
+    for resource in RESOURCES:
+        model = model_for(resource)
+        uid = f"sync-{model._meta.label_lower}"
+        pre_save.connect(_stamp_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_record_deleted, sender=model, dispatch_uid=f"{uid}-del")
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('applications', 'Loan applications'), ('loans', 'Loans'), ('payments', 'Loan payments'), ('customers', 'Customers')], max_length=20)),
+                ('object_id', models.CharField(max_length=64)),
+                ('customer_id', models.CharField(blank=True, help_text='Owning customer at deletion time, for borrower-scoped sync', max_length=64)),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resource', 'change_seq'], name='tombstone_resource_seq_idx'), models.Index(fields=['resource', 'customer_id', 'change_seq'], name='tombstone_customer_seq_idx')],
+            },
+        ),
+    ]
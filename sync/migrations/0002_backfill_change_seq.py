@@ -0,0 +1,38 @@
+from django.db import migrations
+
+TRACKED = [
+    ("customers", "Customer"),
+    ("loans", "LoanApplication"),
+    ("loans", "Loan"),
+    ("payments", "LoanPayment"),
+]
+
+
+def backfill(apps, schema_editor):
+    """Number existing rows (oldest first) so a client's first sync can page by change_seq."""
+    seq = 0
+    for app_label, model_name in TRACKED:
+        model = apps.get_model(app_label, model_name)
+        rows = []
+        for row in model.objects.order_by("created_at", "pk").only("pk").iterator():
+            seq += 1
+            row.change_seq = seq
+            rows.append(row)
+        model.objects.bulk_update(rows, ["change_seq"], batch_size=1000)
+    apps.get_model("sync", "ChangeCounter").objects.update_or_create(
+        pk=1, defaults={"value": seq}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0001_initial"),
+        ("customers", "0004_customer_change_seq"),
+        ("loans", "0005_loan_change_seq_loan_updated_at_and_more"),
+        ("payments", "0003_loanpayment_change_seq_loanpayment_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
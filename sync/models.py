@@ -0,0 +1,58 @@
+"""
+Bookkeeping for the sync/ delta endpoint; see sync.changes.
+
+Tracked rows carry their own change_seq column. This app holds the mixin that keeps it written,
+the counter numbers come from on backends other than PostgreSQL, and the tombstones left
+behind by deletes.
+"""
+
+from django.db import models
+
+
+class TracksChanges:
+    """
+    Mixin for tracked models: save(update_fields=[...]) also writes change_seq, which the
+    pre_save signal in sync.changes has just set, in the same UPDATE.
+    """
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields and "change_seq" not in update_fields:
+            update_fields = [*update_fields, "change_seq"]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class ChangeCounter(models.Model):
+    """Single row (pk=1) holding the last change sequence number handed out (not PostgreSQL)."""
+
+    value = models.BigIntegerField(default=0)
+
+
+class Tombstone(models.Model):
+    class Resource(models.TextChoices):
+        APPLICATIONS = "applications", "Loan applications"
+        LOANS = "loans", "Loans"
+        PAYMENTS = "payments", "Loan payments"
+        CUSTOMERS = "customers", "Customers"
+
+    resource = models.CharField(max_length=20, choices=Resource.choices)
+    # Customers have UUID keys, the other resources integer ones.
+    object_id = models.CharField(max_length=64)
+    customer_id = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Owning customer at deletion time, for borrower-scoped sync",
+    )
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["resource", "change_seq"], name="tombstone_resource_seq_idx"),
+            models.Index(
+                fields=["resource", "customer_id", "change_seq"],
+                name="tombstone_customer_seq_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.resource} #{self.object_id} deleted @ {self.change_seq}"